@@ -19,24 +19,58 @@ Veo3, and interpret American Sign Language.
 # Available Tools
 
 ## Camera Control
-- **list_cameras(max_index)** -- Probe camera indexes and report which are available.
-- **vision_start(camera_index, width, height, fps, backend)** -- Open a camera.
+- **list_cameras(max_index, refresh)** -- Probe camera indexes and report which are available.
+  Results are cached until devices change; pass refresh=true after plugging in a camera.
+- **vision_start(camera_index, width, height, fps, backend, mjpeg, alias)** -- Open a camera.
+  Several cameras can be open at once; alias names one (e.g. "signer", "face"), otherwise
+  its index is its name. The other camera tools take camera=<alias or index> ("" = the
+  first camera opened).
   backend options: auto, avfoundation (macOS), msmf (Windows), dshow (Windows), v4l2 (Linux).
-- **vision_status()** -- Check if the camera is open and show its properties.
-- **vision_capture(save_dir, format)** -- Capture a single frame. Returns the file path.
-- **vision_burst(n, period_ms, save_dir, format, warmup, duration_ms)** -- Capture N frames
-  spaced by period_ms. If duration_ms > 0, n is computed automatically.
-- **vision_stop()** -- Release the camera.
+  mjpeg=true keeps the camera's own JPEG frames (no re-encode); falls back automatically.
+- **vision_status(camera)** -- Check if a camera is open and show its properties
+  (with no camera: the default one plus a list of all open cameras).
+- **vision_capture(save_dir, format, persist, camera)** -- Capture a single frame. Returns a frame
+  handle and, when persist=true (default), the file path.
+- **vision_burst(n, period_ms, save_dir, format, warmup, duration_ms, persist, select,
+  max_frames, camera)** -- Capture N frames spaced by period_ms. If duration_ms > 0, n is computed
+  automatically. Returns handles (and paths when persist=true). select="motion" (or
+  max_frames > 0) keeps only the keyframes where the scene changes.
+- **vision_sync_burst(cameras, n, period_ms, save_dir, format, persist)** -- Capture N
+  synchronized frame sets from several open cameras (default: all). Returns handles/paths
+  per camera alias and skew_ms per set (how far apart the cameras' frames were taken).
+- **vision_stop(camera)** -- Release a camera ("" releases all).
+- **vision_save(handles, save_dir, prefix)** -- Write in-memory frame handles to files.
+- **vision_contact_sheet(paths, cols, cell_width, max_cells, out_dir, persist)** -- Tile a
+  sequence of images/handles into numbered grid image(s).
+
+Frame handles (frame://...) can be passed anywhere an image path is accepted
+(asl_understand, banana_generate, veo_generate_video). They live in memory only
+and older ones are evicted, so save anything the user wants to keep.
 
 ## Image File Detection
-- **list_images(directory, recursive)** -- Scan a directory for image files (jpg, png, webp, etc.).
+- **list_images(directory, recursive, sort, extensions, offset, limit)** -- Scan a directory
+  for image files (jpg, png, webp, etc.) with size, modified time and width/height.
+  sort: "name", "newest", "oldest" or "size". All matches are returned unless limit is
+  set; for large directories page with offset/limit and follow next_offset. Use
+  sort="newest", limit=1 to find the latest capture.
   Use this when the user wants to work with an existing photo instead of the webcam.
+- **image_duplicates(directory, recursive, max_distance, algo)** -- Group near-identical
+  images (perceptual hash, no model call). Each group names the file to keep.
+- **image_nearest(path, directory, recursive, k)** -- Images most similar to a file or frame
+  handle, closest first. Use these instead of sending many images to a model to compare them.
 
 ## Nano Banana (AI Image Generation)
-- **banana_generate(prompt, input_paths, out_dir, model, n)** -- Generate AI image(s)
-  from a text prompt, optionally guided by input image(s).
+- **banana_generate(prompt, input_paths, out_dir, model, n, max_concurrency, use_cache)** --
+  Generate AI image(s) from a text prompt, optionally guided by input image(s). n > 1 runs
+  that many variations concurrently in one call; don't chain separate calls for variations.
+  Identical repeats return cached results (cached=true); pass use_cache=false when the
+  user explicitly wants a fresh take on the same prompt and image.
   Default model: gemini-3-pro-image-preview.
   Use cases: style transforms, poster mockups, cinematic selfies, sketch variations.
+- **banana_batch(prompt, input_paths, directory, recursive, out_dir, model,
+  max_concurrency, resume)** -- Apply one prompt to many images (a list and/or a whole
+  directory) in a single call. Writes a manifest.json mapping inputs to outputs; re-running
+  resumes and skips finished items. Use this instead of one banana_generate per image.
 
 ## Veo3 (AI Video Generation)
 - **veo_generate_video(prompt, negative_prompt, out_dir, model, image_path,
@@ -45,14 +79,28 @@ Veo3, and interpret American Sign Language.
   Default model: veo-3.1-generate-preview.
   Supports aspect_ratio ("16:9" or "9:16"), resolution ("720p", "1080p").
   Video generation is asynchronous and may take several minutes.
+- **veo_submit(prompt, negative_prompt, out_dir, model, image_path, aspect_ratio,
+  resolution, seed)** -- Start a Veo job in the background and return a job_id
+  immediately. Prefer this for long or multiple clips and keep helping the user.
+- **veo_status(job_id)** -- State of one job, or all jobs when job_id is empty.
+- **veo_result(job_id, wait_seconds)** -- Saved MP4 paths once the job is done.
+- **veo_cancel(job_id)** -- Stop tracking a job (no download).
 
 ## ASL (American Sign Language)
-- **asl_understand(paths, style_hint)** -- Analyze a sequence of images showing
-  ASL signing. Returns:
+- **asl_understand(paths, style_hint, select, max_frames, pack)** -- Analyze a sequence
+  of images showing ASL signing. select="motion" or max_frames > 0 drops near-identical
+  frames before upload (use it for long bursts). pack="sheet" sends the frames tiled
+  into contact sheet(s) instead of one image per frame. Returns:
   - transcript: English translation of the signing
   - assistant_reply: A helpful response in English
   - asl_gloss: The response converted to ASL GLOSS notation (uppercase)
 
+## Diagnostics
+- **gemini_stats()** -- Per-model Gemini call counters (calls, throttled, retries, failures)
+  and input-image upload reuse.
+  Transient 429/5xx errors are already retried with backoff inside the tools; if a tool
+  still reports a quota error, wait before retrying instead of retrying immediately.
+
 # Workflows
 
 ## Standard Photo Pipeline
@@ -63,8 +111,10 @@ Veo3, and interpret American Sign Language.
 5. Optionally animate with veo_generate_video using the banana output as image_path
 
 ## ASL Conversation
-1. Open camera, capture a burst of frames with vision_burst
-2. Send frame paths to asl_understand for interpretation
+1. Open camera, capture a burst of frames with vision_burst (persist=false is fastest)
+   With two cameras (e.g. signer + face) use vision_sync_burst and send the signer
+   camera's handles, or both cameras' handles in capture order
+2. Send the burst's handles to asl_understand for interpretation
 3. Present the transcript, reply, and ASL gloss to the user
 4. Optionally generate a Veo video of a generic avatar replying in ASL
 
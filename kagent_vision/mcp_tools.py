@@ -7,12 +7,27 @@ image generation, video generation, and ASL interpretation tools.
 Set MCP_LOCAL=1 to use stdio mode (spawns the MCP server as a subprocess).
 This is required on macOS for webcam access since Docker can't pass through
 the camera device.
+
+Set MCP_SHARED=1 as well to share one resident local MCP server between all
+agent workers instead: it serves streamable HTTP on 127.0.0.1:VISION_MCP_PORT
+and is started on first use if nothing is listening there. The cameras are
+then owned by a single process, and a new session only costs a connection
+handshake. If it can't be started, each worker falls back to stdio. The
+server only answers requests carrying a per-user bearer token, kept in a
+0600 file next to its lock file in the system temp directory.
 """
 
 import os
 import sys
 import re
-from typing import List, Optional, Union
+import json
+import time
+import secrets
+import socket
+import logging
+import tempfile
+import subprocess
+from typing import List, Optional, Tuple, Union
 
 from google.adk.tools.mcp_tool.mcp_toolset import (
     MCPToolset,
@@ -36,10 +51,164 @@ def _resolve_env_vars(value: str) -> str:
     return re.sub(r"\$\{([^}]+)\}", replace_var, value)
 
 
+log = logging.getLogger("kagent_vision.mcp_tools")
+
+_SHARED_HOST = "127.0.0.1"
+# serverInfo.name the vision MCP server reports in its initialize result
+_SHARED_SERVER_NAME = "KAgent Vision MCP"
+# How long a worker waits for a freshly started shared server to listen
+_SHARED_START_TIMEOUT_S = 60.0
+
+
 def _is_local_mode() -> bool:
     return os.environ.get("MCP_LOCAL", "").strip() in ("1", "true", "yes")
 
 
+def _is_shared_mode() -> bool:
+    return os.environ.get("MCP_SHARED", "").strip() in ("1", "true", "yes")
+
+
+def _port_open(port: int) -> bool:
+    try:
+        with socket.create_connection((_SHARED_HOST, port), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+def _shared_token(port: int) -> str:
+    """The shared server's bearer token, created on first use.
+
+    It lives in vision-mcp-<port>.token in the temp directory, readable only
+    by the current user. A token file someone else owns or others can read is
+    refused rather than trusted.
+    """
+    path = os.path.join(tempfile.gettempdir(), f"vision-mcp-{port}.token")
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        pass
+    else:
+        with os.fdopen(fd, "w") as f:
+            f.write(secrets.token_urlsafe(32))
+    st = os.stat(path)
+    if hasattr(os, "getuid") and (st.st_uid != os.getuid() or st.st_mode & 0o077):
+        raise RuntimeError(
+            f"MCP_SHARED: {path} must be owned by the current user with mode 0600"
+        )
+    with open(path, "r", encoding="utf-8") as f:
+        token = f.read().strip()
+    if not token:
+        raise RuntimeError(f"MCP_SHARED: {path} is empty; remove it and retry")
+    return token
+
+
+def _auth_headers(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _is_vision_server(url: str, token: str) -> bool:
+    """True if url answers an MCP initialize, sent with token, as the vision MCP server."""
+    import httpx
+
+    body = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "initialize",
+        "params": {
+            "protocolVersion": "2025-03-26",
+            "capabilities": {},
+            "clientInfo": {"name": "kagent-vision-probe", "version": "1.0"},
+        },
+    }
+    headers = {"Accept": "application/json, text/event-stream", **_auth_headers(token)}
+    try:
+        with httpx.Client(timeout=3.0) as client:
+            resp = client.post(url, json=body, headers=headers)
+            session = resp.headers.get("mcp-session-id")
+            if session:
+                # Don't leave the probe's session behind on the server
+                client.delete(url, headers={"mcp-session-id": session, **_auth_headers(token)})
+    except httpx.HTTPError:
+        return False
+    if resp.status_code != 200:
+        return False
+    # The reply is plain JSON or a one-event SSE stream
+    payload = resp.text
+    if "text/event-stream" in resp.headers.get("content-type", ""):
+        data = [ln[5:] for ln in payload.splitlines() if ln.startswith("data:")]
+        payload = data[-1] if data else ""
+    try:
+        info = json.loads(payload)["result"]["serverInfo"]
+    except (ValueError, KeyError, TypeError):
+        return False
+    return info.get("name") == _SHARED_SERVER_NAME
+
+
+def _foreign_listener(port: int) -> RuntimeError:
+    return RuntimeError(
+        f"MCP_SHARED: 127.0.0.1:{port} is in use by something other than the vision "
+        f"MCP server (or by one started with another token); stop it or set "
+        f"VISION_MCP_PORT to a free port"
+    )
+
+
+def _ensure_shared_server() -> Optional[Tuple[str, str]]:
+    """Return (url, token) of the resident vision MCP server, starting it if needed.
+
+    Workers starting together serialize on a lock file, so exactly one of
+    them spawns the server and the rest wait for it to listen. The server is
+    detached and outlives the worker that started it, and requires the
+    user's token on every request. An existing listener is only reused after
+    it answers an MCP initialize, sent with that token, as the vision server.
+    Returns None if the server could not be started; raises RuntimeError if
+    the port belongs to some other service.
+    """
+    port = int(os.environ.get("VISION_MCP_PORT", "3100"))
+    url = f"http://{_SHARED_HOST}:{port}/mcp"
+    token = _shared_token(port)
+    if _port_open(port):
+        if _is_vision_server(url, token):
+            return url, token
+        raise _foreign_listener(port)
+
+    run_dir = tempfile.gettempdir()
+    with open(os.path.join(run_dir, f"vision-mcp-{port}.lock"), "w") as lock:
+        try:
+            import fcntl
+
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        except ImportError:
+            pass  # no fcntl (Windows): a losing racer fails to bind and exits
+        if _port_open(port):
+            if _is_vision_server(url, token):
+                return url, token  # another worker started it while we waited
+            raise _foreign_listener(port)
+
+        log_path = os.path.join(run_dir, f"vision-mcp-{port}.log")
+        with open(log_path, "ab") as out:
+            proc = subprocess.Popen(
+                [sys.executable, "-m", "vision_mcp", "--http",
+                 "--host", _SHARED_HOST, "--port", str(port)],
+                env={**os.environ, "VISION_MCP_TOKEN": token},
+                stdin=subprocess.DEVNULL,
+                stdout=out,
+                stderr=out,
+                start_new_session=True,
+            )
+        deadline = time.monotonic() + _SHARED_START_TIMEOUT_S
+        while time.monotonic() < deadline:
+            if _port_open(port) and _is_vision_server(url, token):
+                log.info("Started shared vision MCP server (pid %d) at %s", proc.pid, url)
+                return url, token
+            if proc.poll() is not None:
+                break
+            time.sleep(0.1)
+
+    log.warning("Shared vision MCP server did not start (see %s); using stdio", log_path)
+    return None
+
+
 def get_mcp_tools(
     server_names: Optional[List[str]] = None,
     server_filters: Optional[dict] = None,
@@ -73,7 +242,20 @@ def get_mcp_tools(
         elif global_filter is not None:
             predicate = global_filter
 
-        if local and server["type"] == "command":
+        shared = None
+        if local and server["type"] == "command" and _is_shared_mode():
+            shared = _ensure_shared_server()
+
+        if shared:
+            # Shared mode: one resident local MCP server for all workers
+            shared_url, token = shared
+            connection_params = StreamableHTTPConnectionParams(
+                url=shared_url,
+                headers=_auth_headers(token),
+                timeout=600,
+                sse_read_timeout=600,
+            )
+        elif local and server["type"] == "command":
             # Stdio mode: spawn MCP server as a subprocess for direct
             # hardware access (webcam, etc.)
             from google.adk.tools.mcp_tool.mcp_session_manager import (
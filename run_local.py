@@ -1,36 +1,75 @@
 """
 run_local.py - Custom Web UI launcher for KAgent Vision
 
-Spawns the ADK api_server as a subprocess, proxies API calls, and serves a
-custom single-file UI on port 5001.
+Serves a custom single-file UI on port 5001, including a live MJPEG camera
+preview fed by the MCP server's frame grabbers, and the ADK API under /api.
+
+By default the ADK FastAPI app is mounted in-process at /api, sharing this
+event loop with no extra HTTP hop. With ADK_MODE=subprocess (or when the
+in-process app can't be built) the ADK api_server is spawned on port 8080
+instead and /api is proxied to it.
 
 Usage:
     source .venv/bin/activate
     GOOGLE_API_KEY="$GEMINI_API_KEY" python run_local.py
+    ADK_MODE=subprocess GOOGLE_API_KEY="$GEMINI_API_KEY" python run_local.py
 """
 
+import asyncio
 import atexit
+import hashlib
+import json
 import os
 import signal
 import subprocess
 import sys
 import time
-from contextlib import asynccontextmanager
+import uuid
+from contextlib import AsyncExitStack, asynccontextmanager
 
 import httpx
 import uvicorn
-from fastapi import FastAPI, Request, UploadFile, File
+from fastapi import FastAPI, Request
 from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from python_multipart.exceptions import FormParserError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.background import BackgroundTask
+from starlette.routing import Mount
 
 ADK_PORT = 8080
 UI_PORT = 5001
 ADK_BASE = f"http://localhost:{ADK_PORT}"
+# "inprocess" mounts the ADK app at /api; "subprocess" runs api_server and proxies
+ADK_MODE = os.environ.get("ADK_MODE", "inprocess").strip().lower()
 
 PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
 STATIC_DIR = os.path.join(PROJECT_DIR, "static")
 OUTPUTS_DIR = os.path.join(PROJECT_DIR, "outputs")
 
+# The MCP server (spawned by ADK, inheriting our env) writes preview frames here
+PREVIEW_DIR = os.environ.setdefault("VISION_PREVIEW_DIR", os.path.join(OUTPUTS_DIR, ".preview"))
+PREVIEW_FPS = float(os.environ.get("VISION_PREVIEW_FPS", "10"))
+
+# Uploads larger than this are rejected with 413
+UPLOAD_MAX_BYTES = int(os.environ.get("VISION_UI_UPLOAD_MAX_MB", "25")) * 1024 * 1024
+# Room for multipart boundaries, part headers and small form fields
+UPLOAD_OVERHEAD = 64 * 1024
+# sha256 -> file name of every upload kept in outputs/
+UPLOAD_INDEX = os.path.join(OUTPUTS_DIR, ".cache", "uploads.json")
+
+# Connection pool for the ADK proxy: connections are kept alive and reused
+PROXY_LIMITS = httpx.Limits(
+    max_connections=int(os.environ.get("PROXY_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.environ.get("PROXY_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=30.0,
+)
+# Headers that describe one hop, not the message; never forwarded
+HOP_BY_HOP = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "transfer-encoding", "upgrade", "host",
+}
+
 # Resolve the venv python — prefer VIRTUAL_ENV, fall back to sys.executable
 _venv = os.environ.get("VIRTUAL_ENV")
 if _venv:
@@ -39,14 +78,21 @@ else:
     PYTHON = sys.executable
 
 adk_proc: subprocess.Popen | None = None
+adk_app: FastAPI | None = None
 http_client: httpx.AsyncClient | None = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global http_client
-    http_client = httpx.AsyncClient(timeout=httpx.Timeout(600.0))
-    yield
+    http_client = httpx.AsyncClient(
+        timeout=httpx.Timeout(600.0, connect=10.0), limits=PROXY_LIMITS
+    )
+    async with AsyncExitStack() as stack:
+        if adk_app is not None:
+            # Mounted apps don't get lifespan events; run ADK's (MCP toolset cleanup) here
+            await stack.enter_async_context(adk_app.router.lifespan_context(adk_app))
+        yield
     await http_client.aclose()
 
 
@@ -93,6 +139,29 @@ def start_adk_server():
     sys.exit(1)
 
 
+def mount_adk_app() -> bool:
+    """Build the ADK FastAPI app in-process and mount it at /api.
+
+    Returns False (after saying why) when it can't be built, so the caller
+    can fall back to the subprocess.
+    """
+    global adk_app
+    # Same environment and working directory the subprocess would get
+    os.environ["MCP_LOCAL"] = "1"
+    os.chdir(PROJECT_DIR)
+    try:
+        from google.adk.cli.fast_api import get_fast_api_app
+
+        adk_app = get_fast_api_app(agents_dir=PROJECT_DIR, web=False)
+    except Exception as e:
+        print(f"In-process ADK app unavailable ({e}); using subprocess mode", file=sys.stderr)
+        return False
+    # Ahead of the /api proxy route, which then only serves subprocess mode
+    app.router.routes.insert(0, Mount("/api", app=adk_app))
+    print("ADK app mounted in-process at /api")
+    return True
+
+
 def cleanup():
     if adk_proc and adk_proc.poll() is None:
         adk_proc.terminate()
@@ -109,75 +178,361 @@ os.makedirs(OUTPUTS_DIR, exist_ok=True)
 app.mount("/outputs", StaticFiles(directory=OUTPUTS_DIR), name="outputs")
 
 
+class PreviewHub:
+    """Fans preview frames out to MJPEG clients.
+
+    One poller task watches the frame files the MCP server publishes (and
+    keeps its demand marker fresh while anyone is watching). Each client has
+    a one-slot queue: a slow client misses frames, the oldest pending one is
+    dropped, and nobody else, least of all the camera, waits for it.
+    """
+
+    def __init__(self):
+        self.clients: dict[asyncio.Queue, str] = {}
+        self.task: asyncio.Task | None = None
+
+    def subscribe(self, camera: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self.clients[queue] = camera
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.clients.pop(queue, None)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, frame: bytes) -> None:
+        if queue.full():
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        queue.put_nowait(frame)
+
+    @staticmethod
+    def _files() -> dict[str, str]:
+        """alias -> preview file; "" maps to the default (first opened) camera."""
+        try:
+            with open(os.path.join(PREVIEW_DIR, "cameras.json"), "r", encoding="utf-8") as f:
+                listing = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        files = {c["alias"]: c["file"] for c in listing}
+        if listing:
+            files[""] = listing[0]["file"]
+        return files
+
+    async def _run(self) -> None:
+        demand = os.path.join(PREVIEW_DIR, ".demand")
+        seen: dict[str, int] = {}
+        last_touch = 0.0
+        while self.clients:
+            now = time.time()
+            if now - last_touch >= 1.0:
+                try:
+                    os.makedirs(PREVIEW_DIR, exist_ok=True)
+                    with open(demand, "a"):
+                        os.utime(demand)
+                except OSError:
+                    pass
+                last_touch = now
+
+            files = self._files()
+            wanted: dict[str, list[asyncio.Queue]] = {}
+            for queue, camera in list(self.clients.items()):
+                name = files.get(camera.strip())
+                if name:
+                    wanted.setdefault(name, []).append(queue)
+            for name, queues in wanted.items():
+                path = os.path.join(PREVIEW_DIR, name)
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                    if seen.get(name) == mtime:
+                        continue
+                    with open(path, "rb") as f:
+                        frame = f.read()
+                except OSError:
+                    continue
+                seen[name] = mtime
+                for queue in queues:
+                    self._offer(queue, frame)
+            await asyncio.sleep(1.0 / max(0.5, PREVIEW_FPS))
+
+
+preview_hub = PreviewHub()
+
+
+@app.get("/preview.mjpg")
+async def preview_stream(camera: str = ""):
+    """Live MJPEG preview of an open camera (alias or index; default camera if empty)."""
+    queue = preview_hub.subscribe(camera)
+
+    async def stream():
+        try:
+            while True:
+                frame = await queue.get()
+                yield (
+                    b"--frame\r\nContent-Type: image/jpeg\r\n"
+                    + f"Content-Length: {len(frame)}\r\n\r\n".encode()
+                    + frame
+                    + b"\r\n"
+                )
+        finally:
+            preview_hub.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="multipart/x-mixed-replace; boundary=frame",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
 @app.get("/")
 async def serve_ui():
     return FileResponse(os.path.join(STATIC_DIR, "index.html"))
 
 
+class UploadTooLarge(Exception):
+    pass
+
+
+_upload_hashes: dict[str, str] | None = None
+_upload_lock = asyncio.Lock()
+
+
+def _load_upload_index() -> dict[str, str]:
+    global _upload_hashes
+    if _upload_hashes is None:
+        try:
+            with open(UPLOAD_INDEX, "r", encoding="utf-8") as f:
+                _upload_hashes = json.load(f)
+        except (OSError, ValueError):
+            _upload_hashes = {}
+    return _upload_hashes
+
+
+def _save_upload_index(index: dict[str, str]) -> None:
+    try:
+        os.makedirs(os.path.dirname(UPLOAD_INDEX), exist_ok=True)
+        tmp = f"{UPLOAD_INDEX}.tmp{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp, UPLOAD_INDEX)
+    except OSError as e:
+        print(f"WARNING: could not save upload index: {e}", file=sys.stderr)
+
+
+class _UploadReceiver:
+    """Incremental multipart/form-data parser for the "file" field of an upload.
+
+    Request chunks are fed in as they arrive; the bytes of the file part are
+    counted and handed back per chunk, so the caller can write them out
+    without the body ever being spooled or held whole.
+    """
+
+    def __init__(self, boundary: bytes):
+        self.filename: str | None = None
+        self.size = 0
+        self._pending: list[bytes] = []
+        self._in_file = False
+        self._field = self._value = self._disposition = b""
+        self._parser = MultipartParser(boundary, {
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._field.lower() == b"content-disposition":
+            self._disposition = self._value
+        self._field = self._value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        self._disposition = b""
+        # Only the first "file" part is kept; anything else is skipped
+        self._in_file = self.filename is None and options.get(b"name") == b"file"
+        if self._in_file:
+            self.filename = options.get(b"filename", b"").decode("utf-8", "replace")
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self.size += end - start
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._in_file = False
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Parse one request chunk; returns the file bytes it contained."""
+        self._parser.write(chunk)
+        data = b"".join(self._pending)
+        self._pending.clear()
+        return data
+
+    def finish(self) -> None:
+        self._parser.finalize()
+
+
+def _write_part(out, digest, data: bytes) -> None:
+    digest.update(data)
+    out.write(data)
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _too_large() -> JSONResponse:
+    limit_mb = UPLOAD_MAX_BYTES // (1024 * 1024)
+    return JSONResponse(
+        {"ok": False, "error": f"Upload exceeds {limit_mb} MB limit"}, status_code=413
+    )
+
+
+def _bad_upload(error: str) -> JSONResponse:
+    return JSONResponse({"ok": False, "error": error}, status_code=400)
+
+
 @app.post("/upload")
-async def upload_image(file: UploadFile = File(...)):
-    """Save an uploaded image to outputs/ and return its path."""
+async def upload_image(request: Request):
+    """Save an uploaded image to outputs/ and return its path.
+
+    The multipart body is parsed as it streams in: the file part is hashed
+    and written to a .part file chunk by chunk on a worker thread, and the
+    upload is refused with 413 as soon as it crosses the size limit, without
+    reading the rest. Content already uploaded before is not written again:
+    the existing file's path is returned with "deduplicated": true.
+    """
+    # Reject obviously oversized bodies before touching the data
+    if int(request.headers.get("content-length") or 0) > UPLOAD_MAX_BYTES + UPLOAD_OVERHEAD:
+        return _too_large()
+    ctype, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if ctype != b"multipart/form-data" or not boundary:
+        return _bad_upload("Expected a multipart/form-data upload")
+
+    receiver = _UploadReceiver(boundary)
+    digest = hashlib.sha256()
+    tmp = os.path.join(OUTPUTS_DIR, f".upload_{uuid.uuid4().hex}.part")
+    out = await asyncio.to_thread(open, tmp, "wb")
+    received = 0
+    try:
+        try:
+            async for chunk in request.stream():
+                received += len(chunk)
+                data = receiver.feed(chunk)
+                if (receiver.size > UPLOAD_MAX_BYTES
+                        or received > UPLOAD_MAX_BYTES + UPLOAD_OVERHEAD):
+                    raise UploadTooLarge()
+                if data:
+                    await asyncio.to_thread(_write_part, out, digest, data)
+            receiver.finish()
+        finally:
+            await asyncio.to_thread(out.close)
+    except UploadTooLarge:
+        _remove_quietly(tmp)
+        return _too_large()
+    except FormParserError as e:
+        _remove_quietly(tmp)
+        return _bad_upload(f"Malformed upload: {e}")
+    except BaseException:
+        _remove_quietly(tmp)
+        raise
+    if receiver.filename is None:
+        _remove_quietly(tmp)
+        return _bad_upload("No file field in upload")
+
+    sha, size = digest.hexdigest(), receiver.size
     ts = time.strftime("%Y%m%d_%H%M%S")
     ms = int((time.time() % 1) * 1000)
-    ext = os.path.splitext(file.filename or "image.jpg")[1] or ".jpg"
+    ext = os.path.splitext(receiver.filename or "image.jpg")[1] or ".jpg"
     fname = f"upload_{ts}_{ms:03d}{ext}"
     fpath = os.path.join(OUTPUTS_DIR, fname)
-    contents = await file.read()
-    with open(fpath, "wb") as f:
-        f.write(contents)
+
+    async with _upload_lock:
+        index = _load_upload_index()
+        existing = index.get(sha)
+        if existing:
+            try:
+                same = os.path.getsize(os.path.join(OUTPUTS_DIR, existing)) == size
+            except OSError:
+                same = False
+            if same:
+                os.remove(tmp)
+                return JSONResponse({
+                    "ok": True,
+                    "path": f"outputs/{existing}",
+                    "filename": existing,
+                    "deduplicated": True,
+                })
+        os.replace(tmp, fpath)
+        index[sha] = fname
+        await asyncio.to_thread(_save_upload_index, dict(index))
     return JSONResponse({"ok": True, "path": f"outputs/{fname}", "filename": fname})
 
 
 @app.api_route("/api/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
 async def proxy_to_adk(request: Request, path: str):
-    url = f"{ADK_BASE}/{path}"
-    headers = {k: v for k, v in request.headers.items() if k.lower() != "host"}
-
-    body = await request.body()
-
-    if path == "run_sse":
-        # SSE streaming proxy — must keep response open until stream ends
-        req = http_client.build_request(
-            method=request.method,
-            url=url,
-            headers=headers,
-            content=body,
-        )
+    """Stream a request to ADK and its response back, in both directions.
+
+    Bodies are never buffered, so SSE (run_sse) and ordinary routes share
+    one path. When the browser disconnects, Starlette cancels the response
+    stream and the upstream response is closed, which drops the connection
+    to ADK and cancels an abandoned run there too.
+    """
+    url = httpx.URL(f"{ADK_BASE}/{path}", query=request.url.query.encode("utf-8"))
+    headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP}
+    has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+
+    req = http_client.build_request(
+        method=request.method,
+        url=url,
+        headers=headers,
+        content=request.stream() if has_body else None,
+    )
+    try:
         response = await http_client.send(req, stream=True)
+    except httpx.RequestError as e:
+        return JSONResponse({"ok": False, "error": f"ADK unreachable: {e}"}, status_code=502)
 
-        async def stream():
-            try:
-                async for chunk in response.aiter_bytes():
-                    yield chunk
-            finally:
-                await response.aclose()
-
-        return StreamingResponse(
-            stream(),
-            status_code=response.status_code,
-            media_type="text/event-stream",
-        )
-    else:
-        response = await http_client.request(
-            method=request.method,
-            url=url,
-            headers=headers,
-            content=body,
-        )
-        # Filter hop-by-hop headers
-        skip = {"transfer-encoding", "content-encoding", "content-length", "connection"}
-        resp_headers = {k: v for k, v in response.headers.items() if k.lower() not in skip}
-        return StreamingResponse(
-            iter([response.content]),
-            status_code=response.status_code,
-            headers=resp_headers,
-        )
+    async def stream():
+        try:
+            async for chunk in response.aiter_raw():
+                yield chunk
+        finally:
+            await response.aclose()
+
+    resp_headers = {
+        k: v for k, v in response.headers.items() if k.lower() not in HOP_BY_HOP
+    }
+    return StreamingResponse(
+        stream(),
+        status_code=response.status_code,
+        headers=resp_headers,
+        # Also runs after a client disconnect cancels stream()
+        background=BackgroundTask(response.aclose),
+    )
 
 
 def main():
     print(f"Using Python: {PYTHON}")
-    print("Starting ADK api_server...")
-    start_adk_server()
+    if ADK_MODE == "subprocess" or not mount_adk_app():
+        print("Starting ADK api_server...")
+        start_adk_server()
     print(f"Starting custom UI on http://localhost:{UI_PORT}")
     uvicorn.run(app, host="0.0.0.0", port=UI_PORT, log_level="info")
 
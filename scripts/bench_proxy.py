@@ -0,0 +1,166 @@
+"""
+bench_proxy.py - Measure run_local.py's /api proxy against a stub ADK server
+
+Starts a stub ADK api_server and run_local's app (without spawning ADK) on
+local ports, then reports:
+  - per-request latency direct vs. through the proxy (small JSON)
+  - throughput of a large streamed response
+  - time-to-first-byte for an SSE run, direct vs. proxied
+  - whether a client disconnect cancels the SSE run upstream
+
+Usage:
+    python scripts/bench_proxy.py [--requests 500] [--concurrency 10]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STUB_PORT = 18080
+PROXY_PORT = 15001
+SSE_EVENTS = 20
+SSE_INTERVAL_S = 0.05
+BIG_BYTES = 32 * 1024 * 1024
+
+stub = FastAPI()
+stub_state = {"sse_started": 0, "sse_cancelled": 0}
+
+
+@stub.get("/list-apps")
+async def list_apps():
+    return JSONResponse(["kagent_vision"])
+
+
+@stub.get("/big")
+async def big():
+    chunk = b"x" * (1024 * 1024)
+
+    async def body():
+        for _ in range(BIG_BYTES // len(chunk)):
+            yield chunk
+
+    return StreamingResponse(body(), media_type="application/octet-stream")
+
+
+@stub.post("/run_sse")
+async def run_sse(request: Request):
+    await request.body()
+    stub_state["sse_started"] += 1
+
+    async def events():
+        try:
+            for i in range(SSE_EVENTS):
+                yield f"data: {{\"event\": {i}}}\n\n".encode()
+                await asyncio.sleep(SSE_INTERVAL_S)
+        except asyncio.CancelledError:
+            stub_state["sse_cancelled"] += 1
+            raise
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def serve(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def latency(base: str, n: int, concurrency: int) -> list[float]:
+    times: list[float] = []
+    sem = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(base_url=base) as client:
+
+        async def one():
+            async with sem:
+                t0 = time.perf_counter()
+                r = await client.get("list-apps")
+                r.raise_for_status()
+                times.append(time.perf_counter() - t0)
+
+        await asyncio.gather(*(one() for _ in range(n)))
+    return times
+
+
+async def throughput(base: str) -> float:
+    async with httpx.AsyncClient(base_url=base, timeout=60) as client:
+        t0 = time.perf_counter()
+        size = 0
+        async with client.stream("GET", "big") as r:
+            async for chunk in r.aiter_raw():
+                size += len(chunk)
+        return size / (time.perf_counter() - t0) / 1e6
+
+
+async def sse_ttfb(base: str, runs: int = 10) -> float:
+    ttfb: list[float] = []
+    async with httpx.AsyncClient(base_url=base, timeout=60) as client:
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            async with client.stream("POST", "run_sse", json={"q": 1}) as r:
+                async for _ in r.aiter_raw():
+                    ttfb.append(time.perf_counter() - t0)
+                    break
+    return statistics.median(ttfb)
+
+
+async def disconnect_cancels(base: str) -> bool:
+    before = stub_state["sse_cancelled"]
+    async with httpx.AsyncClient(base_url=base, timeout=60) as client:
+        async with client.stream("POST", "run_sse", json={"q": 1}) as r:
+            async for _ in r.aiter_raw():
+                break  # leave after the first event
+    await asyncio.sleep(SSE_INTERVAL_S * 4)
+    return stub_state["sse_cancelled"] > before
+
+
+def ms(values: list[float], q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))] * 1000
+
+
+async def main(args) -> None:
+    import run_local
+
+    run_local.ADK_BASE = f"http://127.0.0.1:{STUB_PORT}"
+    serve(stub, STUB_PORT)
+    serve(run_local.app, PROXY_PORT)
+    direct = f"http://127.0.0.1:{STUB_PORT}/"
+    proxied = f"http://127.0.0.1:{PROXY_PORT}/api/"
+
+    await latency(proxied, 50, args.concurrency)  # warm up pools
+    d = await latency(direct, args.requests, args.concurrency)
+    p = await latency(proxied, args.requests, args.concurrency)
+    print(f"small GET x{args.requests} (concurrency {args.concurrency})")
+    print(f"  direct   p50 {ms(d, .5):6.2f} ms  p99 {ms(d, .99):6.2f} ms")
+    print(f"  proxied  p50 {ms(p, .5):6.2f} ms  p99 {ms(p, .99):6.2f} ms")
+    print(f"  overhead p50 {ms(p, .5) - ms(d, .5):6.2f} ms")
+
+    print(f"large streamed GET ({BIG_BYTES // 2**20} MB)")
+    print(f"  direct   {await throughput(direct):8.1f} MB/s")
+    print(f"  proxied  {await throughput(proxied):8.1f} MB/s")
+
+    print("SSE time-to-first-byte (median of 10)")
+    print(f"  direct   {await sse_ttfb(direct) * 1000:6.2f} ms")
+    print(f"  proxied  {await sse_ttfb(proxied) * 1000:6.2f} ms")
+
+    ok = await disconnect_cancels(proxied)
+    print(f"client disconnect cancels upstream SSE: {'yes' if ok else 'NO'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
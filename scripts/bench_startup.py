@@ -0,0 +1,88 @@
+"""
+bench_startup.py - Cold-start budget of the vision MCP server
+
+Spawns `python -m vision_mcp` over stdio the way mcp_tools.py does in local
+mode and measures, per run:
+  - time until the initialize handshake completes
+  - time until the first tools/list response (the number that matters:
+    the agent can't plan until it has the tool list)
+and reports whether cv2 / numpy / google.genai were imported at start-up.
+
+Usage:
+    python scripts/bench_startup.py [--runs 5] [--budget-ms 2000]
+
+Exits non-zero when the median time-to-tools/list exceeds --budget-ms.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+SERVERS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "servers")
+HEAVY = ("cv2", "numpy", "google.genai", "PIL")
+
+
+def _env() -> dict[str, str]:
+    path = os.environ.get("PYTHONPATH", "")
+    return {**os.environ, "PYTHONPATH": os.pathsep.join(p for p in (SERVERS_DIR, path) if p)}
+
+
+async def one_run() -> tuple[float, float, int]:
+    params = StdioServerParameters(
+        command=sys.executable, args=["-m", "vision_mcp"], env=_env()
+    )
+    t0 = time.perf_counter()
+    with open(os.devnull, "w") as devnull:
+        async with stdio_client(params, errlog=devnull) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                t_init = time.perf_counter() - t0
+                tools = await session.list_tools()
+                t_list = time.perf_counter() - t0
+    return t_init, t_list, len(tools.tools)
+
+
+def heavy_modules_at_startup() -> list[str]:
+    """Heavy modules already in sys.modules once the server module is imported."""
+    check = (
+        "import sys, vision_mcp.server; "
+        f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", check], env=_env(), capture_output=True, text=True, check=True
+    )
+    return [m for m in out.stdout.strip().split(",") if m]
+
+
+async def main(args) -> int:
+    await one_run()  # warm the OS page cache / .pyc files
+    inits, lists = [], []
+    for _ in range(args.runs):
+        t_init, t_list, n_tools = await one_run()
+        inits.append(t_init * 1000)
+        lists.append(t_list * 1000)
+
+    med = statistics.median(lists)
+    print(f"vision_mcp cold start over stdio ({args.runs} runs, {n_tools} tools)")
+    print(f"  initialize   median {statistics.median(inits):7.1f} ms  max {max(inits):7.1f} ms")
+    print(f"  tools/list   median {med:7.1f} ms  max {max(lists):7.1f} ms")
+    heavy = heavy_modules_at_startup()
+    print(f"  heavy imports at start-up: {', '.join(heavy) if heavy else 'none'}")
+    if med > args.budget_ms:
+        print(f"OVER BUDGET: {med:.1f} ms > {args.budget_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2000.0)
+    sys.exit(asyncio.run(main(parser.parse_args())))
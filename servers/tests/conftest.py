@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# Keep the persistent indexes and preview frames out of the working tree;
+# vision_mcp reads these at import time
+_TMP = tempfile.mkdtemp(prefix="vision-mcp-tests-")
+os.environ.setdefault("VISION_CACHE_DIR", os.path.join(_TMP, "cache"))
+os.environ.setdefault("VISION_PREVIEW_DIR", os.path.join(_TMP, "preview"))
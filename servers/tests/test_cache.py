@@ -0,0 +1,33 @@
+from vision_mcp.cache import DiskCache
+
+
+def test_zero_budget_disables_cache(tmp_path):
+    cache = DiskCache("off", 0, root=tmp_path)
+    assert cache.put("k" * 64, {"a": 1}, {"blob": b"data"}) is None
+    assert cache.get("k" * 64) is None
+    assert not (tmp_path / "off").exists()
+
+
+def test_budget_evicts_least_recently_used(tmp_path):
+    cache = DiskCache("lru", 200, root=tmp_path)
+    cache.put("a" * 64, {}, {"blob": b"x" * 120})
+    cache.put("b" * 64, {}, {"blob": b"x" * 120})
+    assert cache.get("a" * 64) is None
+    assert cache.get("b" * 64) is not None
+
+
+def test_put_scans_only_when_over_budget(tmp_path, monkeypatch):
+    cache = DiskCache("scan", 1000, root=tmp_path)
+    scans = []
+    real_scan = cache._scan
+    monkeypatch.setattr(cache, "_scan", lambda: scans.append(1) or real_scan())
+
+    for key in "abcd":
+        cache.put(key * 64, {}, {"blob": b"x" * 100})
+    assert len(scans) == 1  # the initial seed only
+
+    for key in "efghij":
+        cache.put(key * 64, {}, {"blob": b"x" * 100})
+    assert len(scans) > 1
+    assert sum(size for _, size, _ in real_scan()) <= 1000
+    assert cache.get("j" * 64) is not None
@@ -0,0 +1,160 @@
+from vision_mcp import camera
+
+
+def test_list_cameras_does_not_probe_open_cameras():
+    probed = []
+
+    def fake_probe(index):
+        probed.append(index)
+        return {"index": index, "open": True, "width": 640, "height": 480, "fps": 30.0}
+
+    camera.set_camera_prober(fake_probe, lambda: [0, 1, 2])
+    cam = camera._Camera("side", 1, object(), {"width": 1280, "height": 720, "fps": 15.0})
+    camera._CAMERAS["side"] = cam
+    try:
+        result = camera.list_cameras(max_index=10, refresh=True)
+    finally:
+        camera._CAMERAS.pop("side", None)
+        camera.set_camera_prober()
+
+    assert result["ok"]
+    assert sorted(probed) == [0, 2]
+    assert result["probed"] == 2
+    rows = {r["index"]: r for r in result["cameras"]}
+    assert sorted(rows) == [0, 1, 2]
+    assert rows[1]["in_use"] and rows[1]["alias"] == "side"
+    assert rows[1]["width"] == 1280
+
+
+def test_list_cameras_probes_camera_again_once_closed():
+    probed = []
+
+    def fake_probe(index):
+        probed.append(index)
+        return {"index": index, "open": True}
+
+    camera.set_camera_prober(fake_probe, lambda: [0, 1])
+    camera._CAMERAS["side"] = camera._Camera("side", 1, object(), {})
+    try:
+        camera.list_cameras(max_index=10)
+    finally:
+        camera._CAMERAS.pop("side", None)
+    try:
+        result = camera.list_cameras(max_index=10)
+    finally:
+        camera.set_camera_prober()
+
+    assert probed[0] == 0 and sorted(probed[1:]) == [0, 1]
+    assert not result["cached"]
+    assert all("in_use" not in r for r in result["cameras"])
+
+
+class _BlockingCap:
+    """Fake capture whose read() blocks until unblocked; tracks unsafe releases."""
+
+    def __init__(self):
+        import threading
+
+        self.reading = threading.Event()
+        self.unblock = threading.Event()
+        self.in_read = False
+        self.released_during_read = False
+        self.released = False
+
+    def read(self):
+        self.in_read = True
+        self.reading.set()
+        self.unblock.wait()
+        self.in_read = False
+        return False, None
+
+    def release(self):
+        self.released_during_read = self.in_read
+        self.released = True
+
+
+def test_close_does_not_release_during_blocked_read():
+    cap = _BlockingCap()
+    cam = camera._Camera("stuck", 7, cap, {})
+    camera._CAMERAS["stuck"] = cam
+    cam.grabber.start()
+    assert cap.reading.wait(2)
+
+    assert not cam.grabber.stop(timeout=0.05)
+    camera._close_cam(cam)
+    assert not cap.released
+    assert "stuck" not in camera._CAMERAS
+
+    cap.unblock.set()
+    cam.grabber.join(2)
+    assert cap.released and not cap.released_during_read
+
+
+def test_probe_time_does_not_grow_with_max_index():
+    import time
+
+    def slow_probe(index):
+        time.sleep(0.2)  # like a device open
+        return {"index": index, "open": index < 2}
+
+    camera.set_camera_prober(slow_probe, lambda: None)  # can't enumerate: probe all
+    try:
+        small = camera.list_cameras(max_index=10, refresh=True)
+        large = camera.list_cameras(max_index=100, refresh=True)
+    finally:
+        camera.set_camera_prober()
+
+    assert small["probed"] == 10 and large["probed"] == 100
+    assert small["elapsed_ms"] >= 200
+    assert large["elapsed_ms"] < small["elapsed_ms"] * 1.5 + 100
+
+
+def test_hung_probe_is_skipped_until_it_returns(monkeypatch):
+    import threading
+
+    release = threading.Event()
+
+    def probe(index):
+        if index == 1:
+            release.wait(10)
+        return {"index": index, "open": True}
+
+    monkeypatch.setattr(camera, "_PROBE_TIMEOUT_S", 0.2)
+    camera.set_camera_prober(probe, lambda: [0, 1])
+    try:
+        first = camera.list_cameras(max_index=10, refresh=True)
+        assert 1 in camera._HUNG
+        rows = {r["index"]: r for r in first["cameras"]}
+        assert rows[0]["open"] and "timed out" in rows[1]["error"]
+
+        second = camera.list_cameras(max_index=10, refresh=True)
+        assert second["elapsed_ms"] < 150  # the hung index is not waited on again
+        assert "still hung" in {r["index"]: r for r in second["cameras"]}[1]["error"]
+
+        release.set()
+        for _ in range(100):
+            if 1 not in camera._HUNG:
+                break
+            threading.Event().wait(0.01)
+        assert 1 not in camera._HUNG
+        third = camera.list_cameras(max_index=10, refresh=True)
+        assert {r["index"]: r for r in third["cameras"]}[1]["open"]
+    finally:
+        release.set()
+        camera.set_camera_prober()
+
+
+def test_burst_submits_are_bounded():
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    slots = threading.BoundedSemaphore(2)
+    pending = []
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        futures = []
+        for _ in range(6):
+            futures.append(camera._submit_bounded(pool, slots, time.sleep, 0.02))
+            pending.append(sum(not f.done() for f in futures))
+    assert max(pending) <= 2
+    assert all(f.done() for f in futures)
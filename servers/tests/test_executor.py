@@ -0,0 +1,37 @@
+import asyncio
+import threading
+
+from vision_mcp import executor
+
+
+def test_capture_tools_do_not_starve_short_tasks():
+    release = threading.Event()
+
+    def long_capture():
+        release.wait(5)
+        return "burst"
+
+    capture = executor.offload_capture(long_capture)
+
+    async def scenario():
+        bursts = [asyncio.create_task(capture()) for _ in range(8)]
+        await asyncio.sleep(0.05)
+        # Every capture thread is busy, yet short steps still run at once
+        short = await asyncio.wait_for(executor.run_blocking(sum, [1, 2, 3]), 1.0)
+        release.set()
+        return short, await asyncio.gather(*bursts)
+
+    short, bursts = asyncio.run(scenario())
+    assert short == 6
+    assert bursts == ["burst"] * 8
+
+
+def test_offload_keeps_tool_signature():
+    def tool(camera: str = "", n: int = 5) -> dict:
+        """Doc."""
+        return {}
+
+    for wrap in (executor.offload, executor.offload_capture):
+        wrapped = wrap(tool)
+        assert wrapped.__name__ == "tool" and wrapped.__doc__ == "Doc."
+        assert asyncio.iscoroutinefunction(wrapped)
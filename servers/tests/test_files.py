@@ -0,0 +1,61 @@
+import json
+import shutil
+
+import pytest
+
+from vision_mcp import files
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    path = tmp_path / "image_index.json"
+    monkeypatch.setattr(files, "_INDEX_PATH", path)
+    monkeypatch.setattr(files, "_INDEX", {})
+    monkeypatch.setattr(
+        files, "_STATE", {"loaded": True, "dirty": False, "dims_dirty": False, "saved": 0.0}
+    )
+    return path
+
+
+def _png(path):
+    from PIL import Image
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (4, 3)).save(path)
+
+
+def test_removed_directories_are_pruned(tmp_path, index):
+    root = tmp_path / "imgs"
+    _png(root / "a.png")
+    _png(root / "sub" / "deep" / "b.png")
+    assert files.list_images(str(root), recursive=True)["total"] == 2
+    assert len(json.loads(index.read_text())) == 3
+
+    shutil.rmtree(root / "sub")
+    assert files.list_images(str(root), recursive=True)["total"] == 1
+    assert list(json.loads(index.read_text())) == [str(root.resolve())]
+
+
+def test_probe_only_changes_are_throttled(tmp_path, index, monkeypatch):
+    root = tmp_path / "imgs"
+    for i in range(3):
+        _png(root / f"{i}.png")
+    files.list_images(str(root), limit=1)  # scan: written
+    first = index.stat().st_mtime_ns
+
+    writes = []
+    real_replace = files.os.replace
+    monkeypatch.setattr(files.os, "replace", lambda a, b: (writes.append(b), real_replace(a, b)))
+    files.list_images(str(root), offset=1, limit=1)  # probes one more header only
+    files.list_images(str(root), offset=2, limit=1)
+    assert writes == []
+    assert index.stat().st_mtime_ns == first
+
+
+def test_list_images_returns_everything_by_default(tmp_path):
+    root = tmp_path / "many"
+    for i in range(5):
+        _png(root / f"{i}.png")
+    listing = files.list_images(str(root))
+    assert listing["total"] == listing["count"] == 5
+    assert listing["next_offset"] is None
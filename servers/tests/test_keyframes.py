@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from vision_mcp import keyframes
+
+
+def _jpeg(value):
+    ok, buf = cv2.imencode(".jpg", np.full((96, 128, 3), value, np.uint8))
+    return buf.reshape(-1)
+
+
+def test_thumbnails_from_mixed_frames():
+    frames = [
+        np.full((96, 128, 3), 10, np.uint8),  # BGR
+        np.full((96, 128), 20, np.uint8),  # plain grayscale, not a JPEG buffer
+        _jpeg(30),  # MJPEG passthrough buffer
+        np.zeros(16, np.uint8),  # garbage: skipped
+    ]
+    thumbs, kept = keyframes.thumbnails_from_frames(frames)
+    assert kept == [0, 1, 2]
+    assert thumbs.shape == (3, 48, 64)
+    assert abs(int(thumbs[1].mean()) - 20) <= 1
+
+
+def test_still_burst_keeps_first_and_last():
+    thumbs = np.zeros((10, 48, 64), np.uint8)
+    assert keyframes.select_keyframes(thumbs) == [0, 9]
+    assert keyframes.select_keyframes(thumbs, max_frames=1) == [0]
+
+
+def test_small_motion_keeps_first_and_last():
+    thumbs = np.zeros((10, 48, 64), np.uint8)
+    thumbs[5:] = 1  # far below one motion budget
+    picked = keyframes.select_keyframes(thumbs)
+    assert picked[0] == 0 and picked[-1] == 9
+
+
+def _pushed(selector, frames):
+    picked = []
+    for i, frame in enumerate(frames):
+        picked += [j for j, _ in selector.push(i, frame)]
+    return picked + [j for j, _ in selector.finish()]
+
+
+def test_selector_matches_batch_selection_for_still_and_short_bursts():
+    still = [np.full((96, 128), 50, np.uint8)] * 10
+    assert _pushed(keyframes.KeyframeSelector(), still) == [0, 9]
+    assert _pushed(keyframes.KeyframeSelector(max_frames=3), still) == [0, 9]
+    assert _pushed(keyframes.KeyframeSelector(max_frames=1), still) == [0]
+    short = [np.full((96, 128), v, np.uint8) for v in (0, 40, 80)]
+    assert _pushed(keyframes.KeyframeSelector(max_frames=8), short) == [0, 1, 2]
+
+
+def test_selector_holds_a_bounded_number_of_frames():
+    frames = [np.full((96, 128), (i * 7) % 200, np.uint8) for i in range(300)]
+    selector = keyframes.KeyframeSelector(max_frames=5)
+    held = 0
+    for i, frame in enumerate(frames):
+        assert selector.push(i, frame) == []
+        held = max(held, len(selector._candidates))
+    picked = [j for j, _ in selector.finish()]
+    assert held <= 10
+    assert picked[0] == 0 and picked[-1] == 299 and len(picked) <= 5
+    assert picked == sorted(set(picked))
+
+
+def test_selector_without_max_frames_emits_as_motion_accumulates():
+    frames = [np.full((96, 128), 0, np.uint8)] * 3 + [np.full((96, 128), 100, np.uint8)] * 3
+    selector = keyframes.KeyframeSelector()
+    assert [j for j, _ in selector.push(0, frames[0])] == [0]
+    assert selector.push(1, frames[1]) == []
+    selector.push(2, frames[2])
+    assert [j for j, _ in selector.push(3, frames[3])] == [3]
+    selector.push(4, frames[4])
+    selector.push(5, frames[5])
+    assert [j for j, _ in selector.finish()] == [5]
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from vision_mcp import camera
+from vision_mcp.imaging import is_jpeg_buffer
+
+
+@pytest.fixture
+def mjpeg_avi(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 15.0, (160, 120))
+    if not writer.isOpened():
+        pytest.skip("OpenCV build cannot write MJPG AVI")
+    for i in range(10):
+        frame = np.full((120, 160, 3), i * 20, dtype=np.uint8)
+        cv2.rectangle(frame, (i * 10, 20), (i * 10 + 30, 60), (0, 0, 255), -1)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def test_recorded_mjpeg_stream_is_passed_through(mjpeg_avi, monkeypatch):
+    cap = cv2.VideoCapture(mjpeg_avi, cv2.CAP_FFMPEG)
+    if not cap.isOpened():
+        pytest.skip("OpenCV build has no FFMPEG backend")
+    try:
+        assert camera._enable_mjpeg_passthrough(cap)
+        ok, frame = cap.read()
+    finally:
+        cap.release()
+
+    assert ok and is_jpeg_buffer(frame)
+
+    def no_reencode(*args, **kwargs):
+        raise AssertionError("JPEG frame was re-encoded")
+
+    monkeypatch.setattr(cv2, "imencode", no_reencode)
+    ok, data, ext = camera._encode_image(frame, "jpg")
+
+    assert ok and ext == ".jpg"
+    assert data == frame.tobytes()
+    assert data[:2] == b"\xff\xd8"
+    decoded = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    assert decoded.shape == (120, 160, 3)
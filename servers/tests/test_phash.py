@@ -0,0 +1,35 @@
+import numpy as np
+
+from vision_mcp import phash
+
+
+def test_popcount_fallback_keeps_shape(monkeypatch):
+    x = np.array([[0, 1], [3, 0xFFFFFFFFFFFFFFFF]], dtype=np.uint64)
+    expected = np.array([[0, 1], [2, 64]])
+    if hasattr(np, "bitwise_count"):
+        assert (phash._popcount(x) == expected).all()
+        monkeypatch.delattr(np, "bitwise_count")
+    out = phash._popcount(x)
+    assert out.shape == (2, 2)
+    assert (out == expected).all()
+
+
+def test_duplicates_across_small_blocks(tmp_path, monkeypatch):
+    import cv2
+
+    rng = np.random.default_rng(0)
+    base = cv2.resize(rng.integers(0, 255, (8, 8, 3), dtype=np.uint8), (128, 128))
+    cv2.imwrite(str(tmp_path / "a.png"), base)
+    cv2.imwrite(str(tmp_path / "b.jpg"), base, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    for i in range(4):
+        other = cv2.resize(rng.integers(0, 255, (8, 8, 3), dtype=np.uint8), (128, 128))
+        cv2.imwrite(str(tmp_path / f"x{i}.png"), other)
+    # One row per block, the worst case for the block bookkeeping
+    monkeypatch.setattr(phash, "_BLOCK_CELLS", 1)
+
+    result = phash.image_duplicates(str(tmp_path), max_distance=6)
+
+    assert result["ok"] and result["scanned"] == 6
+    assert [sorted(p.rsplit("/", 1)[1] for p in g["paths"]) for g in result["groups"]] == [
+        ["a.png", "b.jpg"]
+    ]
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from vision_mcp import preview
+
+
+@pytest.mark.parametrize(
+    "frame",
+    [
+        np.full((96, 128, 3), 90, np.uint8),  # BGR
+        np.full((96, 128), 90, np.uint8),  # 2-D grayscale, not a JPEG buffer
+        cv2.imencode(".jpg", np.full((96, 128, 3), 90, np.uint8))[1].reshape(-1),  # MJPEG
+        cv2.imencode(".jpg", np.full((96, 128, 3), 90, np.uint8))[1].reshape(1, -1),
+    ],
+)
+def test_encode_handles_raw_and_jpeg_frames(frame):
+    data = preview._encode(frame)
+    assert data and data[:2] == b"\xff\xd8"
+    decoded = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
+    assert decoded is not None and abs(int(decoded.mean()) - 90) <= 3
+
+
+def test_preview_file_name_matches_capture_name():
+    assert preview._file_for("front cam/1") == "front_cam_1.jpg"
+    assert preview._file_for("***") == "_.jpg"
+    assert preview._file_for("") == "cam.jpg"
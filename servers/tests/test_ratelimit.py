@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+import pytest
+
+from vision_mcp import ratelimit
+
+
+class _ApiError(Exception):
+    def __init__(self, code, retry_after=None, details=None):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+        if retry_after is not None:
+            self.retry_after = retry_after
+        self.details = details
+
+
+class _Flaky:
+    """Async callable that raises the queued errors in turn, then returns "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self, *args, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(ratelimit, "_DEFAULT_RPM", 0.0)
+    monkeypatch.setattr(ratelimit, "_MAX_RETRIES", 3)
+    monkeypatch.setattr(ratelimit, "_backoff", lambda attempt: 0.0)
+    ratelimit.reset_stats()
+    yield
+    ratelimit.reset_stats()
+
+
+def _stats(model):
+    return ratelimit.gemini_stats()["models"][model]
+
+
+def test_transient_errors_are_retried_until_success():
+    fn = _Flaky(_ApiError(429), _ApiError(503))
+    assert asyncio.run(ratelimit.call_gemini("m", fn)) == "ok"
+    assert fn.calls == 3
+    stats = _stats("m")
+    assert stats["calls"] == 3
+    assert stats["throttled"] == 1
+    assert stats["retries"] == 2
+    assert stats["failures"] == 0
+
+
+def test_retries_stop_at_max_retries():
+    fn = _Flaky(*[_ApiError(503) for _ in range(10)])
+    with pytest.raises(_ApiError):
+        asyncio.run(ratelimit.call_gemini("m", fn))
+    assert fn.calls == ratelimit._MAX_RETRIES + 1
+    stats = _stats("m")
+    assert stats["retries"] == ratelimit._MAX_RETRIES
+    assert stats["failures"] == 1
+
+
+def test_client_errors_are_not_retried():
+    fn = _Flaky(_ApiError(400))
+    with pytest.raises(_ApiError):
+        asyncio.run(ratelimit.call_gemini("m", fn))
+    assert fn.calls == 1
+    stats = _stats("m")
+    assert stats["retries"] == 0 and stats["throttled"] == 0 and stats["failures"] == 1
+
+
+def test_retry_after_hints_are_honored():
+    fn = _Flaky(
+        _ApiError(429, retry_after=0.1),
+        _ApiError(429, details={"error": {"details": [{"retryDelay": "0.1s"}]}}),
+    )
+    t0 = time.perf_counter()
+    assert asyncio.run(ratelimit.call_gemini("m", fn)) == "ok"
+    assert time.perf_counter() - t0 >= 0.2
+    assert _stats("m")["throttled"] == 2
+
+
+def test_reset_stats_clears_counters():
+    asyncio.run(ratelimit.call_gemini("m", _Flaky(_ApiError(429))))
+    assert "m" in ratelimit.gemini_stats()["models"]
+    ratelimit.reset_stats()
+    assert ratelimit.gemini_stats()["models"] == {}
+
+
+def test_token_bucket_spaces_out_calls(monkeypatch):
+    # 600 requests/minute with no burst: one call every 0.1 s
+    monkeypatch.setenv(ratelimit._env_key("slow-model"), "600")
+    monkeypatch.setattr(ratelimit, "_BURST", 1.0)
+    fn = _Flaky()
+
+    async def calls():
+        for _ in range(4):
+            await ratelimit.call_gemini("slow-model", fn)
+
+    t0 = time.perf_counter()
+    asyncio.run(calls())
+    elapsed = time.perf_counter() - t0
+    assert 0.28 <= elapsed < 1.0
+    assert _stats("slow-model")["limiter_wait_s"] >= 0.25
@@ -0,0 +1,30 @@
+import asyncio
+
+import httpx
+
+from vision_mcp.server import _BearerAuth
+
+
+async def _app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def _get(headers):
+    async def go():
+        transport = httpx.ASGITransport(app=_BearerAuth(_app, "s3cret"))
+        async with httpx.AsyncClient(transport=transport, base_url="http://mcp") as client:
+            return await client.post("/mcp", headers=headers)
+
+    return asyncio.run(go())
+
+
+def test_requests_without_the_token_are_rejected():
+    assert _get({}).status_code == 401
+    assert _get({"Authorization": "Bearer wrong"}).status_code == 401
+    assert _get({"Authorization": "s3cret"}).status_code == 401
+
+
+def test_requests_with_the_token_pass_through():
+    resp = _get({"Authorization": "Bearer s3cret"})
+    assert resp.status_code == 200 and resp.text == "ok"
@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+
+SERVERS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("cv2", "numpy", "google.genai")
+
+
+def test_server_import_does_not_load_heavy_modules():
+    # A fresh interpreter: this test session has long since imported numpy
+    check = (
+        "import sys, vision_mcp.server, vision_mcp.keyframes; "
+        f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    )
+    env = {**os.environ, "PYTHONPATH": SERVERS_DIR}
+    out = subprocess.run(
+        [sys.executable, "-c", check], cwd=SERVERS_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    assert out.stdout.strip() == ""
@@ -0,0 +1,42 @@
+import asyncio
+import types
+
+from vision_mcp import uploads
+
+
+class _Files:
+    def __init__(self):
+        self.calls = 0
+
+    async def upload(self, file, config):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return types.SimpleNamespace(name="files/a", uri="https://files/a", state="ACTIVE")
+
+    async def get(self, name):
+        raise AssertionError("not processing")
+
+
+_GTYPES = types.SimpleNamespace(UploadFileConfig=lambda **kw: kw)
+
+
+def test_cancelled_caller_does_not_leave_pending_upload(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "_INDEX_PATH", tmp_path / "files.json")
+    monkeypatch.setattr(uploads, "_ENTRIES", {})
+    files = _Files()
+    client = types.SimpleNamespace(aio=types.SimpleNamespace(files=files))
+    data = b"x" * 1024
+
+    async def scenario():
+        caller = asyncio.ensure_future(uploads._remote_uri(client, _GTYPES, data, "image/png"))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        await asyncio.sleep(0.1)  # the shielded upload completes on its own
+        assert uploads._PENDING == {}
+
+        # Once the index entry expires, the next request uploads again
+        uploads._ENTRIES.clear()
+        return await uploads._remote_uri(client, _GTYPES, data, "image/png")
+
+    assert asyncio.run(scenario()) == "https://files/a"
+    assert files.calls == 2
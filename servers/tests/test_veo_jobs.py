@@ -0,0 +1,104 @@
+import asyncio
+import json
+import types
+
+import pytest
+
+from vision_mcp import veo_jobs
+
+
+class _ApiError(Exception):
+    def __init__(self, code):
+        super().__init__(f"{code} error")
+        self.code = code
+
+
+def _client(exc):
+    async def get(op):
+        raise exc
+
+    return types.SimpleNamespace(aio=types.SimpleNamespace(operations=types.SimpleNamespace(get=get)))
+
+
+_GTYPES = types.SimpleNamespace(GenerateVideosOperation=lambda name: name)
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    path = tmp_path / "jobs.jsonl"
+    monkeypatch.setattr(veo_jobs, "_REGISTRY_PATH", path)
+    monkeypatch.setattr(veo_jobs, "_JOBS", {})
+    monkeypatch.setitem(veo_jobs._STATE, "loaded", True)
+    return path
+
+
+def _lines(path):
+    return len(path.read_text().splitlines())
+
+
+def test_permanent_poll_error_fails_job(registry):
+    job = veo_jobs._save("j1", state="running", operation="operations/x")
+    asyncio.run(veo_jobs._poll_job(_client(_ApiError(404)), _GTYPES, job))
+
+    status = veo_jobs._summary(veo_jobs._get("j1"))
+    assert status["state"] == "failed"
+    assert "404" in status["error"]
+
+
+def test_transient_poll_error_is_persisted_once(registry):
+    job = veo_jobs._save("j2", state="running", operation="operations/x")
+    for _ in range(5):
+        asyncio.run(veo_jobs._poll_job(_client(ConnectionError("reset")), _GTYPES, job))
+
+    assert _lines(registry) == 2
+    status = veo_jobs._summary(veo_jobs._get("j2"))
+    assert status["state"] == "running"
+    assert "reset" in status["last_error"]
+
+
+def _write_registry(path, *records):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+
+def test_load_survives_failed_compaction(tmp_path, monkeypatch):
+    path = tmp_path / "jobs.jsonl"
+    _write_registry(path, *[{"id": "j3", "state": "running", "n": i} for i in range(5)])
+    monkeypatch.setattr(veo_jobs, "_REGISTRY_PATH", path)
+    monkeypatch.setattr(veo_jobs, "_JOBS", {})
+    monkeypatch.setitem(veo_jobs._STATE, "loaded", False)
+
+    def no_replace(src, dst):
+        raise PermissionError("read-only")
+
+    monkeypatch.setattr(veo_jobs.os, "replace", no_replace)
+    veo_jobs._load()
+
+    assert veo_jobs._get("j3")["n"] == 4
+    assert [p.name for p in tmp_path.iterdir()] == ["jobs.jsonl"]
+
+
+def test_resume_jobs_starts_poller_for_running_jobs(tmp_path, monkeypatch):
+    path = tmp_path / "jobs.jsonl"
+    _write_registry(
+        path,
+        {"id": "a", "state": "running", "operation": "operations/a"},
+        {"id": "b", "state": "done"},
+    )
+    monkeypatch.setattr(veo_jobs, "_REGISTRY_PATH", path)
+    monkeypatch.setattr(veo_jobs, "_JOBS", {})
+    monkeypatch.setitem(veo_jobs._STATE, "loaded", False)
+    monkeypatch.setitem(veo_jobs._STATE, "poller", None)
+    polled = []
+
+    async def fake_poller():
+        polled.extend(j["id"] for j in veo_jobs._running())
+
+    monkeypatch.setattr(veo_jobs, "_poller", fake_poller)
+
+    async def scenario():
+        resumed = veo_jobs.resume_jobs()
+        await veo_jobs._STATE["poller"]
+        return resumed
+
+    assert asyncio.run(scenario()) == 1
+    assert polled == ["a"]
@@ -1,17 +1,26 @@
 """ASL understanding: burst of frames -> transcript, assistant reply, ASL gloss."""
 
-import os
 import json
 import logging
-import mimetypes
 from typing import Any
 
+from .executor import run_blocking
+from .frames import load_image
+from .genai_client import GenAIUnavailable, get_client
+from .preprocess import prepare_images
+from .ratelimit import call_gemini
+
 log = logging.getLogger("vision_mcp.asl")
 
+_MODEL = "gemini-2.0-flash"
+
 
-def asl_understand(
+async def asl_understand(
     paths: list[str],
     style_hint: str = "friendly, concise",
+    select: str = "all",
+    max_frames: int = 0,
+    pack: str = "frames",
 ) -> dict[str, Any]:
     """Use Gemini (multimodal) to:
       1) Transcribe the user's signing (English).
@@ -19,21 +28,27 @@ def asl_understand(
       3) Return an ASL GLOSS (UPPERCASE gloss) of that reply for signing.
 
     Args:
-      paths: List of image file paths in chronological order.
+      paths: Image file paths or frame handles (from vision_burst) in
+        chronological order.
       style_hint: Style guidance for the assistant reply.
+      select: "all" sends every frame; "motion" keeps only keyframes where the
+        signing changes (near-identical frames are dropped).
+      max_frames: Upper bound on frames sent; > 0 implies select="motion".
+      pack: "frames" sends each frame as its own image; "sheet" tiles them into
+        numbered contact-sheet grid(s) and sends those instead.
 
-    Returns dict with: ok, transcript, assistant_reply, asl_gloss.
+    Returns dict with: ok, transcript, assistant_reply, asl_gloss, frames_sent,
+    bytes_saved (from downscaling oversized frames before upload).
     """
     try:
-        from google import genai
         from google.genai import types as gtypes
     except Exception as e:
         return {"ok": False, "error": f"google-genai not installed: {e}"}
 
-    api_key = os.environ.get("GEMINI_API_KEY")
-    if not api_key:
-        return {"ok": False, "error": "GEMINI_API_KEY not set in environment"}
-    client = genai.Client(api_key=api_key)
+    try:
+        client = get_client()
+    except GenAIUnavailable as e:
+        return {"ok": False, "error": str(e)}
 
     instruction = (
         "You are an expert ASL interpreter.\n"
@@ -54,20 +69,56 @@ def asl_understand(
     if style_hint:
         instruction += f"\nStyle hint for AssistantReply: {style_hint}"
 
-    parts: list = [gtypes.Part.from_text(text=instruction)]
+    frames: list[tuple[bytes, str]] = []
     for p in paths:
         try:
-            with open(p, "rb") as f:
-                data = f.read()
-            mt, _ = mimetypes.guess_type(p)
-            parts.append(gtypes.Part.from_bytes(data=data, mime_type=mt or "image/jpeg"))
+            frames.append(await run_blocking(load_image, p))
         except Exception as e:
             return {"ok": False, "error": f"read frame failed '{p}': {e}"}
 
+    selected = list(range(len(frames)))
+    if (select or "all").lower() == "motion" or max_frames > 0:
+        try:
+            from .keyframes import select_keyframes, thumbnails_from_bytes
+
+            thumbs = await run_blocking(
+                thumbnails_from_bytes, [data for data, _ in frames]
+            )
+            selected = await run_blocking(select_keyframes, thumbs, max_frames=max_frames)
+        except Exception as e:
+            return {"ok": False, "error": f"keyframe selection failed: {e}"}
+
+    images = [frames[i] for i in selected]
+    bytes_saved = 0
+    if (pack or "frames").lower() == "sheet":
+        try:
+            from .contact_sheet import build_contact_sheets, decode_images, encode_sheets
+
+            def _pack() -> list[bytes]:
+                decoded = decode_images([data for data, _ in images])
+                return encode_sheets(build_contact_sheets(decoded))
+
+            sheets = await run_blocking(_pack)
+        except Exception as e:
+            return {"ok": False, "error": f"contact sheet failed: {e}"}
+        images = [(data, "image/jpeg") for data in sheets]
+        instruction += (
+            "\nThe frames are tiled into numbered grid image(s); read cells in number "
+            "order (left->right, top->bottom, then the next image)."
+        )
+    else:
+        images, bytes_saved = await prepare_images(images)
+
+    parts: list = [gtypes.Part.from_text(text=instruction)]
+    for data, mt in images:
+        parts.append(gtypes.Part.from_bytes(data=data, mime_type=mt))
+
     raw = "{}"
     try:
-        res = client.models.generate_content(
-            model="gemini-2.0-flash",
+        res = await call_gemini(
+            _MODEL,
+            client.aio.models.generate_content,
+            model=_MODEL,
             contents=[gtypes.Content(role="user", parts=parts)],
             config=gtypes.GenerateContentConfig(
                 response_mime_type="application/json"
@@ -88,4 +139,8 @@ def asl_understand(
         "transcript": (obj.get("Transcript") or "").strip(),
         "assistant_reply": (obj.get("AssistantReply") or "").strip(),
         "asl_gloss": (obj.get("ASLGloss") or "").strip(),
+        "frames_sent": len(selected),
+        "frames_total": len(frames),
+        "images_sent": len(images),
+        "bytes_saved": bytes_saved,
     }
@@ -1,73 +1,143 @@
 """Nano Banana: AI image generation / transformation via Google Gemini Image Generation API."""
 
 import os
+import json
 import time
+import uuid
+import asyncio
 import logging
+import shutil
 import mimetypes
 from pathlib import Path
 from typing import Any
 
+try:
+    from mcp.server.fastmcp import Context
+except Exception:
+    from fastmcp import Context  # type: ignore
+
+from .cache import DiskCache, hash_key
+from .executor import run_blocking
+from .files import list_images
+from .frames import is_handle, load_image
+from .genai_client import GenAIUnavailable, get_client
+from .preprocess import prepare_images
+from .ratelimit import call_gemini
+from .uploads import forget, has_remote_refs, image_parts, inline_parts, is_stale_ref_error
+
 log = logging.getLogger("vision_mcp.banana")
 
+# Default cap on concurrent generate_content requests for n > 1
+_MAX_CONCURRENCY = int(os.environ.get("VISION_BANANA_CONCURRENCY", "4"))
 
-def banana_generate(
-    prompt: str,
-    input_paths: list[str] | None = None,
-    out_dir: str = "outputs",
-    model: str = "gemini-3-pro-image-preview",
-    n: int = 1,
-) -> dict[str, Any]:
-    """Generate image(s) from a text prompt, optionally guided by input image(s).
-    Saves files to out_dir and returns their paths.
+# Response cache keyed by hash(model, prompt, n, input bytes); LRU past the size
+# cap. VISION_BANANA_CACHE_MB=0 turns it off.
+_CACHE = DiskCache("banana", int(os.environ.get("VISION_BANANA_CACHE_MB", "512")) * 1024 * 1024)
 
-    Args:
-      prompt: Text instruction for the model.
-      input_paths: Optional list of image file paths (image-to-image).
-      out_dir: Directory to write generated files.
-      model: Gemini multimodal image generation model.
-      n: Desired number of images (best-effort; stream may emit 1+).
-    """
-    try:
-        from google import genai
-        from google.genai import types as gtypes
-    except Exception as e:
-        return {"ok": False, "error": f"google-genai not installed: {e}"}
 
-    api_key = os.environ.get("GEMINI_API_KEY")
-    if not api_key:
-        return {"ok": False, "error": "GEMINI_API_KEY not set in environment"}
+def _write_file(fpath: Path, data: bytes) -> None:
+    with open(fpath, "wb") as f:
+        f.write(data)
 
-    client = genai.Client(api_key=api_key)
 
-    parts: list = [gtypes.Part.from_text(text=prompt)]
-    input_paths = input_paths or []
+async def _load_inputs(input_paths: list[str]) -> list[tuple[bytes, str]]:
+    """Read each input image (paths or handles); raises ValueError naming the bad one."""
+    images = []
     for p in input_paths:
         try:
-            with open(p, "rb") as f:
-                data = f.read()
-            mt, _ = mimetypes.guess_type(p)
-            if not mt:
-                mt = "image/jpeg"
-            parts.append(gtypes.Part.from_bytes(data=data, mime_type=mt))
+            images.append(await run_blocking(load_image, p))
         except Exception as e:
-            return {"ok": False, "error": f"Failed to read input image '{p}': {e}"}
+            raise ValueError(f"Failed to read input image '{p}': {e}") from e
+    return images
 
-    contents = [gtypes.Content(role="user", parts=parts)]
-    config = gtypes.GenerateContentConfig(response_modalities=["IMAGE", "TEXT"])
 
-    out_dir_p = Path(os.path.expanduser(out_dir))
-    out_dir_p.mkdir(parents=True, exist_ok=True)
+def _build_contents(gtypes: Any, prompt: str, image_parts: list) -> list:
+    """Build the user turn: prompt text plus each input image part."""
+    parts: list = [gtypes.Part.from_text(text=prompt), *image_parts]
+    return [gtypes.Content(role="user", parts=parts)]
+
 
+async def _prepare_contents(
+    client: Any, gtypes: Any, prompt: str, images: list[tuple[bytes, str]]
+) -> tuple[list, list | None]:
+    """Contents referencing uploaded files where possible, plus the all-inline
+    equivalent to fall back on (None when nothing was uploaded)."""
+    contents = _build_contents(gtypes, prompt, await image_parts(client, gtypes, images))
+    if not has_remote_refs(contents):
+        return contents, None
+    return contents, _build_contents(gtypes, prompt, inline_parts(gtypes, images))
+
+
+def _cache_lookup(key: str, out_dir_p: Path) -> dict[str, Any] | None:
+    """Return a cached result, restoring files into out_dir_p if the originals are gone."""
+    hit = _CACHE.get(key)
+    if hit is None:
+        return None
+    meta, entry = hit
+    paths = meta.get("paths", [])
+    in_place = all(
+        os.path.exists(p) and Path(p).resolve().parent == out_dir_p.resolve() for p in paths
+    )
+    if not in_place:
+        ts = time.strftime("%Y%m%d_%H%M%S")
+        paths = []
+        for i, name in enumerate(meta.get("files", [])):
+            fpath = out_dir_p / f"banana_{ts}_cached_{i:02d}{Path(name).suffix}"
+            try:
+                shutil.copyfile(entry / name, fpath)
+            except OSError:
+                return None  # entry evicted underneath us: treat as a miss
+            paths.append(str(fpath))
+    return {"paths": paths, "text": meta.get("text", "")}
+
+
+def _cache_store(key: str, paths: list[str], text: str) -> None:
+    blobs: dict[str, bytes] = {}
+    for i, p in enumerate(paths):
+        with open(p, "rb") as f:
+            blobs[f"{i:02d}{Path(p).suffix}"] = f.read()
+    _CACHE.put(key, {"paths": paths, "text": text, "files": list(blobs)}, blobs)
+
+
+async def _generate_one(
+    client: Any,
+    model: str,
+    contents: list,
+    config: Any,
+    out_dir_p: Path,
+    request_index: int,
+    inline_contents: list | None = None,
+) -> dict[str, Any]:
+    """Run one generate_content request and save its images as soon as it returns.
+    If uploaded inputs were rejected (expired or deleted), retry once with
+    inline_contents."""
     saved: list[str] = []
     texts: list[str] = []
     file_index = 0
 
     try:
-        response = client.models.generate_content(
-            model=model, contents=contents, config=config
-        )
+        try:
+            response = await call_gemini(
+                model,
+                client.aio.models.generate_content,
+                model=model,
+                contents=contents,
+                config=config,
+            )
+        except Exception as e:
+            if inline_contents is None or not is_stale_ref_error(e):
+                raise
+            log.info("Uploaded input rejected (%s); retrying inline", e)
+            forget(contents)
+            response = await call_gemini(
+                model,
+                client.aio.models.generate_content,
+                model=model,
+                contents=inline_contents,
+                config=config,
+            )
     except Exception as e:
-        return {"ok": False, "error": f"Generation failed: {e}"}
+        return {"request": request_index, "ok": False, "error": f"Generation failed: {e}"}
 
     # Extract images and text from response parts
     cands = getattr(response, "candidates", []) or []
@@ -86,34 +156,293 @@ def banana_generate(
                 ext = mimetypes.guess_extension(mt) or ".png"
                 ts = time.strftime("%Y%m%d_%H%M%S")
                 ms = int((time.time() % 1) * 1000)
-                fname = f"banana_{ts}_{ms:03d}_{file_index:02d}{ext}"
+                fname = f"banana_{ts}_{ms:03d}_{request_index:02d}_{file_index:02d}{ext}"
                 fpath = out_dir_p / fname
                 file_index += 1
                 try:
-                    with open(fpath, "wb") as f:
-                        f.write(inline.data)
+                    await run_blocking(_write_file, fpath, inline.data)
                     saved.append(str(fpath))
                     log.info("Banana saved: %s", fpath)
                 except Exception as e:
                     return {
+                        "request": request_index,
                         "ok": False,
                         "error": f"Failed to save generated image: {e}",
+                        "paths": saved,
                     }
 
+    text = "\n".join(texts).strip() if texts else ""
     if not saved:
         return {
+            "request": request_index,
             "ok": False,
             "error": "Model returned no images. It may have returned text only.",
-            "text": "\n".join(texts).strip() if texts else "",
+            "text": text,
+        }
+    return {"request": request_index, "ok": True, "paths": saved, "text": text}
+
+
+async def banana_generate(
+    prompt: str,
+    input_paths: list[str] | None = None,
+    out_dir: str = "outputs",
+    model: str = "gemini-3-pro-image-preview",
+    n: int = 1,
+    max_concurrency: int = 0,
+    use_cache: bool = True,
+) -> dict[str, Any]:
+    """Generate image(s) from a text prompt, optionally guided by input image(s).
+    Saves files to out_dir and returns their paths. Large input images are
+    downscaled and re-encoded before sending (bytes_saved reports the savings).
+    Identical requests (same model, prompt, n and input image bytes) are
+    answered from a local cache.
+
+    Args:
+      prompt: Text instruction for the model.
+      input_paths: Optional list of image file paths or frame handles (image-to-image).
+      out_dir: Directory to write generated files.
+      model: Gemini multimodal image generation model.
+      n: Number of independent generations (variations) to request concurrently.
+      max_concurrency: Cap on requests in flight at once (0 = server default).
+      use_cache: Set false to force a fresh generation.
+    """
+    try:
+        from google.genai import types as gtypes
+    except Exception as e:
+        return {"ok": False, "error": f"google-genai not installed: {e}"}
+
+    try:
+        client = get_client()
+    except GenAIUnavailable as e:
+        return {"ok": False, "error": str(e)}
+
+    input_paths = input_paths or []
+    try:
+        images = await _load_inputs(input_paths)
+    except ValueError as e:
+        return {"ok": False, "error": str(e)}
+    images, bytes_saved = await prepare_images(images)
+    config = gtypes.GenerateContentConfig(response_modalities=["IMAGE", "TEXT"])
+
+    out_dir_p = Path(os.path.expanduser(out_dir))
+    out_dir_p.mkdir(parents=True, exist_ok=True)
+
+    total = max(1, int(n))
+    cache_key = ""
+    if use_cache:
+        cache_key = hash_key(model, prompt, str(total), *(data for data, _ in images))
+        hit = await run_blocking(_cache_lookup, cache_key, out_dir_p)
+        if hit is not None:
+            log.info("Banana cache hit %s", cache_key[:12])
+            return {
+                "ok": True,
+                "paths": hit["paths"],
+                "text": hit["text"],
+                "model": model,
+                "count": len(hit["paths"]),
+                "out_dir": str(out_dir_p),
+                "guided_by": input_paths,
+                "cached": True,
+                "bytes_saved": bytes_saved,
+            }
+
+    contents, inline_contents = await _prepare_contents(client, gtypes, prompt, images)
+    limit = max(1, int(max_concurrency) if max_concurrency > 0 else _MAX_CONCURRENCY)
+    sem = asyncio.Semaphore(limit)
+
+    async def _bounded(i: int) -> dict[str, Any]:
+        async with sem:
+            return await _generate_one(
+                client, model, contents, config, out_dir_p, i, inline_contents
+            )
+
+    results = await asyncio.gather(*(_bounded(i) for i in range(total)))
+
+    saved = [p for r in results for p in r.get("paths", [])]
+    texts = [r["text"] for r in results if r.get("text")]
+    errors = [r["error"] for r in results if not r["ok"]]
+
+    if not saved:
+        return {
+            "ok": False,
+            "error": "; ".join(dict.fromkeys(errors)),
+            "text": "\n".join(texts).strip(),
             "model": model,
+            **({"requests": results} if total > 1 else {}),
         }
 
-    return {
+    text = "\n".join(texts).strip()
+    if cache_key and not errors:
+        try:
+            await run_blocking(_cache_store, cache_key, saved, text)
+        except Exception as e:
+            log.warning("Banana cache store failed: %s", e)
+
+    result = {
         "ok": True,
         "paths": saved,
-        "text": "\n".join(texts).strip() if texts else "",
+        "text": text,
         "model": model,
         "count": len(saved),
         "out_dir": str(out_dir_p),
         "guided_by": input_paths,
+        "cached": False,
+        "bytes_saved": bytes_saved,
+    }
+    if total > 1:
+        result["requests"] = results
+        result["failed"] = len(errors)
+    return result
+
+
+_MANIFEST_NAME = "manifest.json"
+
+
+def _read_manifest(path: Path) -> dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(path: Path, manifest: dict[str, Any]) -> None:
+    # Unique per writer: two batches (or processes) sharing out_dir can't
+    # interleave into one temp file
+    tmp = path.with_suffix(f".tmp{os.getpid()}.{uuid.uuid4().hex[:8]}")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _item_key(p: str) -> str:
+    return p if is_handle(p) else str(Path(os.path.expanduser(p)).resolve())
+
+
+async def _report(ctx: Context | None, done: int, total: int, message: str) -> None:
+    if ctx is None:
+        return
+    try:
+        await ctx.report_progress(done, total)
+        await ctx.info(message)
+    except Exception:
+        pass  # progress is best-effort; clients without a progress token ignore it
+
+
+async def banana_batch(
+    prompt: str,
+    input_paths: list[str] | None = None,
+    directory: str = "",
+    recursive: bool = False,
+    out_dir: str = "outputs/batch",
+    model: str = "gemini-3-pro-image-preview",
+    max_concurrency: int = 0,
+    resume: bool = True,
+    ctx: Context | None = None,
+) -> dict[str, Any]:
+    """Apply one prompt to many images (each image transformed on its own).
+    Writes outputs plus a manifest.json (input -> outputs) to out_dir.
+
+    Args:
+      prompt: Text instruction applied to every image.
+      input_paths: Image file paths or frame handles.
+      directory: Optional directory whose images are added to input_paths.
+      recursive: Whether to include subdirectories of directory.
+      out_dir: Directory for generated files and the manifest.
+      model: Gemini multimodal image generation model.
+      max_concurrency: Cap on requests in flight at once (0 = server default).
+      resume: Skip inputs the manifest already records as done (same prompt/model).
+
+    Returns dict with: ok, manifest, total, done, skipped, failed, items.
+    """
+    try:
+        from google.genai import types as gtypes
+    except Exception as e:
+        return {"ok": False, "error": f"google-genai not installed: {e}"}
+
+    try:
+        client = get_client()
+    except GenAIUnavailable as e:
+        return {"ok": False, "error": str(e)}
+
+    inputs = list(input_paths or [])
+    if directory:
+        found = await run_blocking(list_images, directory, recursive, limit=0)
+        if not found.get("ok"):
+            return found
+        inputs.extend(img["path"] for img in found["images"])
+    inputs = list(dict.fromkeys(_item_key(p) for p in inputs))
+    if not inputs:
+        return {"ok": False, "error": "No input images given"}
+
+    out_dir_p = Path(os.path.expanduser(out_dir))
+    out_dir_p.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir_p / _MANIFEST_NAME
+
+    manifest = await run_blocking(_read_manifest, manifest_path) if resume else {}
+    if manifest.get("prompt") != prompt or manifest.get("model") != model:
+        manifest = {}
+    items: dict[str, Any] = manifest.get("items", {})
+    manifest = {"prompt": prompt, "model": model, "items": items}
+
+    def _is_done(key: str) -> bool:
+        rec = items.get(key) or {}
+        return bool(rec.get("ok")) and all(os.path.exists(p) for p in rec.get("paths", []))
+
+    todo = [(i, key) for i, key in enumerate(inputs) if not _is_done(key)]
+    skipped = len(inputs) - len(todo)
+    config = gtypes.GenerateContentConfig(response_modalities=["IMAGE", "TEXT"])
+
+    limit = max(1, int(max_concurrency) if max_concurrency > 0 else _MAX_CONCURRENCY)
+    sem = asyncio.Semaphore(limit)
+    lock = asyncio.Lock()
+    progress = {"done": skipped, "bytes_saved": 0}
+    await _report(ctx, skipped, len(inputs), f"{skipped} already done, {len(todo)} to go")
+
+    async def _run(i: int, key: str) -> None:
+        async with sem:
+            try:
+                images, saved = await prepare_images(await _load_inputs([key]))
+                progress["bytes_saved"] += saved
+                contents, inline_contents = await _prepare_contents(
+                    client, gtypes, prompt, images
+                )
+                res = await _generate_one(
+                    client, model, contents, config, out_dir_p, i, inline_contents
+                )
+            except Exception as e:
+                res = {"ok": False, "error": str(e)}
+        rec = {"ok": res["ok"], "paths": res.get("paths", []), "updated": time.time()}
+        if not res["ok"]:
+            rec["error"] = res.get("error", "")
+        async with lock:
+            items[key] = rec
+            progress["done"] += 1
+            await run_blocking(_write_manifest, manifest_path, manifest)
+        await _report(
+            ctx, progress["done"], len(inputs),
+            f"{'ok' if rec['ok'] else 'failed'}: {os.path.basename(key)}",
+        )
+
+    await asyncio.gather(*(_run(i, key) for i, key in todo))
+    if not todo:
+        await run_blocking(_write_manifest, manifest_path, manifest)
+
+    failed = [k for k in inputs if not (items.get(k) or {}).get("ok")]
+    log.info(
+        "Banana batch: %d inputs, %d skipped, %d failed", len(inputs), skipped, len(failed)
+    )
+    return {
+        "ok": len(failed) < len(inputs),
+        "manifest": str(manifest_path),
+        "total": len(inputs),
+        "done": len(inputs) - len(failed),
+        "skipped": skipped,
+        "bytes_saved": progress["bytes_saved"],
+        "failed": len(failed),
+        "items": {k: items.get(k) for k in inputs},
     }
@@ -0,0 +1,158 @@
+"""Content-addressed on-disk cache shared by concurrent server processes.
+
+Each entry is a directory named by its key holding a meta.json plus blob
+files. Entries are published with an atomic rename, so readers in other
+workers never see a half-written entry. A hit bumps meta.json's mtime, and
+eviction (oldest mtime first) runs under an advisory file lock once the
+cache grows past its byte budget. Each process keeps a running byte total,
+seeded by one scan and re-synced by every eviction, so a put only walks the
+cache directory when that total crosses the budget. A budget of 0 disables
+the cache: nothing is stored and every lookup misses.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+log = logging.getLogger("vision_mcp.cache")
+
+CACHE_ROOT = Path(
+    os.path.expanduser(os.environ.get("VISION_CACHE_DIR", os.path.join("outputs", ".cache")))
+)
+
+_META = "meta.json"
+
+
+def hash_key(*parts: bytes | str) -> str:
+    """sha256 over length-prefixed parts, so ("ab", "c") and ("a", "bc") differ."""
+    h = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()
+
+
+class DiskCache:
+    """Directory-per-entry cache bounded by total size with LRU eviction.
+
+    max_bytes <= 0 disables the cache.
+    """
+
+    def __init__(self, name: str, max_bytes: int, root: Path = CACHE_ROOT):
+        self.root = root / name
+        self.max_bytes = max(0, int(max_bytes))
+        # Bytes on disk as last scanned plus what this process has added since;
+        # None until the first put seeds it
+        self._total: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def get(self, key: str) -> Optional[Tuple[dict[str, Any], Path]]:
+        """Return (meta, entry_dir) for a hit, or None. Marks the entry recently used."""
+        if not self.enabled:
+            return None
+        entry = self._entry(key)
+        meta_path = entry / _META
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            return None
+        return meta, entry
+
+    def put(self, key: str, meta: dict[str, Any], blobs: dict[str, bytes]) -> Optional[Path]:
+        """Publish an entry atomically; if another worker won the race, keep theirs.
+
+        Returns the entry directory, or None when the cache is disabled.
+        """
+        if not self.enabled:
+            return None
+        entry = self._entry(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=entry.parent))
+        added = 0
+        try:
+            for name, data in blobs.items():
+                with open(tmp / name, "wb") as f:
+                    f.write(data)
+            with open(tmp / _META, "w", encoding="utf-8") as f:
+                json.dump({**meta, "created": time.time()}, f)
+            size = sum(p.stat().st_size for p in tmp.iterdir())
+            try:
+                os.rename(tmp, entry)
+                added = size
+            except OSError:
+                shutil.rmtree(tmp, ignore_errors=True)  # already cached by someone else
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._scan())
+            else:
+                self._total += added
+            over = self._total > self.max_bytes
+        if over:
+            self.evict()
+        return entry
+
+    def _scan(self) -> list[Tuple[float, int, Path]]:
+        entries = []
+        for shard in self.root.iterdir() if self.root.is_dir() else []:
+            if not shard.is_dir():
+                continue
+            for entry in shard.iterdir():
+                if entry.name.startswith(".tmp-"):
+                    continue
+                try:
+                    mtime = (entry / _META).stat().st_mtime
+                    size = sum(p.stat().st_size for p in entry.iterdir())
+                except OSError:
+                    continue
+                entries.append((mtime, size, entry))
+        return entries
+
+    def evict(self) -> int:
+        """Delete least recently used entries until under max_bytes; returns count."""
+        if not self.enabled:
+            return 0
+        self.root.mkdir(parents=True, exist_ok=True)
+        lock_path = self.root / ".lock"
+        with open(lock_path, "a+") as lock:
+            try:
+                import fcntl
+
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return 0  # another worker is already evicting
+            except ImportError:
+                pass  # no fcntl (Windows): single-process eviction is still correct
+            entries = self._scan()
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, entry in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+                removed += 1
+            with self._lock:
+                self._total = total
+        if removed:
+            log.info("Cache %s: evicted %d entries", self.root.name, removed)
+        return removed
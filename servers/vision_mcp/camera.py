@@ -1,48 +1,278 @@
-"""Camera control tools: list, open, status, capture, burst, stop."""
+"""Camera control tools: list, open, status, capture, burst, sync burst, stop.
+
+Several cameras can be open at once. Each lives in a registry keyed by alias
+(default: its index) with its own grabber thread and lock, so one camera's
+burst never waits on another's.
+"""
 
 import os
+import sys
+import glob
 import time
 import logging
+import threading
+from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Any, Tuple
+from typing import Optional, Any, Callable, Tuple, NamedTuple
+
+from .frames import put_frame
+from .imaging import is_jpeg_buffer, safe_name
+from .preview import ensure_publisher
 
 log = logging.getLogger("vision_mcp.camera")
 
-try:
-    import cv2
-except Exception as e:
-    log.error("OpenCV (cv2) not available: %s", e)
-    raise
-
-# Global camera handle (single-camera)
-_CAM: dict[str, Any] = {
-    "cap": None,
-    "index": None,
-    "props": {},
-}
+# OpenCV is imported on first camera use, not at server start-up, so
+# sessions that never touch a camera don't pay for it (or need it)
+_CV2: dict[str, Any] = {"checked": False, "error": None}
+
+
+def _cv2_error() -> Optional[str]:
+    """None if OpenCV is importable, else an error message (checked once)."""
+    if not _CV2["checked"]:
+        try:
+            import cv2  # noqa: F401
+        except Exception as e:
+            log.error("OpenCV (cv2) not available: %s", e)
+            _CV2["error"] = f"OpenCV (cv2) not available: {e}"
+        _CV2["checked"] = True
+    return _CV2["error"]
+
+# Number of most recent frames kept in memory by the grabber thread
+_RING_SIZE = 4
+
+# How long a tool waits for the grabber to deliver a frame
+_FRAME_TIMEOUT_S = 2.0
+
+
+class _Frame(NamedTuple):
+    seq: int
+    ts: float
+    image: Any
+
+
+class _FrameGrabber(threading.Thread):
+    """Drains the capture device continuously into a small timestamped ring buffer.
+
+    Tools read frames from memory instead of calling cap.read() themselves, so
+    they always see the newest frame and never pay the sensor read latency.
+    """
+
+    def __init__(self, cap: Any, ring_size: int = _RING_SIZE):
+        super().__init__(name="vision-grabber", daemon=True)
+        self.cap = cap
+        self.error = ""
+        self._frames: deque[_Frame] = deque(maxlen=max(1, ring_size))
+        self._cond = threading.Condition()
+        self._stop_evt = threading.Event()
+        self._paused = threading.Event()
+        self._idle = threading.Event()
+        self._seq = 0
+        # Hand-off of cap.release() when stop() gives up waiting for a read
+        self._exit_lock = threading.Lock()
+        self._exited = False
+        self._release_on_exit = False
+
+    def run(self) -> None:
+        try:
+            self._loop()
+        finally:
+            with self._exit_lock:
+                self._exited = True
+                release = self._release_on_exit
+            if release:
+                try:
+                    self.cap.release()
+                except Exception:
+                    pass
+                log.info("Grabber: released capture after its last read returned")
+
+    def _loop(self) -> None:
+        failures = 0
+        while not self._stop_evt.is_set():
+            if self._paused.is_set():
+                self._idle.set()
+                time.sleep(0.005)
+                continue
+            self._idle.clear()
+            try:
+                ok, image = self.cap.read()
+            except Exception as e:
+                ok, image = False, None
+                self.error = str(e)
+            if not ok or image is None:
+                failures += 1
+                if failures == 50:
+                    log.warning("Grabber: %d consecutive failed reads", failures)
+                time.sleep(0.01)
+                continue
+            failures = 0
+            ts = time.time()
+            with self._cond:
+                self._seq += 1
+                self._frames.append(_Frame(self._seq, ts, image))
+                self._cond.notify_all()
+
+    def latest(
+        self, after_seq: int = 0, timeout: float = _FRAME_TIMEOUT_S
+    ) -> Optional[_Frame]:
+        """Return the newest frame with seq > after_seq, waiting up to timeout."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not self._frames or self._frames[-1].seq <= after_seq:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop_evt.is_set():
+                    return None
+                self._cond.wait(remaining)
+            return self._frames[-1]
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            last = self._frames[-1] if self._frames else None
+            return {
+                "frames_grabbed": self._seq,
+                "last_frame_age_ms": (
+                    int((time.time() - last.ts) * 1000) if last else None
+                ),
+            }
+
+    def pause(self, timeout: float = _FRAME_TIMEOUT_S) -> bool:
+        """Stop reading so another thread can drive the device; True once idle."""
+        self._idle.clear()
+        self._paused.set()
+        return self._idle.wait(timeout) or not self.is_alive()
+
+    def resume(self) -> None:
+        self._paused.clear()
+
+    def stop(self, timeout: float = 2.0) -> bool:
+        """Stop the thread; True if it has exited and the caller may release cap.
+
+        Releasing a capture while another thread is inside cap.read() can
+        crash in native code, so when the thread is still stuck in a read
+        after timeout it is left to release the capture itself on exit.
+        """
+        self._stop_evt.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self.ident is None:
+            return True  # never started
+        self.join(timeout)
+        with self._exit_lock:
+            if self._exited:
+                return True
+            self._release_on_exit = True
+        return False
+
 
-# Backend map for portability
+# Per-device budget for list_cameras probes; a busy or broken index can hang open()
+_PROBE_TIMEOUT_S = float(os.environ.get("VISION_CAMERA_PROBE_TIMEOUT_S", "3"))
+
+# How long a camera inventory stays valid when devices can't be fingerprinted
+_INVENTORY_TTL_S = float(os.environ.get("VISION_CAMERA_INVENTORY_TTL_S", "30"))
+
+# Encoder/writer threads used by vision_burst (cv2.imencode releases the GIL)
+_BURST_WORKERS = max(2, min(4, os.cpu_count() or 2))
+# Frames queued or being encoded at once; past this the grab loop waits, so a
+# burst that outpaces its encoders can't pile raw frames up in memory
+_BURST_IN_FLIGHT = _BURST_WORKERS * 2
+
+
+class _Camera:
+    """One open capture device and its grabber.
+
+    lock serialises work that needs the device to itself (capture, burst,
+    synchronized burst, close) while other cameras carry on independently.
+    """
+
+    def __init__(self, alias: str, index: int, cap: Any, props: dict[str, Any]):
+        self.alias = alias
+        self.index = index
+        self.cap = cap
+        self.props = props
+        self.grabber = _FrameGrabber(cap)
+        self.lock = threading.RLock()
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "alias": self.alias,
+            "open": bool(self.cap is not None and self.cap.isOpened()),
+            "index": self.index,
+            "props": self.props,
+            "grabber": self.grabber.stats(),
+        }
+
+
+# Open cameras by alias, in opening order (the first one is the default);
+# _REG_LOCK guards the dict, each _Camera.lock guards its device
+_CAMERAS: dict[str, _Camera] = {}
+_OPENING: set[str] = set()
+_REG_LOCK = threading.RLock()
+
+# Backend map for portability (names of cv2 CAP_* constants)
 _BACKENDS = {
     "auto": None,
-    "avfoundation": getattr(cv2, "CAP_AVFOUNDATION", None),
-    "msmf": getattr(cv2, "CAP_MSMF", None),
-    "dshow": getattr(cv2, "CAP_DSHOW", None),
-    "v4l2": getattr(cv2, "CAP_V4L2", None),
+    "avfoundation": "CAP_AVFOUNDATION",
+    "msmf": "CAP_MSMF",
+    "dshow": "CAP_DSHOW",
+    "v4l2": "CAP_V4L2",
 }
 
 
-def _open_cam(
-    camera_index: int, width: int, height: int, fps: int, backend: str
-) -> Tuple[bool, str]:
-    if _CAM["cap"] is not None:
-        return True, "Camera already open"
+def _as_bgr(image: Any) -> Any:
+    """Decode an MJPEG passthrough buffer to BGR; BGR frames are returned as-is."""
+    if is_jpeg_buffer(image):
+        import cv2
+
+        return cv2.imdecode(image.reshape(-1), cv2.IMREAD_COLOR)
+    return image
+
+
+def _frame_dims(image: Any, props: dict[str, Any]) -> Tuple[int, int]:
+    """Return (width, height) of a frame, using the camera props for JPEG buffers."""
+    if is_jpeg_buffer(image):
+        return int(props.get("width", 0)), int(props.get("height", 0))
+    h, w = image.shape[:2]
+    return int(w), int(h)
 
-    be = backend.lower().strip() if backend else "auto"
-    api_pref = _BACKENDS.get(be, None)
+
+def _enable_mjpeg_passthrough(cap: Any) -> bool:
+    """Ask the backend for undecoded MJPEG frames; True if a probe read confirms it.
+
+    V4L2 honours CAP_PROP_CONVERT_RGB=0 and FFMPEG honours CAP_PROP_FORMAT=-1;
+    setting both covers webcams and recorded MJPEG streams. FFMPEG rejects the
+    FORMAT change once CONVERT_RGB is off, so FORMAT goes first.
+    """
+    import cv2
+
+    try:
+        cap.set(cv2.CAP_PROP_FORMAT, -1.0)
+        cap.set(cv2.CAP_PROP_CONVERT_RGB, 0.0)
+        ok, probe = cap.read()
+    except Exception as e:
+        log.info("MJPEG passthrough probe failed: %s", e)
+        return False
+    return bool(ok) and is_jpeg_buffer(probe)
+
+
+def _open_device(
+    camera_index: int,
+    width: int,
+    height: int,
+    fps: int,
+    be: str,
+    mjpeg: bool = False,
+) -> Tuple[Any, dict[str, Any] | str]:
+    """Open and configure a capture device; returns (cap, props) or (None, error)."""
+    import cv2
+
+    const = _BACKENDS.get(be)
+    api_pref = getattr(cv2, const, None) if const else None
 
     log.info(
-        "Opening camera index=%s backend=%s width=%s height=%s fps=%s",
-        camera_index, be, width, height, fps,
+        "Opening camera index=%s backend=%s width=%s height=%s fps=%s mjpeg=%s",
+        camera_index, be, width, height, fps, mjpeg,
     )
     if api_pref is None:
         cap = cv2.VideoCapture(camera_index)
@@ -50,8 +280,11 @@ def _open_cam(
         cap = cv2.VideoCapture(camera_index, api_pref)
 
     if not cap or not cap.isOpened():
-        return False, f"Failed to open camera index {camera_index} (backend={be})"
+        return None, f"Failed to open camera index {camera_index} (backend={be})"
 
+    if mjpeg:
+        # FOURCC must be negotiated before the frame size on V4L2
+        cap.set(cv2.CAP_PROP_FOURCC, float(cv2.VideoWriter_fourcc(*"MJPG")))
     if width > 0:
         cap.set(cv2.CAP_PROP_FRAME_WIDTH, float(width))
     if height > 0:
@@ -59,82 +292,553 @@ def _open_cam(
     if fps > 0:
         cap.set(cv2.CAP_PROP_FPS, float(fps))
 
-    actual = {
+    passthrough = False
+    if mjpeg:
+        passthrough = _enable_mjpeg_passthrough(cap)
+        if not passthrough:
+            # Backend decoded anyway or rejected the props: reopen on the normal path
+            log.info("MJPEG passthrough unavailable; falling back to decoded frames")
+            try:
+                cap.release()
+            except Exception:
+                pass
+            return _open_device(camera_index, width, height, fps, be)
+
+    return cap, {
         "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0),
         "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0),
         "fps": float(cap.get(cv2.CAP_PROP_FPS) or 0.0),
         "backend": be,
+        "mjpeg_passthrough": passthrough,
     }
-    _CAM["cap"] = cap
-    _CAM["index"] = camera_index
-    _CAM["props"] = actual
-    log.info("Camera open with props: %s", actual)
-    return True, "Camera opened"
 
 
-def _close_cam() -> None:
-    if _CAM["cap"] is not None:
-        try:
-            _CAM["cap"].release()
-        except Exception:
-            pass
-    _CAM["cap"] = None
-    _CAM["index"] = None
-    _CAM["props"] = {}
+def _open_cam(
+    camera_index: int,
+    width: int,
+    height: int,
+    fps: int,
+    backend: str,
+    mjpeg: bool = False,
+    alias: str = "",
+) -> Tuple[bool, str, Optional[_Camera]]:
+    alias = (alias or str(camera_index)).strip()
+    with _REG_LOCK:
+        if alias in _CAMERAS:
+            cam = _CAMERAS[alias]
+            if cam.index != camera_index:
+                return False, f"Alias '{alias}' is already camera index {cam.index}", None
+            return True, "Camera already open", cam
+        for cam in _CAMERAS.values():
+            if cam.index == camera_index:
+                return False, f"Camera index {camera_index} is already open as '{cam.alias}'", None
+        if alias in _OPENING:
+            return False, f"Camera '{alias}' is being opened", None
+        _OPENING.add(alias)
+
+    # Opening can take seconds; don't hold the registry while it happens
+    try:
+        be = backend.lower().strip() if backend else "auto"
+        cap, props = _open_device(camera_index, width, height, fps, be, mjpeg)
+        if cap is None:
+            return False, str(props), None
+        cam = _Camera(alias, camera_index, cap, props)
+        cam.grabber.start()
+        with _REG_LOCK:
+            _CAMERAS[alias] = cam
+        ensure_publisher(_preview_sources)
+        log.info("Camera '%s' open with props: %s", alias, props)
+        return True, "Camera opened", cam
+    finally:
+        with _REG_LOCK:
+            _OPENING.discard(alias)
+
+
+def _close_cam(cam: _Camera) -> None:
+    with cam.lock:
+        if cam.grabber.stop():
+            try:
+                cam.cap.release()
+            except Exception:
+                pass
+        else:
+            log.warning(
+                "Camera '%s': grabber still blocked in read; it will release the device",
+                cam.alias,
+            )
+        with _REG_LOCK:
+            if _CAMERAS.get(cam.alias) is cam:
+                del _CAMERAS[cam.alias]
+
+
+def _preview_sources() -> list[Tuple[str, Any, dict]]:
+    """Open cameras for the preview publisher, default camera first."""
+    with _REG_LOCK:
+        return [(cam.alias, cam.grabber, cam.props) for cam in _CAMERAS.values()]
 
 
-def _grab_frame() -> Tuple[bool, Optional[Any], str]:
-    cap = _CAM["cap"]
-    if cap is None or not cap.isOpened():
+def _resolve(camera: str = "") -> Tuple[Optional[_Camera], str]:
+    """Find an open camera by alias or index; "" means the default (first opened)."""
+    key = str(camera).strip() if camera is not None else ""
+    with _REG_LOCK:
+        if not _CAMERAS:
+            return None, "Camera not open"
+        if not key:
+            return next(iter(_CAMERAS.values())), "ok"
+        if key in _CAMERAS:
+            return _CAMERAS[key], "ok"
+        for cam in _CAMERAS.values():
+            if str(cam.index) == key:
+                return cam, "ok"
+        return None, f"Camera '{key}' not open (open: {', '.join(_CAMERAS)})"
+
+
+def _grab_frame(cam: _Camera, after_seq: int = 0) -> Tuple[bool, Optional[_Frame], str]:
+    """Take the newest buffered frame (newer than after_seq) from the grabber."""
+    grabber = cam.grabber
+    if not grabber.is_alive():
         return False, None, "Camera not open"
-    ok, frame = cap.read()
-    if not ok or frame is None:
-        return False, None, "Failed to read frame"
+    frame = grabber.latest(after_seq)
+    if frame is None:
+        return False, None, grabber.error or "Failed to read frame"
     return True, frame, "ok"
 
 
 def _encode_image(frame: Any, fmt: str) -> Tuple[bool, bytes, str]:
     ext = ".jpg" if fmt.lower() == "jpg" else ".png"
+    if is_jpeg_buffer(frame):
+        if ext == ".jpg":
+            # Zero-transcode: the camera already delivered JPEG bytes
+            return True, frame.tobytes(), ext
+        frame = _as_bgr(frame)
+        if frame is None:
+            return False, b"", "MJPEG decode failed"
+    import cv2
+
     ok, buf = cv2.imencode(ext, frame)
     if not ok:
         return False, b"", "cv2.imencode failed"
     return True, buf.tobytes(), ext
 
 
+def _store_frame(image: Any, fmt: str, fpath: Optional[Path]) -> Tuple[str, str]:
+    """Encode one frame into the frame store and optionally write it to fpath.
+
+    Returns (handle, path); path is "" when not persisted. Runs on the burst
+    worker pool.
+    """
+    ok, img_bytes, ext = _encode_image(image, fmt)
+    if not ok:
+        raise RuntimeError(ext)
+    handle = put_frame(img_bytes, "image/jpeg" if ext == ".jpg" else "image/png")
+    if fpath is None:
+        return handle, ""
+    with open(fpath, "wb") as f:
+        f.write(img_bytes)
+    return handle, str(fpath)
+
+
+def _submit_bounded(
+    pool: ThreadPoolExecutor, slots: threading.BoundedSemaphore, fn: Callable, *args: Any
+) -> Any:
+    """pool.submit that first waits for one of slots, freed when the task ends."""
+    slots.acquire()
+    try:
+        fut = pool.submit(fn, *args)
+    except BaseException:
+        slots.release()
+        raise
+    fut.add_done_callback(lambda _: slots.release())
+    return fut
+
+
+def _interval_stats(timestamps: list[float], period_ms: int) -> dict[str, Any]:
+    intervals = [
+        round((b - a) * 1000.0, 1) for a, b in zip(timestamps, timestamps[1:])
+    ]
+    if not intervals:
+        return {"intervals_ms": [], "mean_interval_ms": 0.0, "max_jitter_ms": 0.0}
+    return {
+        "intervals_ms": intervals,
+        "mean_interval_ms": round(sum(intervals) / len(intervals), 1),
+        "max_jitter_ms": round(max(abs(x - period_ms) for x in intervals), 1),
+    }
+
+
 def _timestamp_name(prefix: str = "frame", ext: str = ".jpg") -> str:
     ts = time.strftime("%Y%m%d_%H%M%S")
     ms = int((time.time() % 1) * 1000)
     return f"{prefix}_{ts}_{ms:03d}{ext}"
 
 
-# --------------- MCP Tool Functions ---------------
+def _burst_name(stamp: str, ts: float, i: int, ext: str) -> str:
+    return f"burst_{stamp}_{int((ts % 1) * 1000):03d}_{i:02d}{ext}"
+
+
+def _video_devices() -> Optional[list[int]]:
+    """Indexes of V4L2 capture nodes, or None off Linux (indexes can't be listed).
+
+    UVC cameras also expose metadata nodes; sysfs marks the capture node with
+    index 0, so the others are skipped when that is readable.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    indexes = []
+    for path in glob.glob("/dev/video*"):
+        name = os.path.basename(path)
+        if not name[5:].isdigit():
+            continue
+        try:
+            with open(f"/sys/class/video4linux/{name}/index", "r") as f:
+                if f.read().strip() not in ("", "0"):
+                    continue
+        except OSError:
+            pass
+        indexes.append(int(name[5:]))
+    return sorted(indexes)
+
+
+def _device_fingerprint(devices: Optional[list[int]]) -> Any:
+    """Changes whenever a /dev/video node is added, removed or re-created."""
+    if devices is None:
+        return None
+    stamp = []
+    for i in devices:
+        try:
+            st = os.stat(f"/dev/video{i}")
+            stamp.append((i, st.st_rdev, st.st_ctime_ns))
+        except OSError:
+            stamp.append((i, None, None))
+    return tuple(stamp)
+
+
+def _probe_index(index: int) -> dict[str, Any]:
+    """Open one camera index and read its default properties."""
+    import cv2
+
+    cap = None
+    try:
+        cap = cv2.VideoCapture(index)
+        if not (cap and cap.isOpened()):
+            return {"index": index, "open": False}
+        return {
+            "index": index,
+            "open": True,
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0),
+            "fps": float(cap.get(cv2.CAP_PROP_FPS) or 0.0),
+        }
+    except Exception as e:
+        return {"index": index, "open": False, "error": str(e)}
+    finally:
+        try:
+            if cap:
+                cap.release()
+        except Exception:
+            pass
+
+
+# Device enumeration and probing; swapped out by set_camera_prober() for fakes
+_PROBER: dict[str, Callable[..., Any]] = {
+    "probe": _probe_index,
+    "devices": _video_devices,
+}
+
+# Cached list_cameras inventory, keyed by (max_index, device fingerprint)
+_INVENTORY: dict[str, Any] = {"key": None, "ts": 0.0, "cameras": []}
+_INVENTORY_LOCK = threading.Lock()
+
+# Indexes whose earlier probe timed out and is still stuck in open()
+_HUNG: set[int] = set()
+
+
+def set_camera_prober(
+    probe: Optional[Callable[[int], dict[str, Any]]] = None,
+    devices: Optional[Callable[[], Optional[list[int]]]] = None,
+) -> None:
+    """Install a probe (index -> result dict) and device enumerator, e.g. fakes.
+
+    Passing None restores the OpenCV / /dev/video defaults. Clears the cache.
+    """
+    _PROBER["probe"] = probe or _probe_index
+    _PROBER["devices"] = devices or _video_devices
+    with _INVENTORY_LOCK:
+        _INVENTORY.update(key=None, ts=0.0, cameras=[])
 
 
-def list_cameras(max_index: int = 10) -> dict[str, Any]:
-    """Probe camera indexes 0..max_index-1; return which are openable."""
-    results = []
-    for i in range(max_index):
+def _probe_all(indexes: list[int]) -> list[dict[str, Any]]:
+    """Probe indexes concurrently on daemon threads with a shared deadline.
+
+    Daemon threads (not a pool) so a probe stuck in the driver never blocks
+    shutdown; an index still stuck from an earlier call is not probed again.
+    """
+    probe = _PROBER["probe"]
+    results: dict[int, dict[str, Any]] = {}
+    threads: dict[int, threading.Thread] = {}
+
+    def _run(i: int) -> None:
         try:
-            cap = cv2.VideoCapture(i)
-            ok = bool(cap and cap.isOpened())
-            if ok:
-                w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
-                h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
-                fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
-                results.append(
-                    {"index": i, "open": True, "width": w, "height": h, "fps": fps}
-                )
-            else:
-                results.append({"index": i, "open": False})
+            results[i] = probe(i)
         except Exception as e:
-            results.append({"index": i, "open": False, "error": str(e)})
+            results[i] = {"index": i, "open": False, "error": str(e)}
         finally:
-            try:
-                if "cap" in locals() and cap:
-                    cap.release()
-            except Exception:
-                pass
-    return {"cameras": results}
+            _HUNG.discard(i)
+
+    for i in indexes:
+        if i in _HUNG:
+            continue
+        t = threading.Thread(target=_run, args=(i,), name=f"vision-probe-{i}", daemon=True)
+        threads[i] = t
+        t.start()
+    deadline = time.monotonic() + _PROBE_TIMEOUT_S
+    for t in threads.values():
+        t.join(max(0.0, deadline - time.monotonic()))
+
+    out = []
+    for i in indexes:
+        if i in results:
+            out.append(results[i])
+        elif i in threads:
+            _HUNG.add(i)
+            out.append({
+                "index": i,
+                "open": False,
+                "error": f"probe timed out after {_PROBE_TIMEOUT_S:g}s",
+            })
+        else:
+            out.append({"index": i, "open": False, "error": "previous probe still hung"})
+    return out
+
+
+def _burst(
+    cam: _Camera,
+    n: int,
+    period_ms: int,
+    save_dir: str,
+    format: str,
+    warmup: int,
+    duration_ms: int,
+    persist: bool,
+    select: str,
+    max_frames: int,
+) -> dict[str, Any]:
+    ok, first, msg = _grab_frame(cam)
+    if not ok:
+        return {"ok": False, "error": msg}
+
+    if duration_ms and duration_ms > 0:
+        n = max(1, int(round(float(duration_ms) / float(period_ms))))
+
+    last_seq = first.seq
+    for _ in range(max(0, int(warmup))):
+        ok, frame, msg = _grab_frame(cam, last_seq)
+        if not ok:
+            return {"ok": False, "error": f"Failed to read frame: {msg}"}
+        last_seq = frame.seq
+
+    out_dir = Path(os.path.expanduser(save_dir))
+    if persist:
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+    ext = ".jpg" if format.lower() == "jpg" else ".png"
+    mime = "image/jpeg" if ext == ".jpg" else "image/png"
+    width, height = _frame_dims(first.image, cam.props)
+
+    period_s = max(0.0, float(period_ms) / 1000.0)
+    total = max(1, int(n))
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+
+    # Keyframes are scored as frames arrive; only the ones still in the running are held
+    selector = None
+    if (select or "all").lower() == "motion" or max_frames > 0:
+        from .keyframes import KeyframeSelector
+
+        selector = KeyframeSelector(max_frames=max_frames)
+    selected: list[int] = []
+
+    # Producer: grab raw frames on schedule. Consumers: encode + write in parallel,
+    # so slow encodes (PNG, large frames) only hold the capture loop back once
+    # _BURST_IN_FLIGHT frames are waiting on them.
+    timestamps: list[float] = []
+    futures = []
+    error = ""
+    slots = threading.BoundedSemaphore(_BURST_IN_FLIGHT)
+
+    def store(i: int, image: Any) -> None:
+        fpath = None
+        if persist:
+            fpath = out_dir / _burst_name(stamp, timestamps[i], i, ext)
+        futures.append(_submit_bounded(pool, slots, _store_frame, image, format, fpath))
+
+    with ThreadPoolExecutor(
+        max_workers=_BURST_WORKERS, thread_name_prefix="vision-burst"
+    ) as pool:
+        t0 = time.perf_counter()
+        for i in range(total):
+            target = t0 + i * period_s
+            now = time.perf_counter()
+            if target > now:
+                time.sleep(target - now)
+
+            # Each tick takes a frame the grabber delivered after the previous one
+            ok, frame, msg = _grab_frame(cam, last_seq)
+            if not ok or frame is None:
+                error = f"Failed to read frame: {msg}"
+                break
+            last_seq = frame.seq
+            timestamps.append(frame.ts)
+
+            keep = [(i, frame.image)] if selector is None else selector.push(i, frame.image)
+            for j, image in keep:
+                selected.append(j)
+                store(j, image)
+
+        if selector is not None and not error:
+            for j, image in selector.finish():
+                selected.append(j)
+                store(j, image)
+            if not selected:
+                error = "No decodable frames to select keyframes from"
+
+    handles: list[str] = []
+    paths: list[str] = []
+    for i, fut in enumerate(futures):
+        try:
+            handle, path = fut.result()
+        except Exception as e:
+            error = error or f"Failed to write frame {i}: {e}"
+            break
+        handles.append(handle)
+        if path:
+            paths.append(path)
+    log.info("Burst captured %d/%d frames (persist=%s)", len(handles), total, persist)
+
+    stats = _interval_stats(timestamps, period_ms)
+    if error:
+        return {"ok": False, "error": error, "handles": handles, "paths": paths, **stats}
+
+    return {
+        "ok": True,
+        "camera": cam.alias,
+        "handles": handles,
+        "paths": paths,
+        "mime": mime,
+        "width": int(width),
+        "height": int(height),
+        "n": len(handles),
+        "period_ms": period_ms,
+        "duration_ms": duration_ms,
+        "save_dir": str(out_dir) if persist else "",
+        **(
+            {"selected_indices": selected, "frames_grabbed": len(timestamps)}
+            if selector is not None else {}
+        ),
+        **stats,
+    }
+
+
+def _drain(cams: list[_Camera], max_rounds: int = 8) -> None:
+    """Grab and discard until grab() has to wait, so no device hands back a
+    frame that sat in its driver queue while the grabber was paused."""
+    fps = min((c.props.get("fps") or 30.0) for c in cams)
+    fresh_s = 0.5 / max(1.0, fps)
+    for _ in range(max_rounds):
+        t = time.perf_counter()
+        for cam in cams:
+            cam.cap.grab()
+        if time.perf_counter() - t >= fresh_s:
+            return
+
+
+def _sync_grab(
+    cams: list[_Camera], total: int, period_s: float
+) -> Tuple[list[Tuple[list[float], list[Any]]], str]:
+    """Capture `total` synchronized sets: grab() every device back-to-back, then
+    retrieve() them, so decoding never sits between two cameras' grabs.
+
+    Grab rounds run continuously to keep driver queues drained; the round
+    following each tick is retrieved. Returns ([(timestamps, images)], error).
+    """
+    sets: list[Tuple[list[float], list[Any]]] = []
+    _drain(cams)
+    next_tick = time.perf_counter()
+    deadline = next_tick + total * period_s + 5.0 * _FRAME_TIMEOUT_S
+    while len(sets) < total:
+        stamps = []
+        for cam in cams:
+            if not cam.cap.grab():
+                return sets, f"grab failed on camera '{cam.alias}'"
+            stamps.append(time.time())
+        now = time.perf_counter()
+        if now > deadline:
+            return sets, "synchronized burst timed out"
+        if now < next_tick:
+            continue
+        images = []
+        for cam in cams:
+            ok, image = cam.cap.retrieve()
+            if not ok or image is None:
+                return sets, f"retrieve failed on camera '{cam.alias}'"
+            images.append(image)
+        sets.append((stamps, images))
+        next_tick += period_s
+    return sets, ""
+
+
+# --------------- MCP Tool Functions ---------------
+
+
+def list_cameras(max_index: int = 10, refresh: bool = False) -> dict[str, Any]:
+    """Probe camera indexes 0..max_index-1 concurrently; return which are openable.
+
+    On Linux only existing /dev/video* capture nodes are probed. The result
+    is cached until the device set changes (or refresh=True), and each probe
+    is bounded by a timeout so one hung device can't stall the listing.
+    """
+    if _PROBER["probe"] is _probe_index and (err := _cv2_error()):
+        return {"ok": False, "error": err, "cameras": []}
+    t0 = time.monotonic()
+    devices = _PROBER["devices"]()
+    # Open cameras are never probed (their grabber owns the device); they are
+    # reported from the registry instead
+    with _REG_LOCK:
+        in_use = {cam.index: cam for cam in _CAMERAS.values() if 0 <= cam.index < max_index}
+    candidates = sorted(
+        i for i in (range(max_index) if devices is None else devices)
+        if 0 <= i < max_index and i not in in_use
+    )
+    key = (max_index, _device_fingerprint(devices), frozenset(in_use))
+
+    with _INVENTORY_LOCK:
+        inv = _INVENTORY
+        fresh = (
+            not refresh
+            and inv["key"] == key
+            and (devices is not None or time.monotonic() - inv["ts"] < _INVENTORY_TTL_S)
+        )
+        if fresh:
+            results, cached = [dict(r) for r in inv["cameras"]], True
+        else:
+            results, cached = _probe_all(candidates), False
+            inv.update(key=key, ts=time.monotonic(), cameras=[dict(r) for r in results])
+
+    for index, cam in in_use.items():
+        results.append({
+            "index": index,
+            "open": True,
+            "in_use": True,
+            "alias": cam.alias,
+            **{k: cam.props[k] for k in ("width", "height", "fps") if k in cam.props},
+        })
+    results.sort(key=lambda r: r["index"])
+
+    return {
+        "ok": True,
+        "cameras": results,
+        "cached": cached,
+        "probed": 0 if cached else len(candidates),
+        "elapsed_ms": int((time.monotonic() - t0) * 1000),
+    }
 
 
 def vision_start(
@@ -143,53 +847,92 @@ def vision_start(
     height: int = 480,
     fps: int = 15,
     backend: str = "auto",
+    mjpeg: bool = False,
+    alias: str = "",
 ) -> dict[str, Any]:
-    """Open the camera with optional size/fps/backend.
-    backend: auto, avfoundation, msmf, dshow, v4l2"""
-    ok, msg = _open_cam(camera_index, width, height, fps, backend)
-    return {"ok": ok, "message": msg, "props": _CAM["props"], "index": _CAM["index"]}
-
-
-def vision_status() -> dict[str, Any]:
-    """Report whether camera is open and its properties."""
-    cap = _CAM["cap"]
+    """Open a camera with optional size/fps/backend and start its frame grabber.
+    Several cameras can be open at once; each is addressed by alias (default:
+    its index) in the other camera tools.
+    backend: auto, avfoundation, msmf, dshow, v4l2
+    mjpeg: request MJPG from the device and keep its compressed frames, so jpg
+    captures and bursts are written without a decode/re-encode. Falls back to
+    decoded frames when the device or backend can't deliver MJPEG
+    (props.mjpeg_passthrough reports which path is active).
+    alias: name for this camera, e.g. "signer" or "face"."""
+    err = _cv2_error()
+    if err:
+        return {"ok": False, "message": err, "props": {}, "index": None}
+    ok, msg, cam = _open_cam(camera_index, width, height, fps, backend, mjpeg, alias)
+    if cam is None:
+        return {"ok": ok, "message": msg, "props": {}, "index": None}
     return {
-        "open": bool(cap is not None and cap.isOpened()),
-        "index": _CAM["index"],
-        "props": _CAM["props"],
+        "ok": ok,
+        "message": msg,
+        "props": cam.props,
+        "index": cam.index,
+        "alias": cam.alias,
     }
 
 
+def vision_status(camera: str = "") -> dict[str, Any]:
+    """Report whether a camera is open and its properties.
+    camera: alias or index; "" reports the default camera plus a list of all
+    open cameras."""
+    if camera:
+        cam, msg = _resolve(camera)
+        if cam is None:
+            return {"open": False, "error": msg}
+        return cam.status()
+    with _REG_LOCK:
+        cams = list(_CAMERAS.values())
+    if not cams:
+        return {"open": False, "index": None, "props": {}, "cameras": []}
+    return {**cams[0].status(), "cameras": [c.status() for c in cams]}
+
+
 def vision_capture(
     save_dir: str = "outputs",
     format: str = "jpg",
+    persist: bool = True,
+    camera: str = "",
 ) -> dict[str, Any]:
-    """Capture one frame. Saves to save_dir and returns the saved path and metadata."""
-    ok, frame, msg = _grab_frame()
+    """Capture one frame. Returns a frame handle (usable wherever an image path is
+    accepted) and, when persist is true, the path saved under save_dir.
+    camera: alias or index of the camera to use ("" = default)."""
+    cam, msg = _resolve(camera)
+    if cam is None:
+        return {"ok": False, "error": msg}
+    with cam.lock:
+        ok, frame, msg = _grab_frame(cam)
     if not ok:
         return {"ok": False, "error": msg}
 
-    ok2, img_bytes, ext = _encode_image(frame, format)
-    if not ok2:
-        return {"ok": False, "error": ext}
-
-    out_dir = Path(os.path.expanduser(save_dir))
-    out_dir.mkdir(parents=True, exist_ok=True)
-    fname = _timestamp_name("frame", ext)
-    fpath = out_dir / fname
+    fpath = None
+    if persist:
+        out_dir = Path(os.path.expanduser(save_dir))
+        out_dir.mkdir(parents=True, exist_ok=True)
+        ext = ".jpg" if format.lower() == "jpg" else ".png"
+        fpath = out_dir / _timestamp_name("frame", ext)
     try:
-        with open(fpath, "wb") as f:
-            f.write(img_bytes)
-    except Exception as e:
+        handle, path = _store_frame(frame.image, format, fpath)
+    except OSError as e:
         return {"ok": False, "error": f"Failed to write file: {e}"}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
 
-    return {
+    w, h = _frame_dims(frame.image, cam.props)
+    result = {
+        "camera": cam.alias,
         "ok": True,
-        "path": str(fpath),
-        "mime": "image/jpeg" if ext == ".jpg" else "image/png",
-        "width": int(_CAM["props"].get("width", 0)),
-        "height": int(_CAM["props"].get("height", 0)),
+        "handle": handle,
+        "mime": "image/jpeg" if format.lower() == "jpg" else "image/png",
+        "width": int(w),
+        "height": int(h),
+        "timestamp": frame.ts,
     }
+    if path:
+        result["path"] = path
+    return result
 
 
 def vision_burst(
@@ -197,77 +940,154 @@ def vision_burst(
     period_ms: int = 150,
     save_dir: str = "outputs",
     format: str = "jpg",
-    warmup: int = 3,
+    warmup: int = 0,
     duration_ms: int = 0,
+    persist: bool = True,
+    select: str = "all",
+    max_frames: int = 0,
+    camera: str = "",
 ) -> dict[str, Any]:
-    """Capture N frames spaced by period_ms and return their file paths (chronological).
-    If duration_ms > 0, n is computed as round(duration_ms / period_ms)."""
-    cap = _CAM["cap"]
-    if cap is None or not cap.isOpened():
-        return {"ok": False, "error": "Camera not open"}
-
-    if duration_ms and duration_ms > 0:
-        n = max(1, int(round(float(duration_ms) / float(period_ms))))
+    """Capture N frames spaced by period_ms and return their handles and file paths
+    (chronological). If duration_ms > 0, n is computed as round(duration_ms / period_ms).
+    warmup: number of fresh frames to let pass before the first capture.
+    persist: write frames to save_dir; when false only in-memory handles are returned.
+    select: "all" keeps every frame; "motion" keeps only keyframes where the scene
+    changes (max_frames > 0 caps how many and implies "motion").
+    camera: alias or index of the camera to use ("" = default)."""
+    cam, msg = _resolve(camera)
+    if cam is None:
+        return {"ok": False, "error": msg}
+    with cam.lock:
+        return _burst(
+            cam, n, period_ms, save_dir, format, warmup, duration_ms,
+            persist, select, max_frames,
+        )
 
-    try:
-        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-    except Exception:
-        pass
 
-    for _ in range(max(0, int(warmup))):
-        cap.read()
+def vision_sync_burst(
+    cameras: list[str] | None = None,
+    n: int = 8,
+    period_ms: int = 150,
+    save_dir: str = "outputs",
+    format: str = "jpg",
+    persist: bool = True,
+) -> dict[str, Any]:
+    """Capture N synchronized frame sets from several open cameras at once
+    (e.g. signer + face). All devices are grabbed back-to-back before any
+    frame is decoded, so each set is as close to simultaneous as the hardware
+    allows; per-set skew between the cameras is reported.
 
-    out_dir = Path(os.path.expanduser(save_dir))
-    out_dir.mkdir(parents=True, exist_ok=True)
+    Args:
+      cameras: Aliases or indexes to use (default: every open camera).
+      n: Number of synchronized sets.
+      period_ms: Spacing between sets.
+      save_dir: Directory for frames when persist is true.
+      format: "jpg" or "png".
+      persist: Write frames to save_dir; when false only handles are returned.
 
-    ext = ".jpg" if format.lower() == "jpg" else ".png"
-    mime = "image/jpeg" if ext == ".jpg" else "image/png"
-    width = int(_CAM["props"].get("width", 0))
-    height = int(_CAM["props"].get("height", 0))
+    Returns dict with: ok, cameras, handles and paths (per camera alias, in
+    chronological order), skew_ms per set, max_skew_ms, mean_skew_ms and
+    camera_offset_ms (mean offset of each camera from the first).
+    """
+    if cameras:
+        cams = []
+        for key in cameras:
+            cam, msg = _resolve(key)
+            if cam is None:
+                return {"ok": False, "error": msg}
+            if cam not in cams:
+                cams.append(cam)
+    else:
+        with _REG_LOCK:
+            cams = list(_CAMERAS.values())
+    if not cams:
+        return {"ok": False, "error": "Camera not open"}
 
+    total = max(1, int(n))
     period_s = max(0.0, float(period_ms) / 1000.0)
-    t0 = time.perf_counter()
-
-    paths: list[str] = []
-    for i in range(max(1, int(n))):
-        target = t0 + i * period_s
-        now = time.perf_counter()
-        if target > now:
-            time.sleep(target - now)
-
-        ok, frame, msg = _grab_frame()
-        if not ok or frame is None:
-            return {"ok": False, "error": f"Failed to read frame: {msg}", "paths": paths}
+    ext = ".jpg" if format.lower() == "jpg" else ".png"
+    out_dir = Path(os.path.expanduser(save_dir))
+    if persist:
+        out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%d_%H%M%S")
 
-        ok2, img_bytes, _ = _encode_image(frame, format)
-        if not ok2:
-            return {"ok": False, "error": "cv2.imencode failed", "paths": paths}
+    with ExitStack() as stack:
+        # Fixed lock order so two overlapping sync bursts can't deadlock
+        for cam in sorted(cams, key=lambda c: c.alias):
+            stack.enter_context(cam.lock)
+        try:
+            for cam in cams:
+                if not cam.grabber.pause():
+                    return {"ok": False, "error": f"Camera '{cam.alias}' grabber did not pause"}
+            sets, error = _sync_grab(cams, total, period_s)
+        finally:
+            for cam in cams:
+                cam.grabber.resume()
 
-        ts = time.strftime("%Y%m%d_%H%M%S")
-        ms = int((time.time() % 1) * 1000)
-        fname = f"burst_{ts}_{ms:03d}_{i:02d}{ext}"
-        fpath = out_dir / fname
-        with open(fpath, "wb") as f:
-            f.write(img_bytes)
-        paths.append(str(fpath))
+    futures: dict[str, list] = {cam.alias: [] for cam in cams}
+    with ThreadPoolExecutor(
+        max_workers=_BURST_WORKERS, thread_name_prefix="vision-burst"
+    ) as pool:
+        for i, (_, images) in enumerate(sets):
+            for cam, image in zip(cams, images):
+                fpath = None
+                if persist:
+                    fpath = out_dir / f"sync_{stamp}_{i:02d}_{safe_name(cam.alias)}{ext}"
+                futures[cam.alias].append(pool.submit(_store_frame, image, format, fpath))
 
-        if i == 0 or (i + 1) % 5 == 0 or (i + 1) == n:
-            log.info("Burst capture %d/%d saved %s", i + 1, n, fpath.name)
+    handles: dict[str, list[str]] = {}
+    paths: dict[str, list[str]] = {}
+    for alias, futs in futures.items():
+        handles[alias], paths[alias] = [], []
+        for fut in futs:
+            try:
+                handle, path = fut.result()
+            except Exception as e:
+                error = error or f"Failed to write frame for '{alias}': {e}"
+                continue
+            handles[alias].append(handle)
+            if path:
+                paths[alias].append(path)
 
-    return {
-        "ok": True,
-        "paths": paths,
-        "mime": mime,
-        "width": width,
-        "height": height,
-        "n": len(paths),
-        "period_ms": period_ms,
-        "duration_ms": duration_ms,
-        "save_dir": str(out_dir),
+    skews = [round((max(ts) - min(ts)) * 1000.0, 2) for ts, _ in sets]
+    offsets = {
+        cam.alias: round(
+            sum(ts[j] - ts[0] for ts, _ in sets) * 1000.0 / max(1, len(sets)), 2
+        )
+        for j, cam in enumerate(cams)
+    }
+    log.info(
+        "Sync burst: %d sets from %s, max skew %.1f ms",
+        len(sets), [c.alias for c in cams], max(skews, default=0.0),
+    )
+    result = {
+        "ok": not error,
+        "cameras": [cam.alias for cam in cams],
+        "n": len(sets),
+        "handles": handles,
+        "paths": paths if persist else {},
+        "skew_ms": skews,
+        "max_skew_ms": max(skews, default=0.0),
+        "mean_skew_ms": round(sum(skews) / len(skews), 2) if skews else 0.0,
+        "camera_offset_ms": offsets,
+        **_interval_stats([ts[0] for ts, _ in sets], period_ms),
     }
+    if error:
+        result["error"] = error
+    return result
 
 
-def vision_stop() -> dict[str, Any]:
-    """Release the camera."""
-    _close_cam()
-    return {"ok": True}
+def vision_stop(camera: str = "") -> dict[str, Any]:
+    """Stop the frame grabber and release a camera.
+    camera: alias or index to close; "" closes every open camera."""
+    if camera:
+        cam, msg = _resolve(camera)
+        if cam is None:
+            return {"ok": False, "error": msg}
+        cams = [cam]
+    else:
+        with _REG_LOCK:
+            cams = list(_CAMERAS.values())
+    for cam in cams:
+        _close_cam(cam)
+    return {"ok": True, "closed": [cam.alias for cam in cams]}
@@ -0,0 +1,172 @@
+"""Contact sheets: tile a chronological burst into a few numbered grid images.
+
+One tiled image per multimodal request carries the same sequence as many
+separate frames with much less per-image overhead. Tiling is done with NumPy
+reshapes; only the number labels are drawn per cell. OpenCV and NumPy are
+imported on first use.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np
+
+from .frames import load_image, put_frame
+
+log = logging.getLogger("vision_mcp.contact_sheet")
+
+
+def decode_images(blobs: Sequence[bytes]) -> list[np.ndarray]:
+    """Decode encoded image bytes to BGR arrays."""
+    import cv2
+    import numpy as np
+
+    images = []
+    for data in blobs:
+        img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            raise ValueError("could not decode image for contact sheet")
+        images.append(img)
+    return images
+
+
+def _fit_cell(img: np.ndarray, cell_w: int, cell_h: int) -> np.ndarray:
+    """Resize img to fit inside the cell, preserving aspect, centered on black."""
+    import cv2
+    import numpy as np
+
+    h, w = img.shape[:2]
+    scale = min(cell_w / w, cell_h / h)
+    nw, nh = max(1, int(w * scale)), max(1, int(h * scale))
+    resized = cv2.resize(img, (nw, nh), interpolation=cv2.INTER_AREA)
+    if (nw, nh) == (cell_w, cell_h):
+        return resized
+    cell = np.zeros((cell_h, cell_w, 3), dtype=np.uint8)
+    y, x = (cell_h - nh) // 2, (cell_w - nw) // 2
+    cell[y:y + nh, x:x + nw] = resized
+    return cell
+
+
+def build_contact_sheets(
+    images: Sequence[np.ndarray],
+    cols: int = 4,
+    cell_width: int = 320,
+    max_cells: int = 16,
+    label: bool = True,
+) -> list[np.ndarray]:
+    """Tile images in reading order into sheets of at most max_cells cells.
+
+    Cell height follows the first image's aspect ratio. With label=True each
+    cell gets its 1-based frame number in the top-left corner.
+    """
+    import cv2
+    import numpy as np
+
+    if not images:
+        return []
+    cols = max(1, int(cols))
+    per_sheet = max(1, int(max_cells))
+    h0, w0 = images[0].shape[:2]
+    cell_w = max(16, int(cell_width))
+    cell_h = max(16, int(round(cell_w * h0 / w0)))
+
+    cells = np.stack([_fit_cell(img, cell_w, cell_h) for img in images])
+    if label:
+        for i, cell in enumerate(cells):
+            text = str(i + 1)
+            (tw, th), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)
+            cv2.rectangle(cell, (0, 0), (tw + 8, th + 10), (0, 0, 0), -1)
+            cv2.putText(cell, text, (4, th + 4), cv2.FONT_HERSHEY_SIMPLEX,
+                        0.6, (255, 255, 255), 2, cv2.LINE_AA)
+
+    sheets = []
+    for start in range(0, len(cells), per_sheet):
+        chunk = cells[start:start + per_sheet]
+        rows = -(-len(chunk) // cols)
+        pad = rows * cols - len(chunk)
+        if pad:
+            chunk = np.concatenate([chunk, np.zeros((pad, cell_h, cell_w, 3), np.uint8)])
+        # (rows*cols, h, w, 3) -> (rows*h, cols*w, 3) without per-pixel loops
+        grid = (
+            chunk.reshape(rows, cols, cell_h, cell_w, 3)
+            .transpose(0, 2, 1, 3, 4)
+            .reshape(rows * cell_h, cols * cell_w, 3)
+        )
+        sheets.append(np.ascontiguousarray(grid))
+    return sheets
+
+
+def encode_sheets(sheets: Sequence[np.ndarray], quality: int = 90) -> list[bytes]:
+    import cv2
+
+    out = []
+    for sheet in sheets:
+        ok, buf = cv2.imencode(".jpg", sheet, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+        if not ok:
+            raise ValueError("cv2.imencode failed for contact sheet")
+        out.append(buf.tobytes())
+    return out
+
+
+# --------------- MCP Tool Functions ---------------
+
+
+def vision_contact_sheet(
+    paths: list[str],
+    cols: int = 4,
+    cell_width: int = 320,
+    max_cells: int = 16,
+    out_dir: str = "outputs",
+    persist: bool = True,
+) -> dict[str, Any]:
+    """Tile a chronological sequence of images into numbered grid image(s).
+
+    Args:
+      paths: Image file paths or frame handles in chronological order.
+      cols: Cells per row.
+      cell_width: Width of each cell in pixels (height keeps the aspect ratio).
+      max_cells: Maximum cells per sheet; longer sequences produce more sheets.
+      out_dir: Directory to write sheets to when persist is true.
+      persist: Write sheets to out_dir; when false only frame handles are returned.
+
+    Returns dict with: ok, handles, paths, sheets, frames.
+    """
+    try:
+        blobs = [load_image(p)[0] for p in paths]
+        sheets = build_contact_sheets(
+            decode_images(blobs), cols=cols, cell_width=cell_width, max_cells=max_cells
+        )
+        encoded = encode_sheets(sheets)
+    except Exception as e:
+        return {"ok": False, "error": f"contact sheet failed: {e}"}
+
+    handles = [put_frame(data, "image/jpeg") for data in encoded]
+    saved: list[str] = []
+    if persist:
+        out_dir_p = Path(os.path.expanduser(out_dir))
+        out_dir_p.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        for i, data in enumerate(encoded):
+            fpath = out_dir_p / f"sheet_{stamp}_{i:02d}.jpg"
+            try:
+                with open(fpath, "wb") as f:
+                    f.write(data)
+            except Exception as e:
+                return {"ok": False, "error": f"Failed to write sheet: {e}"}
+            saved.append(str(fpath))
+
+    return {
+        "ok": True,
+        "handles": handles,
+        "paths": saved,
+        "sheets": len(encoded),
+        "frames": len(paths),
+        "width": int(sheets[0].shape[1]) if sheets else 0,
+        "height": int(sheets[0].shape[0]) if sheets else 0,
+    }
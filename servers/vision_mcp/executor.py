@@ -0,0 +1,68 @@
+"""Bounded thread pools for blocking camera, OpenCV and file work.
+
+FastMCP runs synchronous tools directly on the event loop, so one slow
+camera burst or image decode would stall every other session. Blocking tools
+are registered through offload() and async tools push their CPU/disk steps
+through run_blocking(); both use the short-task pool.
+
+Camera tools are registered through offload_capture() instead and run on a
+pool of their own: a burst or device probe can hold its thread for seconds,
+and on the shared pool a few of them would leave the image decodes and cache
+lookups of the Gemini tools queued behind them.
+
+Environment:
+  VISION_MCP_WORKERS          short CPU/disk steps (decodes, hashing, cache and
+                              file I/O); default 4, about the cores they can
+                              keep busy
+  VISION_MCP_CAPTURE_WORKERS  camera tools; one per camera that may capture at
+                              once plus one for list_cameras (default 3)
+"""
+
+import os
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+log = logging.getLogger("vision_mcp.executor")
+
+_MAX_WORKERS = int(os.environ.get("VISION_MCP_WORKERS", "4"))
+_CAPTURE_WORKERS = int(os.environ.get("VISION_MCP_CAPTURE_WORKERS", "3"))
+
+_POOL = ThreadPoolExecutor(max_workers=max(1, _MAX_WORKERS), thread_name_prefix="vision-io")
+_CAPTURE_POOL = ThreadPoolExecutor(
+    max_workers=max(1, _CAPTURE_WORKERS), thread_name_prefix="vision-capture"
+)
+
+
+async def _run_on(
+    pool: ThreadPoolExecutor, fn: Callable[..., Any], *args: Any, **kwargs: Any
+) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, functools.partial(fn, *args, **kwargs))
+
+
+async def run_blocking(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run fn(*args, **kwargs) on the short-task pool and await its result."""
+    return await _run_on(_POOL, fn, *args, **kwargs)
+
+
+def _wrap(fn: Callable[..., Any], pool: ThreadPoolExecutor) -> Callable[..., Any]:
+    # functools.wraps keeps the name, docstring and signature FastMCP uses to
+    # build the tool schema
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await _run_on(pool, fn, *args, **kwargs)
+
+    return wrapper
+
+
+def offload(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a blocking tool function as an async tool that runs on the short-task pool."""
+    return _wrap(fn, _POOL)
+
+
+def offload_capture(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Like offload(), but on the capture pool, for tools that hold a camera."""
+    return _wrap(fn, _CAPTURE_POOL)
@@ -1,59 +1,258 @@
-"""File-based image detection: scan a directory for usable image files."""
+"""File-based image detection: scan a directory for usable image files.
+
+Scans are served from a persistent index (one record per directory, keyed by
+the directory's mtime) so repeated listings of a large tree only rescan the
+directories whose entries changed; records of directories that are gone are
+dropped. Image dimensions are read from file headers, without decoding
+pixels, the first time a file is returned.
+"""
 
 import os
+import json
+import time
 import logging
+import threading
 from pathlib import Path
 from typing import Any
 
+from .cache import CACHE_ROOT
+
 log = logging.getLogger("vision_mcp.files")
 
 _IMAGE_EXTENSIONS = {
     ".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tiff", ".tif", ".gif",
 }
 
+_INDEX_PATH = CACHE_ROOT / "image_index.json"
+
+_SORTS = ("name", "newest", "oldest", "size")
+
+# Per-file record: [size_bytes, mtime, width, height]; width/height are None
+# until probed and 0 when the header could not be read
+_SIZE, _MTIME, _WIDTH, _HEIGHT = range(4)
+
+# Newly probed dimensions alone are persisted at most this often; losing
+# them only means probing those headers again
+_DIMS_SAVE_INTERVAL_S = 30.0
+
+_LOCK = threading.Lock()
+_INDEX: dict[str, dict[str, Any]] = {}
+# dirty: directory records changed; dims_dirty: only probed dimensions did
+_STATE: dict[str, Any] = {"loaded": False, "dirty": False, "dims_dirty": False, "saved": 0.0}
+
+
+def _load_index() -> None:
+    if _STATE["loaded"]:
+        return
+    _STATE["loaded"] = True
+    try:
+        with open(_INDEX_PATH, "r", encoding="utf-8") as f:
+            _INDEX.update(json.load(f))
+    except (OSError, ValueError):
+        return
+    gone = [d for d in _INDEX if not os.path.isdir(d)]
+    for d in gone:
+        del _INDEX[d]
+    if gone:
+        _STATE["dirty"] = True
+
+
+def _forget_tree(path: str) -> None:
+    """Drop the records of path and everything below it (caller holds _LOCK)."""
+    prefix = path.rstrip(os.sep) + os.sep
+    for d in [d for d in _INDEX if d == path or d.startswith(prefix)]:
+        del _INDEX[d]
+        _STATE["dirty"] = True
+
+
+def _save_index() -> None:
+    """Persist the index (caller holds _LOCK); probe-only changes are throttled."""
+    if not _STATE["dirty"]:
+        if not _STATE["dims_dirty"]:
+            return
+        if time.monotonic() - _STATE["saved"] < _DIMS_SAVE_INTERVAL_S:
+            return
+    try:
+        _INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _INDEX_PATH.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_INDEX, f, separators=(",", ":"))
+        os.replace(tmp, _INDEX_PATH)
+        _STATE.update(dirty=False, dims_dirty=False, saved=time.monotonic())
+    except OSError as e:
+        log.warning("Could not persist image index %s: %s", _INDEX_PATH, e)
+
+
+def _scan_dir(path: str, mtime_ns: int, old: dict[str, Any] | None) -> dict[str, Any]:
+    """List one directory level, keeping probed dimensions of unchanged files."""
+    old_files = (old or {}).get("files", {})
+    files: dict[str, list] = {}
+    dirs: list[str] = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.name.startswith("."):
+                continue  # hidden files/dirs, e.g. outputs/.cache
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.name)
+                    continue
+                if os.path.splitext(entry.name)[1].lower() not in _IMAGE_EXTENSIONS:
+                    continue
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+            except OSError as e:
+                log.warning("Could not stat %s: %s", entry.path, e)
+                continue
+            rec = [st.st_size, st.st_mtime, None, None]
+            prev = old_files.get(entry.name)
+            if prev and prev[_SIZE] == rec[_SIZE] and prev[_MTIME] == rec[_MTIME]:
+                rec[_WIDTH], rec[_HEIGHT] = prev[_WIDTH], prev[_HEIGHT]
+            files[entry.name] = rec
+    return {"mtime_ns": mtime_ns, "files": files, "dirs": sorted(dirs)}
+
+
+def _refresh(root: str, recursive: bool) -> list[str]:
+    """Bring the index up to date for root (and its subtree); return dirs visited.
+
+    Each directory is stat()ed once; only those whose mtime changed are
+    listed again.
+    """
+    visited: list[str] = []
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            with _LOCK:
+                _forget_tree(path)
+            continue
+        with _LOCK:
+            rec = _INDEX.get(path)
+        if rec is None or rec.get("mtime_ns") != mtime_ns:
+            old = rec
+            try:
+                rec = _scan_dir(path, mtime_ns, old)
+            except OSError as e:
+                log.warning("Could not scan %s: %s", path, e)
+                continue
+            with _LOCK:
+                # Subdirectories that disappeared take their records with them
+                for d in set((old or {}).get("dirs", [])) - set(rec["dirs"]):
+                    _forget_tree(os.path.join(path, d))
+                _INDEX[path] = rec
+                _STATE["dirty"] = True
+        visited.append(path)
+        if recursive:
+            stack.extend(os.path.join(path, d) for d in reversed(rec["dirs"]))
+    return visited
+
+
+def _probe_dims(path: str) -> tuple[int, int]:
+    """Width and height from the image header; PIL only parses headers on open()."""
+    try:
+        from PIL import Image
+
+        with Image.open(path) as im:
+            return im.size
+    except Exception:
+        return 0, 0
+
 
 def list_images(
     directory: str = ".",
     recursive: bool = False,
+    sort: str = "name",
+    extensions: list[str] | None = None,
+    offset: int = 0,
+    limit: int = 0,
 ) -> dict[str, Any]:
     """Scan a directory for image files and return their paths and metadata.
 
     Args:
       directory: Directory to scan (default: current working directory).
       recursive: Whether to search subdirectories.
+      sort: "name" (path order), "newest", "oldest" or "size" (largest first).
+      extensions: Only include these extensions, e.g. [".png", "jpg"].
+      offset: Skip this many matches (for paging).
+      limit: Maximum images to return; 0 (the default) returns all of them.
+        Set it to page through large directories.
 
-    Returns dict with: ok, images (list of {path, name, size_bytes, extension}).
+    Returns dict with: ok, total, count, next_offset (null on the last page),
+    images (list of {path, name, size_bytes, extension, modified, width, height}).
     """
     dir_path = Path(os.path.expanduser(directory))
     if not dir_path.is_dir():
         return {"ok": False, "error": f"Not a directory: {directory}"}
+    sort = (sort or "name").lower()
+    if sort not in _SORTS:
+        return {"ok": False, "error": f"sort must be one of {', '.join(_SORTS)}"}
+    wanted = {
+        e.lower() if e.startswith(".") else f".{e.lower()}" for e in (extensions or [])
+    }
 
-    images: list[dict[str, Any]] = []
+    root = str(dir_path.resolve())
+    with _LOCK:
+        _load_index()
+    visited = _refresh(root, recursive)
+
+    matches: list[tuple[str, str, list]] = []
+    with _LOCK:
+        for d in visited:
+            for name, rec in _INDEX.get(d, {}).get("files", {}).items():
+                if wanted and os.path.splitext(name)[1].lower() not in wanted:
+                    continue
+                matches.append((os.path.join(d, name), name, rec))
 
-    if recursive:
-        candidates = dir_path.rglob("*")
+    if sort == "name":
+        matches.sort(key=lambda m: m[0])
+    elif sort == "newest":
+        matches.sort(key=lambda m: m[2][_MTIME], reverse=True)
+    elif sort == "oldest":
+        matches.sort(key=lambda m: m[2][_MTIME])
     else:
-        candidates = dir_path.iterdir()
+        matches.sort(key=lambda m: m[2][_SIZE], reverse=True)
 
-    for p in sorted(candidates):
-        if not p.is_file():
-            continue
-        if p.suffix.lower() not in _IMAGE_EXTENSIONS:
-            continue
+    offset = max(0, int(offset))
+    end = len(matches) if limit <= 0 else offset + int(limit)
+    page = matches[offset:end]
+
+    images: list[dict[str, Any]] = []
+    for path, name, rec in page:
+        # In-place rewrites don't touch the directory mtime; re-stat what we return
         try:
-            stat = p.stat()
-            images.append({
-                "path": str(p.resolve()),
-                "name": p.name,
-                "size_bytes": stat.st_size,
-                "extension": p.suffix.lower(),
-            })
-        except Exception as e:
-            log.warning("Could not stat %s: %s", p, e)
+            st = os.stat(path)
+        except OSError:
+            continue
+        if st.st_size != rec[_SIZE] or st.st_mtime != rec[_MTIME]:
+            with _LOCK:
+                rec[:] = [st.st_size, st.st_mtime, None, None]
+                _STATE["dirty"] = True
+        if rec[_WIDTH] is None:
+            w, h = _probe_dims(path)
+            with _LOCK:
+                rec[_WIDTH], rec[_HEIGHT] = w, h
+                _STATE["dims_dirty"] = True
+        images.append({
+            "path": path,
+            "name": name,
+            "size_bytes": rec[_SIZE],
+            "extension": os.path.splitext(name)[1].lower(),
+            "modified": rec[_MTIME],
+            "width": rec[_WIDTH] or None,
+            "height": rec[_HEIGHT] or None,
+        })
+
+    with _LOCK:
+        _save_index()
 
     return {
         "ok": True,
-        "directory": str(dir_path.resolve()),
+        "directory": root,
+        "total": len(matches),
         "count": len(images),
+        "offset": offset,
+        "next_offset": end if end < len(matches) else None,
         "images": images,
     }
@@ -0,0 +1,124 @@
+"""In-memory frame store: encoded images addressed by opaque handles.
+
+Capture tools put every encoded frame here and return a handle such as
+``frame://3f9c2a...``. Generation tools accept those handles anywhere they
+accept a file path, so a burst can reach asl_understand without a write and
+re-read through outputs/. The store is size-bounded with LRU eviction.
+"""
+
+import os
+import time
+import uuid
+import logging
+import mimetypes
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Tuple
+
+log = logging.getLogger("vision_mcp.frames")
+
+HANDLE_PREFIX = "frame://"
+
+# Store budget in MB (encoded bytes); oldest-used frames are evicted past it
+_MAX_MB = int(os.environ.get("VISION_FRAME_STORE_MB", "256"))
+
+
+class FrameStore:
+    """Thread-safe LRU of (bytes, mime) entries bounded by total byte size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, int(max_bytes))
+        self._items: OrderedDict[str, Tuple[bytes, str]] = OrderedDict()
+        self._bytes = 0
+        self._evicted = 0
+        self._lock = threading.Lock()
+
+    def put(self, data: bytes, mime: str) -> str:
+        handle = f"{HANDLE_PREFIX}{uuid.uuid4().hex}"
+        with self._lock:
+            self._items[handle] = (data, mime)
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes and len(self._items) > 1:
+                _, (old, _) = self._items.popitem(last=False)
+                self._bytes -= len(old)
+                self._evicted += 1
+        return handle
+
+    def get(self, handle: str) -> Tuple[bytes, str] | None:
+        with self._lock:
+            item = self._items.get(handle)
+            if item is not None:
+                self._items.move_to_end(handle)
+            return item
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "frames": len(self._items),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evicted": self._evicted,
+            }
+
+
+_STORE = FrameStore(_MAX_MB * 1024 * 1024)
+
+
+def is_handle(ref: str) -> bool:
+    return isinstance(ref, str) and ref.startswith(HANDLE_PREFIX)
+
+
+def put_frame(data: bytes, mime: str) -> str:
+    """Store encoded image bytes and return their handle."""
+    return _STORE.put(data, mime)
+
+
+def load_image(ref: str, default_mime: str = "image/jpeg") -> Tuple[bytes, str]:
+    """Return (bytes, mime) for a frame handle or a file path.
+
+    Raises LookupError for an unknown or evicted handle and OSError for an
+    unreadable file.
+    """
+    if is_handle(ref):
+        item = _STORE.get(ref)
+        if item is None:
+            raise LookupError(f"frame handle expired or unknown: {ref}")
+        return item
+    with open(ref, "rb") as f:
+        data = f.read()
+    mt, _ = mimetypes.guess_type(ref)
+    return data, mt or default_mime
+
+
+def store_stats() -> dict[str, Any]:
+    return _STORE.stats()
+
+
+# --------------- MCP Tool Functions ---------------
+
+
+def vision_save(
+    handles: list[str],
+    save_dir: str = "outputs",
+    prefix: str = "frame",
+) -> dict[str, Any]:
+    """Persist in-memory frame handles to save_dir and return the written paths
+    (same order as handles)."""
+    out_dir = Path(os.path.expanduser(save_dir))
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+
+    paths: list[str] = []
+    for i, handle in enumerate(handles):
+        try:
+            data, mt = load_image(handle)
+            ext = mimetypes.guess_extension(mt) or ".jpg"
+            fpath = out_dir / f"{prefix}_{stamp}_{i:02d}{ext}"
+            with open(fpath, "wb") as f:
+                f.write(data)
+        except Exception as e:
+            return {"ok": False, "error": f"save failed '{handle}': {e}", "paths": paths}
+        paths.append(str(fpath))
+
+    return {"ok": True, "paths": paths, "count": len(paths), "save_dir": str(out_dir)}
@@ -0,0 +1,94 @@
+"""Process-wide Gemini client shared by the banana, veo and asl tools.
+
+The client is created lazily on first use and kept for the life of the
+server, so repeated tool calls reuse pooled keep-alive HTTP connections and
+TLS sessions instead of building a fresh genai.Client each time. Tests can
+install a local fake with set_client().
+"""
+
+import os
+import logging
+import threading
+from typing import Any
+
+log = logging.getLogger("vision_mcp.genai_client")
+
+# Connection pool sizing for the shared httpx transports
+_MAX_CONNECTIONS = int(os.environ.get("VISION_GENAI_MAX_CONNECTIONS", "20"))
+_KEEPALIVE_EXPIRY_S = float(os.environ.get("VISION_GENAI_KEEPALIVE_S", "60"))
+
+
+class GenAIUnavailable(RuntimeError):
+    """google-genai is missing or GEMINI_API_KEY is not configured."""
+
+
+_LOCK = threading.Lock()
+_STATE: dict[str, Any] = {
+    "client": None,
+    "api_key": None,
+    "injected": False,
+}
+
+
+def _http_options() -> Any:
+    try:
+        import httpx
+        from google.genai import types as gtypes
+
+        limits = httpx.Limits(
+            max_connections=_MAX_CONNECTIONS,
+            max_keepalive_connections=_MAX_CONNECTIONS,
+            keepalive_expiry=_KEEPALIVE_EXPIRY_S,
+        )
+        return gtypes.HttpOptions(
+            client_args={"limits": limits},
+            async_client_args={"limits": limits},
+        )
+    except Exception:
+        # Older google-genai without client_args: SDK defaults still pool per client
+        return None
+
+
+def get_client() -> Any:
+    """Return the shared genai.Client, creating it on first use.
+
+    Raises GenAIUnavailable when google-genai is not installed or
+    GEMINI_API_KEY is unset. The client is rebuilt if the key changes.
+    """
+    with _LOCK:
+        if _STATE["injected"]:
+            return _STATE["client"]
+
+        api_key = os.environ.get("GEMINI_API_KEY")
+        if _STATE["client"] is not None and _STATE["api_key"] == api_key:
+            return _STATE["client"]
+
+        try:
+            from google import genai
+        except Exception as e:
+            raise GenAIUnavailable(f"google-genai not installed: {e}") from e
+        if not api_key:
+            raise GenAIUnavailable("GEMINI_API_KEY not set in environment")
+
+        opts = _http_options()
+        if opts is not None:
+            client = genai.Client(api_key=api_key, http_options=opts)
+        else:
+            client = genai.Client(api_key=api_key)
+        log.info("Created shared Gemini client")
+        _STATE["client"] = client
+        _STATE["api_key"] = api_key
+        return client
+
+
+def set_client(client: Any) -> None:
+    """Install a client (e.g. a local fake) that get_client() returns as-is."""
+    with _LOCK:
+        _STATE["client"] = client
+        _STATE["api_key"] = None
+        _STATE["injected"] = client is not None
+
+
+def reset_client() -> None:
+    """Drop the shared client; the next get_client() builds a new one."""
+    set_client(None)
@@ -0,0 +1,23 @@
+"""Small helpers shared by the capture, preview and keyframe modules.
+
+Kept free of cv2/numpy imports so importing it costs nothing at start-up.
+"""
+
+import re
+from typing import Any
+
+
+def is_jpeg_buffer(image: Any) -> bool:
+    """True if image is a compressed JPEG buffer (MJPEG passthrough) not a BGR array."""
+    return (
+        image is not None
+        and (image.ndim == 1 or (image.ndim == 2 and image.shape[0] == 1))
+        and image.size > 2
+        and int(image.flat[0]) == 0xFF
+        and int(image.flat[1]) == 0xD8
+    )
+
+
+def safe_name(alias: str) -> str:
+    """Camera alias reduced to characters that are safe in a file name."""
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", alias) or "cam"
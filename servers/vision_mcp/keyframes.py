@@ -0,0 +1,238 @@
+"""Motion-aware keyframe selection for bursts.
+
+Frames are reduced to small grayscale thumbnails and compared with their
+predecessor; the mean absolute difference is the frame's motion. Keyframes
+are picked where the cumulative motion crosses evenly spaced levels, so still
+stretches collapse to one frame while fast signing keeps more of them.
+OpenCV and NumPy are imported on first use.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np
+
+from .imaging import is_jpeg_buffer
+
+log = logging.getLogger("vision_mcp.keyframes")
+
+# Thumbnail size used for differencing (width, height)
+_THUMB_SIZE = (64, 48)
+
+# Default cumulative motion (mean grey levels) between two keyframes
+DEFAULT_MOTION_BUDGET = 6.0
+
+# Starting candidate spacing (grey levels) for KeyframeSelector with max_frames;
+# it doubles as often as needed to keep the candidate count bounded
+_INITIAL_SPACING = 0.5
+
+
+def _thumbnail(img: Any) -> Optional[np.ndarray]:
+    """Gray thumbnail of a BGR/gray frame or MJPEG buffer, or None if undecodable."""
+    import cv2
+
+    if is_jpeg_buffer(img):
+        gray = cv2.imdecode(img.reshape(-1), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    elif img.ndim == 2:
+        gray = img
+    elif img.ndim == 3 and img.shape[2] == 1:
+        gray = img[:, :, 0]
+    elif img.ndim == 3 and img.shape[2] == 4:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY)
+    elif img.ndim == 3:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    else:
+        gray = None
+    if gray is None:
+        return None
+    return cv2.resize(gray, _THUMB_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def thumbnails_from_frames(frames: Sequence[Any]) -> tuple[np.ndarray, list[int]]:
+    """Stack BGR/gray frames (or MJPEG buffers) into an (N, h, w) uint8 gray array.
+
+    Frames that can't be decoded are left out; the second value lists the
+    index in frames of each thumbnail.
+    """
+    import numpy as np
+
+    thumbs, kept = [], []
+    for i, img in enumerate(frames):
+        thumb = _thumbnail(img)
+        if thumb is None:
+            log.warning("Keyframes: skipping undecodable frame %d", i)
+            continue
+        thumbs.append(thumb)
+        kept.append(i)
+    if not thumbs:
+        return np.empty((0, _THUMB_SIZE[1], _THUMB_SIZE[0]), dtype=np.uint8), kept
+    return np.stack(thumbs), kept
+
+
+def thumbnails_from_bytes(blobs: Sequence[bytes]) -> np.ndarray:
+    """Decode encoded images at reduced size into an (N, h, w) uint8 gray array."""
+    import cv2
+    import numpy as np
+
+    thumbs = []
+    for data in blobs:
+        gray = cv2.imdecode(
+            np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_4
+        )
+        if gray is None:
+            raise ValueError("could not decode image for keyframe selection")
+        thumbs.append(cv2.resize(gray, _THUMB_SIZE, interpolation=cv2.INTER_AREA))
+    return np.stack(thumbs)
+
+
+def motion_scores(thumbs: np.ndarray) -> np.ndarray:
+    """Mean absolute difference of each thumbnail to the previous one (first is 0)."""
+    import numpy as np
+
+    if len(thumbs) < 2:
+        return np.zeros(len(thumbs), dtype=np.float32)
+    diffs = np.abs(np.diff(thumbs.astype(np.int16), axis=0))
+    return np.concatenate(([0.0], diffs.mean(axis=(1, 2)))).astype(np.float32)
+
+
+def select_keyframes(
+    thumbs: np.ndarray,
+    max_frames: int = 0,
+    motion_budget: float = DEFAULT_MOTION_BUDGET,
+) -> list[int]:
+    """Return chronological indexes of the most informative frames.
+
+    With max_frames > 0 exactly that many evenly spaced motion levels are used
+    (fewer if frames repeat); otherwise a keyframe is taken every motion_budget
+    of cumulative motion. The first and last frames are always kept (only the
+    first when max_frames is 1).
+    """
+    import numpy as np
+
+    n = len(thumbs)
+    if n <= 2 or (max_frames and n <= max_frames):
+        return list(range(n))
+    if max_frames == 1:
+        return [0]
+
+    cumulative = np.cumsum(motion_scores(thumbs))
+    total = float(cumulative[-1])
+    if total <= 0.0:
+        return [0, n - 1]  # nothing moved: the endpoints say it all
+
+    if max_frames and max_frames > 0:
+        count = int(max_frames)
+    else:
+        count = int(total // max(motion_budget, 1e-6)) + 1
+    count = min(max(2, count), n)
+
+    levels = np.linspace(0.0, total, count)
+    idx = np.searchsorted(cumulative, levels, side="left")
+    idx[-1] = n - 1
+    picked = np.unique(np.clip(idx, 0, n - 1))
+    log.info("Keyframes: kept %d/%d frames (motion total %.1f)", len(picked), n, total)
+    return [int(i) for i in picked]
+
+
+class KeyframeSelector:
+    """Streaming counterpart of select_keyframes for frames pushed as grabbed.
+
+    Only frames that may still be picked are held. Without max_frames, push()
+    hands back a frame as soon as the cumulative motion crosses the next
+    motion_budget level, so it can be encoded while the burst goes on. With
+    max_frames the levels depend on the burst's total motion: frames crossing
+    multiples of a spacing are held as candidates, the spacing doubles
+    whenever there are more than 2 * max_frames of them, and finish() makes
+    the pick. The first and last frames are always kept (only the first when
+    max_frames is 1).
+    """
+
+    def __init__(self, max_frames: int = 0, motion_budget: float = DEFAULT_MOTION_BUDGET):
+        self.max_frames = max(0, int(max_frames))
+        self.motion_budget = max(motion_budget, 1e-6)
+        self.seen = 0
+        self.kept = 0
+        self._prev: Optional[np.ndarray] = None
+        self._cumulative = 0.0
+        self._next_level = self.motion_budget
+        # Newest frame, unless push() already handed it back
+        self._last: Optional[tuple[int, Any]] = None
+        # Every frame, while a burst of max_frames or fewer would keep them all
+        self._all: Optional[list[tuple[int, Any]]] = [] if self.max_frames else None
+        self._spacing = _INITIAL_SPACING
+        self._candidates: list[tuple[float, int, Any]] = []
+
+    def push(self, index: int, image: Any) -> list[tuple[int, Any]]:
+        """Score one frame; returns the (index, image) pairs now known to be kept."""
+        import numpy as np
+
+        thumb = _thumbnail(image)
+        if thumb is None:
+            log.warning("Keyframes: skipping undecodable frame %d", index)
+            return []
+        thumb = thumb.astype(np.int16)
+        if self._prev is not None:
+            self._cumulative += float(np.abs(thumb - self._prev).mean())
+        self._prev = thumb
+        first = self.seen == 0
+        self.seen += 1
+
+        if not self.max_frames:
+            if first or self._cumulative >= self._next_level:
+                budget = self.motion_budget
+                self._next_level = (self._cumulative // budget + 1) * budget
+                self._last = None
+                self.kept += 1
+                return [(index, image)]
+            self._last = (index, image)
+            return []
+
+        self._last = (index, image)
+        if self._all is not None:
+            self._all.append((index, image))
+            if len(self._all) > self.max_frames:
+                self._all = None
+        if first or (
+            self.max_frames > 1
+            and self._cumulative // self._spacing
+            > self._candidates[-1][0] // self._spacing
+        ):
+            self._candidates.append((self._cumulative, index, image))
+            while len(self._candidates) > 2 * self.max_frames:
+                self._thin()
+        return []
+
+    def _thin(self) -> None:
+        self._spacing *= 2.0
+        kept = self._candidates[:1]
+        for cand in self._candidates[1:]:
+            if cand[0] // self._spacing > kept[-1][0] // self._spacing:
+                kept.append(cand)
+        self._candidates = kept
+
+    def finish(self) -> list[tuple[int, Any]]:
+        """The remaining (index, image) pairs to keep, in order, once all are pushed."""
+        import numpy as np
+
+        if not self.max_frames:
+            picked = [self._last] if self._last is not None else []
+        elif self._all is not None:
+            picked = self._all
+        elif self.max_frames == 1:
+            picked = [self._candidates[0][1:]]
+        else:
+            cumulative = np.array([c[0] for c in self._candidates])
+            levels = np.linspace(0.0, self._cumulative, self.max_frames)[:-1]
+            idx = np.unique(np.searchsorted(cumulative, levels, side="left"))
+            picked = [self._candidates[i][1:] for i in idx if i < len(self._candidates)]
+            if self._last is not None and picked[-1][0] != self._last[0]:
+                picked.append(self._last)
+        self.kept += len(picked)
+        log.info(
+            "Keyframes: kept %d/%d frames (motion total %.1f)",
+            self.kept, self.seen, self._cumulative,
+        )
+        return picked
@@ -0,0 +1,327 @@
+"""Perceptual-hash index for near-duplicate and nearest-image search.
+
+Every image list_images finds gets two 64-bit hashes: a dHash (sign of
+horizontal gradients on a 9x8 thumbnail) and a pHash (low-frequency DCT
+coefficients of a 32x32 thumbnail against their median). Decoding runs on a
+thread pool at reduced JPEG scale; the hashing itself is one vectorized NumPy
+pass over the stacked thumbnails. Hashes are kept in a persistent index keyed
+by path, size and mtime, so only new or changed files are hashed again, and
+queries are Hamming-distance scans over a uint64 array with no network calls.
+"""
+
+import os
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Sequence
+
+from .cache import CACHE_ROOT
+from .files import list_images
+from .frames import load_image
+
+log = logging.getLogger("vision_mcp.phash")
+
+_INDEX_PATH = CACHE_ROOT / "phash_index.json"
+
+_ALGOS = ("phash", "dhash")
+
+# Threads decoding thumbnails (cv2 releases the GIL while decoding)
+_WORKERS = int(os.environ.get("VISION_HASH_WORKERS", str(min(8, os.cpu_count() or 4))))
+
+# Per-path record: [size_bytes, mtime, dhash_hex, phash_hex]
+_SIZE, _MTIME, _DHASH, _PHASH = range(4)
+
+_LOCK = threading.Lock()
+_INDEX: dict[str, list] = {}
+_STATE: dict[str, Any] = {"loaded": False}
+_DCT: dict[int, Any] = {}
+
+# Cap on uint64 cells per distance block in image_duplicates (~32 MB)
+_BLOCK_CELLS = 1 << 22
+
+
+def _load_index() -> None:
+    if _STATE["loaded"]:
+        return
+    _STATE["loaded"] = True
+    try:
+        with open(_INDEX_PATH, "r", encoding="utf-8") as f:
+            _INDEX.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+
+
+def _save_index() -> None:
+    try:
+        _INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _INDEX_PATH.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_INDEX, f, separators=(",", ":"))
+        os.replace(tmp, _INDEX_PATH)
+    except OSError as e:
+        log.warning("Could not persist hash index %s: %s", _INDEX_PATH, e)
+
+
+def _thumbnail(data: bytes) -> Any:
+    """Decode at reduced scale to a 32x32 float32 gray thumbnail (None if unreadable)."""
+    import cv2
+    import numpy as np
+
+    buf = np.frombuffer(data, dtype=np.uint8)
+    gray = cv2.imdecode(buf, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if gray is None or min(gray.shape[:2]) < 8:
+        gray = cv2.imdecode(buf, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return None
+    return cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+
+
+def _thumbnail_file(path: str) -> Any:
+    try:
+        with open(path, "rb") as f:
+            return _thumbnail(f.read())
+    except OSError:
+        return None
+
+
+def _dct_matrix(n: int) -> Any:
+    """Orthonormal DCT-II basis, so C @ X @ C.T is the 2-D DCT of X."""
+    import numpy as np
+
+    if n not in _DCT:
+        k = np.arange(n)[:, None]
+        i = np.arange(n)[None, :]
+        c = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+        c[0] /= np.sqrt(2.0)
+        _DCT[n] = c.astype(np.float32)
+    return _DCT[n]
+
+
+def _pack(bits: Any) -> Any:
+    """(N, 64) bool -> (N,) uint64, most significant bit first."""
+    import numpy as np
+
+    return np.packbits(bits, axis=1).view(">u8").astype(np.uint64).reshape(-1)
+
+
+def hash_thumbnails(thumbs: Any) -> tuple[Any, Any]:
+    """Vectorized (dhash, phash) uint64 arrays for an (N, 32, 32) float32 stack."""
+    import cv2
+    import numpy as np
+
+    n = len(thumbs)
+    # dHash: 9x8 thumbnail, one bit per left<right neighbour comparison
+    small = np.stack([cv2.resize(t, (9, 8), interpolation=cv2.INTER_AREA) for t in thumbs])
+    dbits = (small[:, :, 1:] > small[:, :, :-1]).reshape(n, 64)
+
+    # pHash: 8x8 low-frequency DCT block vs. its median (DC term excluded)
+    c = _dct_matrix(32)
+    low = (c @ thumbs @ c.T)[:, :8, :8].reshape(n, 64)
+    med = np.median(low[:, 1:], axis=1, keepdims=True)
+    pbits = low > med
+    return _pack(dbits), _pack(pbits)
+
+
+def _popcount(x: Any) -> Any:
+    import numpy as np
+
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(x)
+    bits = np.unpackbits(np.ascontiguousarray(x).view(np.uint8).reshape(-1, 8), axis=1)
+    return bits.sum(axis=1, dtype=np.uint8).reshape(x.shape)
+
+
+def _refresh(directory: str, recursive: bool) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """Hash new/changed images under directory; return (images, listing result)."""
+    import numpy as np
+
+    found = list_images(directory, recursive, limit=0)
+    if not found.get("ok"):
+        return [], found
+    images = found["images"]
+
+    with _LOCK:
+        _load_index()
+        stale = [
+            img for img in images
+            if (rec := _INDEX.get(img["path"])) is None
+            or rec[_SIZE] != img["size_bytes"]
+            or rec[_MTIME] != img["modified"]
+        ]
+    if stale:
+        with ThreadPoolExecutor(max_workers=max(1, _WORKERS)) as pool:
+            thumbs = list(pool.map(_thumbnail_file, [img["path"] for img in stale]))
+        ok = [(img, t) for img, t in zip(stale, thumbs) if t is not None]
+        if ok:
+            dh, ph = hash_thumbnails(np.stack([t for _, t in ok]))
+            with _LOCK:
+                for (img, _), d, p in zip(ok, dh, ph):
+                    _INDEX[img["path"]] = [
+                        img["size_bytes"], img["modified"], f"{int(d):016x}", f"{int(p):016x}",
+                    ]
+        log.info("Hashed %d new/changed image(s) in %s", len(ok), found["directory"])
+
+    root = found["directory"]
+    present = {img["path"] for img in images}
+    with _LOCK:
+        gone = [
+            p for p in _INDEX
+            if p not in present
+            and (p.startswith(root + os.sep) if recursive else os.path.dirname(p) == root)
+        ]
+        for p in gone:
+            del _INDEX[p]
+        if stale or gone:
+            _save_index()
+        images = [img for img in images if img["path"] in _INDEX]
+    return images, found
+
+
+def _hash_array(paths: Sequence[str], algo: str) -> Any:
+    import numpy as np
+
+    col = _PHASH if algo == "phash" else _DHASH
+    with _LOCK:
+        return np.array([int(_INDEX[p][col], 16) for p in paths], dtype=np.uint64)
+
+
+# --------------- MCP Tool Functions ---------------
+
+
+def image_duplicates(
+    directory: str = "outputs",
+    recursive: bool = False,
+    max_distance: int = 6,
+    algo: str = "phash",
+    max_groups: int = 50,
+) -> dict[str, Any]:
+    """Group near-identical images in a directory by perceptual hash (no model calls).
+
+    Args:
+      directory: Directory to scan.
+      recursive: Whether to include subdirectories.
+      max_distance: Max differing bits (of 64) to count as a duplicate; 0 = exact.
+      algo: "phash" (robust to re-encoding/resizing) or "dhash" (stricter, more sensitive to small edits).
+      max_groups: Maximum number of groups to return (largest first).
+
+    Returns dict with: ok, scanned, groups (list of {keep, paths, max_distance}),
+    where keep is the highest-resolution, largest file of the group and
+    max_distance the widest link that joined it.
+    """
+    import numpy as np
+
+    algo = (algo or "phash").lower()
+    if algo not in _ALGOS:
+        return {"ok": False, "error": f"algo must be one of {', '.join(_ALGOS)}"}
+    images, found = _refresh(directory, recursive)
+    if not found.get("ok"):
+        return found
+
+    paths = [img["path"] for img in images]
+    hashes = _hash_array(paths, algo)
+    n = len(paths)
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Row blocks keep the N x N distance matrix out of memory
+    rows_per_block = max(1, min(1024, _BLOCK_CELLS // max(1, n)))
+    worst: dict[int, int] = {}
+    for start in range(0, n, rows_per_block):
+        block = hashes[start:start + rows_per_block]
+        dist = _popcount(block[:, None] ^ hashes[None, :])
+        rows, cols = np.nonzero(dist <= max_distance)
+        for r, c in zip(rows.tolist(), cols.tolist()):
+            i = start + r
+            if c <= i:
+                continue
+            a, b = find(i), find(c)
+            if a != b:
+                parent[b] = a
+            worst[a] = max(worst.get(a, 0), worst.pop(b, 0) if a != b else 0, int(dist[r, c]))
+
+    groups: dict[int, list[int]] = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+    dupes = sorted((g for g in groups.values() if len(g) > 1), key=len, reverse=True)
+
+    def quality(i: int) -> tuple:
+        img = images[i]
+        return ((img.get("width") or 0) * (img.get("height") or 0), img["size_bytes"])
+
+    return {
+        "ok": True,
+        "directory": found["directory"],
+        "scanned": n,
+        "duplicate_groups": len(dupes),
+        "groups": [
+            {
+                "keep": paths[max(g, key=quality)],
+                "paths": [paths[i] for i in g],
+                "max_distance": worst.get(find(g[0]), 0),
+            }
+            for g in dupes[: max(1, int(max_groups))]
+        ],
+    }
+
+
+def image_nearest(
+    path: str,
+    directory: str = "outputs",
+    recursive: bool = False,
+    k: int = 5,
+    algo: str = "phash",
+    max_distance: int = 64,
+) -> dict[str, Any]:
+    """Find the images in a directory that look most like a given image (no model calls).
+
+    Args:
+      path: Query image file path or frame handle.
+      directory: Directory to search.
+      recursive: Whether to include subdirectories.
+      k: Number of matches to return.
+      algo: "phash" or "dhash".
+      max_distance: Ignore matches differing in more bits than this (of 64).
+
+    Returns dict with: ok, matches (list of {path, distance}), closest first.
+    """
+    import numpy as np
+
+    algo = (algo or "phash").lower()
+    if algo not in _ALGOS:
+        return {"ok": False, "error": f"algo must be one of {', '.join(_ALGOS)}"}
+    try:
+        data, _ = load_image(path)
+    except Exception as e:
+        return {"ok": False, "error": f"read image failed '{path}': {e}"}
+    thumb = _thumbnail(data)
+    if thumb is None:
+        return {"ok": False, "error": f"could not decode image: {path}"}
+    dh, ph = hash_thumbnails(thumb[None])
+    query = (ph if algo == "phash" else dh)[0]
+
+    images, found = _refresh(directory, recursive)
+    if not found.get("ok"):
+        return found
+    query_path = os.path.realpath(path) if os.path.exists(path) else None
+    paths = [img["path"] for img in images if img["path"] != query_path]
+    if not paths:
+        return {"ok": True, "directory": found["directory"], "scanned": 0, "matches": []}
+
+    dist = _popcount(_hash_array(paths, algo) ^ query)
+    order = np.argsort(dist, kind="stable")[: max(1, int(k))]
+    return {
+        "ok": True,
+        "directory": found["directory"],
+        "scanned": len(paths),
+        "matches": [
+            {"path": paths[i], "distance": int(dist[i])}
+            for i in order
+            if dist[i] <= max_distance
+        ],
+    }
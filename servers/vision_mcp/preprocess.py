@@ -0,0 +1,152 @@
+"""Input preprocessing: downscale and re-encode images before sending them to Gemini.
+
+Phone uploads are often 12 MP PNGs of several MB, far more than the models
+use. Inputs are resized so their longest edge is at most VISION_INPUT_MAX_EDGE
+and re-encoded as JPEG or WebP. Results (including "leave as is" decisions)
+are cached on disk by source hash and parameters, so repeats cost a lookup.
+
+Environment:
+  VISION_INPUT_MAX_EDGE     longest edge in pixels (0 disables preprocessing)
+  VISION_INPUT_FORMAT       "jpeg" or "webp"
+  VISION_INPUT_QUALITY      encoder quality, 1-100
+  VISION_INPUT_MIN_KB       inputs smaller than this are sent untouched
+  VISION_PREPROCESS_CACHE_MB  size of the preprocess cache (0 disables it)
+"""
+
+import os
+import asyncio
+import logging
+from typing import Any, Tuple
+
+from .cache import DiskCache, hash_key
+from .executor import run_blocking
+
+log = logging.getLogger("vision_mcp.preprocess")
+
+_MAX_EDGE = int(os.environ.get("VISION_INPUT_MAX_EDGE", "1536"))
+_FORMAT = os.environ.get("VISION_INPUT_FORMAT", "jpeg").lower()
+_QUALITY = int(os.environ.get("VISION_INPUT_QUALITY", "85"))
+_MIN_BYTES = int(os.environ.get("VISION_INPUT_MIN_KB", "64")) * 1024
+
+_CACHE = DiskCache(
+    "preprocess", int(os.environ.get("VISION_PREPROCESS_CACHE_MB", "256")) * 1024 * 1024
+)
+
+_ENCODINGS = {
+    "jpeg": (".jpg", "image/jpeg"),
+    "jpg": (".jpg", "image/jpeg"),
+    "webp": (".webp", "image/webp"),
+}
+
+# Decoders that may carry an alpha channel worth preserving or flattening
+_ALPHA_MIMES = ("image/png", "image/webp", "image/gif")
+
+
+def _decode(data: bytes, mime: str, keep_alpha: bool) -> Any:
+    """Decode to an 8-bit BGR image (BGRA if keep_alpha and the source has alpha).
+
+    IMREAD_COLOR applies EXIF orientation, which matters for phone photos;
+    the alpha-aware path is only taken for formats that can carry alpha.
+    """
+    import cv2
+    import numpy as np
+
+    buf = np.frombuffer(data, dtype=np.uint8)
+    if mime in _ALPHA_MIMES:
+        raw = cv2.imdecode(buf, cv2.IMREAD_UNCHANGED)
+        if raw is not None and raw.ndim == 3 and raw.shape[2] == 4 and raw.dtype == np.uint8:
+            if keep_alpha:
+                return raw
+            alpha = raw[:, :, 3:4].astype(np.float32) / 255.0
+            white = np.full_like(raw[:, :, :3], 255, dtype=np.float32)
+            return (raw[:, :, :3] * alpha + white * (1.0 - alpha)).astype(np.uint8)
+    return cv2.imdecode(buf, cv2.IMREAD_COLOR)
+
+
+def _transcode(data: bytes, mime: str, max_edge: int, fmt: str, quality: int) -> bytes | None:
+    """Return re-encoded bytes, or None when the original should be sent as is."""
+    import cv2
+
+    ext, _ = _ENCODINGS[fmt]
+    img = _decode(data, mime, keep_alpha=ext == ".webp")
+    if img is None:
+        return None  # format OpenCV can't read (e.g. HEIC): leave it to the API
+    h, w = img.shape[:2]
+    scale = max_edge / float(max(h, w))
+    if scale < 1.0:
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        img = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+    params = [
+        cv2.IMWRITE_JPEG_QUALITY if ext == ".jpg" else cv2.IMWRITE_WEBP_QUALITY,
+        max(1, min(100, int(quality))),
+    ]
+    ok, enc = cv2.imencode(ext, img, params)
+    if not ok:
+        return None
+    out = enc.tobytes()
+    # Already small enough and re-encoding didn't help: keep the original
+    if scale >= 1.0 and len(out) >= len(data):
+        return None
+    return out
+
+
+def prepare_image(
+    data: bytes,
+    mime: str,
+    max_edge: int | None = None,
+    fmt: str | None = None,
+    quality: int | None = None,
+) -> Tuple[bytes, str]:
+    """Return (bytes, mime) to send for one input image, using the disk cache."""
+    max_edge = _MAX_EDGE if max_edge is None else int(max_edge)
+    fmt = (fmt or _FORMAT).lower()
+    quality = _QUALITY if quality is None else int(quality)
+    if max_edge <= 0 or fmt not in _ENCODINGS or len(data) < _MIN_BYTES:
+        return data, mime
+
+    key = hash_key("preprocess-v1", str(max_edge), fmt, str(quality), data)
+    hit = _CACHE.get(key)
+    if hit is not None:
+        meta, entry = hit
+        if meta.get("passthrough"):
+            return data, mime
+        try:
+            with open(entry / "out", "rb") as f:
+                return f.read(), meta["mime"]
+        except (OSError, KeyError):
+            pass  # evicted underneath us: redo it
+
+    try:
+        out = _transcode(data, mime, max_edge, fmt, quality)
+    except ImportError:
+        return data, mime  # no OpenCV: send inputs untouched
+    except Exception as e:
+        log.warning("Input preprocessing failed, sending original: %s", e)
+        return data, mime
+
+    out_mime = _ENCODINGS[fmt][1]
+    try:
+        if out is None:
+            _CACHE.put(key, {"passthrough": True}, {})
+        else:
+            _CACHE.put(key, {"mime": out_mime, "source_bytes": len(data)}, {"out": out})
+    except OSError as e:
+        log.warning("Preprocess cache store failed: %s", e)
+    if out is None:
+        return data, mime
+    log.info("Preprocessed input %d -> %d bytes", len(data), len(out))
+    return out, out_mime
+
+
+async def prepare_images(
+    images: list[Tuple[bytes, str]],
+) -> Tuple[list[Tuple[bytes, str]], int]:
+    """Preprocess each (bytes, mime) input off the event loop.
+
+    Returns the images to send and the total bytes saved versus the originals.
+    """
+    prepared = list(
+        await asyncio.gather(*(run_blocking(prepare_image, d, m) for d, m in images))
+    )
+    saved = sum(len(d) for d, _ in images) - sum(len(d) for d, _ in prepared)
+    return prepared, max(0, saved)
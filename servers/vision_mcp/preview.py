@@ -0,0 +1,144 @@
+"""Live preview frames for the web UI, published from the cameras' grabbers.
+
+The preview never touches a capture device: a single publisher thread takes
+the newest frame each grabber already holds in memory, downscales it,
+encodes a small JPEG and writes it atomically to VISION_PREVIEW_DIR
+(cameras.json maps each open camera's alias to its file, default first). It only
+does this while a viewer keeps the .demand marker fresh, so an unwatched
+server spends nothing on previews. run_local.py streams these files as MJPEG.
+
+Environment:
+  VISION_PREVIEW_DIR      where preview frames are written
+  VISION_PREVIEW_FPS      maximum preview frame rate
+  VISION_PREVIEW_WIDTH    preview frames are downscaled to at most this width
+  VISION_PREVIEW_QUALITY  JPEG quality of preview frames
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Any, Callable, Iterable, Tuple
+
+from .imaging import is_jpeg_buffer, safe_name
+
+log = logging.getLogger("vision_mcp.preview")
+
+PREVIEW_DIR = os.path.expanduser(
+    os.environ.get("VISION_PREVIEW_DIR", os.path.join("outputs", ".preview"))
+)
+DEMAND_MARKER = ".demand"
+
+_FPS = float(os.environ.get("VISION_PREVIEW_FPS", "10"))
+_WIDTH = int(os.environ.get("VISION_PREVIEW_WIDTH", "480"))
+_QUALITY = int(os.environ.get("VISION_PREVIEW_QUALITY", "70"))
+
+# A viewer refreshes the marker about once a second; older than this = nobody watching
+_DEMAND_TTL_S = 3.0
+
+# (alias, grabber, props) for every open camera
+Source = Tuple[str, Any, dict]
+
+_LOCK = threading.Lock()
+_STATE: dict[str, Any] = {"thread": None}
+
+
+def _file_for(alias: str) -> str:
+    return safe_name(alias) + ".jpg"
+
+
+def _demand_fresh() -> bool:
+    try:
+        age = time.time() - os.stat(os.path.join(PREVIEW_DIR, DEMAND_MARKER)).st_mtime
+    except OSError:
+        return False
+    return age < _DEMAND_TTL_S
+
+
+def _write_atomic(name: str, data: bytes) -> None:
+    path = os.path.join(PREVIEW_DIR, name)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _encode(image: Any) -> bytes | None:
+    """Downscale a BGR frame or MJPEG buffer and encode it as a preview JPEG."""
+    import cv2
+    import numpy as np
+
+    if is_jpeg_buffer(image):
+        # Camera JPEG: decode at half size, which is cheaper than a full decode
+        image = cv2.imdecode(np.asarray(image).reshape(-1), cv2.IMREAD_REDUCED_COLOR_2)
+        if image is None:
+            return None
+    h, w = image.shape[:2]
+    if w > _WIDTH > 0:
+        image = cv2.resize(
+            image, (_WIDTH, max(1, round(h * _WIDTH / w))), interpolation=cv2.INTER_AREA
+        )
+    ok, buf = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, _QUALITY])
+    return buf.tobytes() if ok else None
+
+
+def _publish_loop(sources: Callable[[], Iterable[Source]]) -> None:
+    period = 1.0 / max(0.5, _FPS)
+    last_seq: dict[str, int] = {}
+    published: list[str] = []
+    while True:
+        cams = list(sources())
+        aliases = [alias for alias, _, _ in cams]
+        try:
+            if aliases != published:
+                os.makedirs(PREVIEW_DIR, exist_ok=True)
+                for alias in set(published) - set(aliases):
+                    try:
+                        os.remove(os.path.join(PREVIEW_DIR, _file_for(alias)))
+                    except OSError:
+                        pass
+                    last_seq.pop(alias, None)
+                listing = [{"alias": a, "file": _file_for(a)} for a in aliases]
+                _write_atomic("cameras.json", json.dumps(listing).encode("utf-8"))
+                published = aliases
+        except OSError as e:
+            log.warning("Preview: cannot write to %s: %s", PREVIEW_DIR, e)
+        if not cams:
+            with _LOCK:
+                # Re-check under the lock so a camera opened just now isn't orphaned
+                if not list(sources()):
+                    _STATE["thread"] = None
+                    return
+            continue
+
+        if not _demand_fresh():
+            time.sleep(0.5)
+            continue
+
+        t0 = time.monotonic()
+        for alias, grabber, _ in cams:
+            frame = grabber.latest(last_seq.get(alias, 0), timeout=0)
+            if frame is None:
+                continue  # nothing new since the last preview
+            last_seq[alias] = frame.seq
+            try:
+                data = _encode(frame.image)
+                if data:
+                    _write_atomic(_file_for(alias), data)
+            except Exception as e:
+                log.warning("Preview frame for '%s' failed: %s", alias, e)
+        time.sleep(max(0.0, period - (time.monotonic() - t0)))
+
+
+def ensure_publisher(sources: Callable[[], Iterable[Source]]) -> None:
+    """Start the publisher thread if it isn't running; it exits with the last camera."""
+    with _LOCK:
+        thread = _STATE["thread"]
+        if thread is not None and thread.is_alive():
+            return
+        thread = threading.Thread(
+            target=_publish_loop, args=(sources,), name="vision-preview", daemon=True
+        )
+        _STATE["thread"] = thread
+        thread.start()
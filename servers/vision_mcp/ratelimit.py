@@ -0,0 +1,211 @@
+"""Shared call layer for Gemini: per-model rate limiting plus retry/backoff.
+
+Every Gemini request from the banana, veo and asl tools goes through
+call_gemini(). A process-wide token bucket per model keeps the server under
+its quota, and 429/5xx/transport errors are retried with exponential backoff
+and full jitter, honoring Retry-After headers and RetryInfo delays when the
+API sends them. Counters are exposed through gemini_stats.
+
+Environment:
+  VISION_GEMINI_RPM            default requests/minute per model (0 = unlimited)
+  VISION_GEMINI_RPM_<MODEL>    per-model override, e.g. VISION_GEMINI_RPM_GEMINI_2_0_FLASH
+  VISION_GEMINI_BURST          bucket size (requests allowed back-to-back)
+  VISION_GEMINI_MAX_RETRIES    retries after the first attempt
+  VISION_GEMINI_BACKOFF_S      base backoff; doubles per retry up to VISION_GEMINI_BACKOFF_MAX_S
+"""
+
+import os
+import re
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable
+
+log = logging.getLogger("vision_mcp.ratelimit")
+
+_DEFAULT_RPM = float(os.environ.get("VISION_GEMINI_RPM", "60"))
+_BURST = float(os.environ.get("VISION_GEMINI_BURST", "5"))
+_MAX_RETRIES = int(os.environ.get("VISION_GEMINI_MAX_RETRIES", "4"))
+_BACKOFF_S = float(os.environ.get("VISION_GEMINI_BACKOFF_S", "1.0"))
+_BACKOFF_MAX_S = float(os.environ.get("VISION_GEMINI_BACKOFF_MAX_S", "32.0"))
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() reserves a token and sleeps until it is due."""
+
+    def __init__(self, rate_per_s: float, burst: float):
+        self.rate = max(0.0, rate_per_s)
+        self.capacity = max(1.0, burst)
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token (possibly going into debt) and return the wait in seconds."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= 1.0
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+_LOCK = threading.Lock()
+_BUCKETS: dict[str, TokenBucket] = {}
+_COUNTERS: dict[str, dict[str, float]] = {}
+
+
+def _env_key(model: str) -> str:
+    return "VISION_GEMINI_RPM_" + re.sub(r"[^A-Za-z0-9]+", "_", model).upper().strip("_")
+
+
+def _bucket(model: str) -> TokenBucket:
+    with _LOCK:
+        bucket = _BUCKETS.get(model)
+        if bucket is None:
+            rpm = float(os.environ.get(_env_key(model), _DEFAULT_RPM))
+            bucket = TokenBucket(rpm / 60.0, _BURST)
+            _BUCKETS[model] = bucket
+        return bucket
+
+
+def _count(model: str, field: str, amount: float = 1) -> None:
+    with _LOCK:
+        c = _COUNTERS.setdefault(
+            model,
+            {"calls": 0, "throttled": 0, "retries": 0, "failures": 0, "limiter_wait_s": 0.0},
+        )
+        c[field] += amount
+
+
+def status_code(exc: BaseException) -> int | None:
+    """HTTP status carried by an API error (.code or .status_code), if any."""
+    for attr in ("code", "status_code"):
+        val = getattr(exc, attr, None)
+        if isinstance(val, int):
+            return val
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for errors worth retrying: 429, 408, 5xx and transport failures."""
+    code = status_code(exc)
+    if code is not None:
+        return code == 429 or code == 408 or code >= 500
+    try:
+        import httpx
+
+        return isinstance(exc, (httpx.TransportError, httpx.TimeoutException))
+    except Exception:
+        return False
+
+
+def _find_retry_delay(obj: Any) -> float | None:
+    """Search an error payload for a google.rpc.RetryInfo retryDelay like "17s"."""
+    if isinstance(obj, dict):
+        delay = obj.get("retryDelay")
+        if isinstance(delay, str) and delay.endswith("s"):
+            try:
+                return float(delay[:-1])
+            except ValueError:
+                pass
+        obj = list(obj.values())
+    if isinstance(obj, list):
+        for item in obj:
+            found = _find_retry_delay(item)
+            if found is not None:
+                return found
+    return None
+
+
+def _retry_after(exc: BaseException) -> float | None:
+    """Server-provided delay hint in seconds, if any."""
+    hint = getattr(exc, "retry_after", None)
+    if isinstance(hint, (int, float)):
+        return float(hint)
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is not None:
+        try:
+            value = headers.get("retry-after")
+            if value is not None:
+                return float(value)
+        except (TypeError, ValueError):
+            pass
+    return _find_retry_delay(getattr(exc, "details", None))
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0.0, min(_BACKOFF_MAX_S, _BACKOFF_S * (2 ** attempt)))
+
+
+async def call_gemini(
+    model: str,
+    fn: Callable[..., Awaitable[Any]],
+    /,
+    *args: Any,
+    **kwargs: Any,
+) -> Any:
+    """Await fn(*args, **kwargs) under model's rate limit, retrying transient errors.
+
+    The last error is re-raised once retries are exhausted or the error is not
+    retryable (e.g. 400 or 403).
+    """
+    bucket = _bucket(model)
+    attempt = 0
+    while True:
+        waited = await bucket.acquire()
+        _count(model, "calls")
+        if waited:
+            _count(model, "limiter_wait_s", waited)
+        try:
+            return await fn(*args, **kwargs)
+        except Exception as e:
+            if status_code(e) == 429:
+                _count(model, "throttled")
+            if attempt >= _MAX_RETRIES or not is_retryable(e):
+                _count(model, "failures")
+                raise
+            hint = _retry_after(e)
+            delay = max(hint, _backoff(attempt)) if hint is not None else _backoff(attempt)
+            _count(model, "retries")
+            log.warning(
+                "Gemini %s failed (%s); retry %d/%d in %.1fs",
+                model, e, attempt + 1, _MAX_RETRIES, delay,
+            )
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+def reset_stats() -> None:
+    """Forget buckets and counters (buckets pick up changed env on next use)."""
+    with _LOCK:
+        _BUCKETS.clear()
+        _COUNTERS.clear()
+
+
+# --------------- MCP Tool Functions ---------------
+
+
+def gemini_stats() -> dict[str, Any]:
+    """Report per-model Gemini call counters: calls, throttled (429s), retries,
+    failures and time spent waiting on the local rate limiter, plus how many
+    input images were uploaded once and reused from the Files API cache."""
+    from .uploads import upload_stats
+
+    with _LOCK:
+        models = {
+            m: {**c, "limiter_wait_s": round(c["limiter_wait_s"], 2)}
+            for m, c in _COUNTERS.items()
+        }
+    return {"ok": True, "models": models, "uploads": upload_stats()}
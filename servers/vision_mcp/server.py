@@ -3,15 +3,28 @@
 KAgent Vision MCP Server
 
 Exposes vision tools over MCP (Model Context Protocol):
-  - Camera: list_cameras, vision_start, vision_status, vision_capture, vision_burst, vision_stop
-  - Files:  list_images
-  - Banana: banana_generate (AI image generation/transformation)
+  - Camera: list_cameras, vision_start, vision_status, vision_capture, vision_burst,
+            vision_sync_burst (multi-camera), vision_stop
+  - Frames: vision_save (persist in-memory frame handles), vision_contact_sheet
+  - Files:  list_images, image_duplicates, image_nearest (perceptual-hash search)
+  - Banana: banana_generate (AI image generation/transformation), banana_batch
   - Veo:    veo_generate_video (AI video generation)
+            veo_submit, veo_status, veo_result, veo_cancel (background Veo jobs)
   - ASL:    asl_understand (American Sign Language interpretation)
+  - Stats:  gemini_stats (rate-limit / retry counters)
+
+Runs over stdio by default. With --http it serves streamable HTTP at
+http://HOST:PORT/mcp instead, so one resident process (and the cameras it
+owns) can be shared by several agent workers. When VISION_MCP_TOKEN is set,
+every HTTP request must carry it as "Authorization: Bearer <token>".
 """
 
+import os
 import sys
+import hmac
+import argparse
 import logging
+from contextlib import asynccontextmanager
 
 logging.basicConfig(
     level=logging.INFO,
@@ -31,37 +44,128 @@ from .camera import (
     vision_status,
     vision_capture,
     vision_burst,
+    vision_sync_burst,
     vision_stop,
 )
+from .frames import vision_save
+from .contact_sheet import vision_contact_sheet
 from .files import list_images
-from .banana import banana_generate
+from .phash import image_duplicates, image_nearest
+from .banana import banana_generate, banana_batch
 from .veo import veo_generate_video
+from .veo_jobs import resume_jobs, veo_submit, veo_status, veo_result, veo_cancel
 from .asl import asl_understand
+from .ratelimit import gemini_stats
+from .executor import offload, offload_capture
+
+
+@asynccontextmanager
+async def _lifespan(server):
+    # Veo jobs still running when the last server process exited are picked up
+    # again as soon as this one serves, not on the next veo_* call
+    resumed = resume_jobs()
+    if resumed:
+        log.info("Resumed polling %d running Veo job(s)", resumed)
+    yield
+
 
 # ---------- Create MCP Server ----------
-mcp = FastMCP("KAgent Vision MCP")
+mcp = FastMCP("KAgent Vision MCP", lifespan=_lifespan)
+
+# Blocking camera/OpenCV/file tools run on bounded executors so they never
+# stall the event loop; the generation tools below are natively async. Tools
+# that hold a camera get their own pool so long bursts can't starve the rest.
 
 # Register camera tools
-mcp.tool()(list_cameras)
-mcp.tool()(vision_start)
-mcp.tool()(vision_status)
-mcp.tool()(vision_capture)
-mcp.tool()(vision_burst)
-mcp.tool()(vision_stop)
+mcp.tool()(offload_capture(list_cameras))
+mcp.tool()(offload_capture(vision_start))
+mcp.tool()(offload_capture(vision_status))
+mcp.tool()(offload_capture(vision_capture))
+mcp.tool()(offload_capture(vision_burst))
+mcp.tool()(offload_capture(vision_sync_burst))
+mcp.tool()(offload_capture(vision_stop))
+mcp.tool()(offload(vision_save))
+mcp.tool()(offload(vision_contact_sheet))
 
 # Register file tools
-mcp.tool()(list_images)
+mcp.tool()(offload(list_images))
+mcp.tool()(offload(image_duplicates))
+mcp.tool()(offload(image_nearest))
 
 # Register AI generation tools
 mcp.tool()(banana_generate)
+mcp.tool()(banana_batch)
 mcp.tool()(veo_generate_video)
+mcp.tool()(veo_submit)
+mcp.tool()(veo_status)
+mcp.tool()(veo_result)
+mcp.tool()(veo_cancel)
 
 # Register ASL tools
 mcp.tool()(asl_understand)
 
+# Register diagnostics
+mcp.tool()(gemini_stats)
+
+
+class _BearerAuth:
+    """ASGI wrapper that answers 401 to HTTP requests without the bearer token."""
+
+    def __init__(self, app, token: str):
+        self.app = app
+        self._expected = f"Bearer {token}".encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            auth = dict(scope["headers"]).get(b"authorization", b"")
+            if not hmac.compare_digest(auth, self._expected):
+                await send({
+                    "type": "http.response.start",
+                    "status": 401,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"www-authenticate", b"Bearer"),
+                    ],
+                })
+                await send({"type": "http.response.body", "body": b'{"error": "unauthorized"}'})
+                return
+        await self.app(scope, receive, send)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="vision_mcp", description="KAgent Vision MCP server")
+    parser.add_argument(
+        "--http", action="store_true", help="serve streamable HTTP instead of stdio"
+    )
+    parser.add_argument("--host", default=os.environ.get("VISION_MCP_HOST", "127.0.0.1"))
+    parser.add_argument(
+        "--port", type=int, default=int(os.environ.get("VISION_MCP_PORT", "3100"))
+    )
+    args = parser.parse_args(argv)
+
+    if not args.http:
+        mcp.run()
+        return
+    mcp.settings.host = args.host
+    mcp.settings.port = args.port
+    token = os.environ.get("VISION_MCP_TOKEN", "")
+    if not token:
+        log.info("Serving streamable HTTP on http://%s:%d/mcp", args.host, args.port)
+        mcp.run(transport="streamable-http")
+        return
+
+    import uvicorn
 
-def main():
-    mcp.run()
+    log.info(
+        "Serving streamable HTTP on http://%s:%d/mcp (bearer token required)",
+        args.host, args.port,
+    )
+    uvicorn.run(
+        _BearerAuth(mcp.streamable_http_app(), token),
+        host=args.host,
+        port=args.port,
+        log_level=mcp.settings.log_level.lower(),
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,230 @@
+"""Upload-once cache for input images sent to Gemini.
+
+The same capture is often sent several times (banana_generate, then a retry
+with a tweaked prompt, then a batch). Images at or above VISION_UPLOAD_MIN_KB
+are uploaded once through the Gemini Files API and later requests reference
+the remote file by URI. References are indexed by content hash (scoped to the
+API key) together with their expiry, persisted under the cache directory, and
+anything expired, failing to upload or rejected by the API falls back to
+inline bytes. Any client exposing aio.files.upload (a local fake installed
+with genai_client.set_client() included) works.
+
+Environment:
+  VISION_UPLOAD_CACHE     "0" disables uploads (always send inline bytes)
+  VISION_UPLOAD_MIN_KB    smallest image worth uploading
+  VISION_UPLOAD_TTL_H     assumed lifetime when the API reports no expiration
+"""
+
+import io
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from typing import Any
+
+from .cache import CACHE_ROOT, hash_key
+from .ratelimit import call_gemini
+
+log = logging.getLogger("vision_mcp.uploads")
+
+_ENABLED = os.environ.get("VISION_UPLOAD_CACHE", "1").lower() not in ("0", "false", "no")
+_MIN_BYTES = int(os.environ.get("VISION_UPLOAD_MIN_KB", "512")) * 1024
+# Files API keeps uploads for 48h; stay under that when it doesn't say
+_TTL_S = float(os.environ.get("VISION_UPLOAD_TTL_H", "47")) * 3600
+# Don't hand out a reference that may expire before the request lands
+_EXPIRY_MARGIN_S = 300.0
+# Wait this long for an upload stuck in PROCESSING before sending inline
+_ACTIVE_WAIT_S = 10.0
+
+_INDEX_PATH = CACHE_ROOT / "gemini_files.json"
+
+_LOCK = threading.Lock()
+_ENTRIES: dict[str, dict[str, Any]] = {}
+_PENDING: dict[str, "asyncio.Future[str | None]"] = {}
+_STATE: dict[str, Any] = {"loaded": False}
+_COUNTERS: dict[str, int] = {
+    "uploads": 0,
+    "hits": 0,
+    "inline": 0,
+    "fallbacks": 0,
+    "bytes_uploaded": 0,
+    "bytes_reused": 0,
+}
+
+
+def _load() -> None:
+    with _LOCK:
+        if _STATE["loaded"]:
+            return
+        _STATE["loaded"] = True
+        try:
+            with open(_INDEX_PATH, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        _ENTRIES.update(
+            {k: v for k, v in data.items() if isinstance(v, dict) and v.get("expires", 0) > now}
+        )
+
+
+def _persist() -> None:
+    """Write the index atomically (caller holds _LOCK)."""
+    try:
+        _INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _INDEX_PATH.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_ENTRIES, f)
+        os.replace(tmp, _INDEX_PATH)
+    except OSError as e:
+        log.warning("Could not persist upload index %s: %s", _INDEX_PATH, e)
+
+
+def _count(field: str, amount: int = 1) -> None:
+    with _LOCK:
+        _COUNTERS[field] += amount
+
+
+def _lookup(key: str) -> dict[str, Any] | None:
+    """Return a live entry; expired ones are dropped."""
+    with _LOCK:
+        entry = _ENTRIES.get(key)
+        if entry is None:
+            return None
+        if entry.get("expires", 0) - _EXPIRY_MARGIN_S > time.time():
+            return entry
+        del _ENTRIES[key]
+        _persist()
+        return None
+
+
+def _expiry(file: Any) -> float:
+    fallback = time.time() + _TTL_S
+    exp = getattr(file, "expiration_time", None)
+    try:
+        return min(fallback, exp.timestamp()) if exp is not None else fallback
+    except Exception:
+        return fallback
+
+
+def _state_name(file: Any) -> str:
+    state = getattr(file, "state", None)
+    return str(getattr(state, "name", state) or "").upper()
+
+
+async def _upload(client: Any, gtypes: Any, key: str, data: bytes, mime: str) -> str | None:
+    """Upload data and record it; returns the file URI or None to send inline."""
+    try:
+        file = await call_gemini(
+            "files",
+            client.aio.files.upload,
+            file=io.BytesIO(data),
+            config=gtypes.UploadFileConfig(mime_type=mime, display_name=f"vision-{key[:16]}"),
+        )
+        deadline = time.monotonic() + _ACTIVE_WAIT_S
+        while _state_name(file) == "PROCESSING" and time.monotonic() < deadline:
+            await asyncio.sleep(0.5)
+            file = await call_gemini("files", client.aio.files.get, name=file.name)
+    except Exception as e:
+        log.warning("Files API upload failed, sending inline: %s", e)
+        _count("fallbacks")
+        return None
+    if _state_name(file) not in ("", "ACTIVE", "STATE_UNSPECIFIED") or not file.uri:
+        log.warning("Uploaded file %s not usable (%s), sending inline", file.name, _state_name(file))
+        _count("fallbacks")
+        return None
+
+    with _LOCK:
+        _ENTRIES[key] = {
+            "name": file.name,
+            "uri": file.uri,
+            "mime": mime,
+            "size": len(data),
+            "expires": _expiry(file),
+        }
+        _COUNTERS["uploads"] += 1
+        _COUNTERS["bytes_uploaded"] += len(data)
+        _persist()
+    log.info("Uploaded %d bytes as %s", len(data), file.name)
+    return file.uri
+
+
+async def _remote_uri(client: Any, gtypes: Any, data: bytes, mime: str) -> str | None:
+    key = hash_key(os.environ.get("GEMINI_API_KEY", ""), data)
+    entry = _lookup(key)
+    if entry is not None:
+        with _LOCK:
+            _COUNTERS["hits"] += 1
+            _COUNTERS["bytes_reused"] += len(data)
+        return entry["uri"]
+
+    # Concurrent requests for the same bytes (n > 1, batches) share one upload
+    pending = _PENDING.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+    task = asyncio.ensure_future(_upload(client, gtypes, key, data, mime))
+    _PENDING[key] = task
+    # Removed when the upload finishes, even if every waiter was cancelled; the
+    # URI is then only handed out again through _lookup's expiry check
+    task.add_done_callback(lambda _: _PENDING.pop(key, None))
+    return await asyncio.shield(task)
+
+
+def inline_parts(gtypes: Any, images: list[tuple[bytes, str]]) -> list:
+    """One inline Part per (bytes, mime) image."""
+    return [gtypes.Part.from_bytes(data=data, mime_type=mt) for data, mt in images]
+
+
+async def image_parts(client: Any, gtypes: Any, images: list[tuple[bytes, str]]) -> list:
+    """Parts for images: Files API references for large ones, inline bytes otherwise."""
+    _load()
+    parts: list = []
+    for data, mt in images:
+        uri = None
+        if _ENABLED and len(data) >= _MIN_BYTES:
+            uri = await _remote_uri(client, gtypes, data, mt)
+        if uri:
+            parts.append(gtypes.Part.from_uri(file_uri=uri, mime_type=mt))
+        else:
+            _count("inline")
+            parts.append(gtypes.Part.from_bytes(data=data, mime_type=mt))
+    return parts
+
+
+def has_remote_refs(contents: list) -> bool:
+    return any(
+        getattr(getattr(p, "file_data", None), "file_uri", None)
+        for c in contents
+        for p in (getattr(c, "parts", None) or [])
+    )
+
+
+def is_stale_ref_error(exc: BaseException) -> bool:
+    """True for errors the API returns when a referenced file expired or vanished."""
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    return code in (403, 404)
+
+
+def forget(contents: list) -> None:
+    """Drop index entries for every file referenced in contents."""
+    uris = {
+        p.file_data.file_uri
+        for c in contents
+        for p in (getattr(c, "parts", None) or [])
+        if getattr(getattr(p, "file_data", None), "file_uri", None)
+    }
+    with _LOCK:
+        stale = [k for k, v in _ENTRIES.items() if v.get("uri") in uris]
+        for k in stale:
+            del _ENTRIES[k]
+        _COUNTERS["fallbacks"] += 1
+        if stale:
+            _persist()
+
+
+def upload_stats() -> dict[str, Any]:
+    _load()
+    with _LOCK:
+        return {**_COUNTERS, "entries": len(_ENTRIES), "enabled": _ENABLED}
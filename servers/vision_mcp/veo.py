@@ -2,15 +2,81 @@
 
 import os
 import time
+import asyncio
 import logging
-import mimetypes
 from pathlib import Path
 from typing import Any
 
+from .executor import run_blocking
+from .frames import load_image
+from .genai_client import GenAIUnavailable, get_client
+from .preprocess import prepare_images
+from .ratelimit import call_gemini
+
 log = logging.getLogger("vision_mcp.veo")
 
 
-def veo_generate_video(
+async def start_operation(
+    client: Any,
+    gtypes: Any,
+    prompt: str,
+    negative_prompt: str,
+    model: str,
+    image_path: str | None,
+    aspect_ratio: str | None,
+    resolution: str | None,
+    seed: int | None,
+) -> tuple[Any, int]:
+    """Read (and downscale) the optional conditioning image and start a Veo operation.
+
+    Returns (operation, bytes_saved). Raises ValueError for an unreadable
+    image; API errors propagate.
+    """
+    image_obj = None
+    bytes_saved = 0
+    if image_path:
+        try:
+            data, mt = await run_blocking(load_image, image_path, default_mime="image/png")
+        except Exception as e:
+            raise ValueError(f"read image failed: {e}") from e
+        [(data, mt)], bytes_saved = await prepare_images([(data, mt)])
+        image_obj = gtypes.Image(image_bytes=data, mime_type=mt)
+
+    cfg = gtypes.GenerateVideosConfig(
+        negative_prompt=negative_prompt or None,
+        aspect_ratio=aspect_ratio or None,
+        resolution=resolution or None,
+        seed=seed,
+    )
+    op = await call_gemini(
+        model,
+        client.aio.models.generate_videos,
+        model=model,
+        prompt=prompt,
+        image=image_obj,
+        config=cfg,
+    )
+    return op, bytes_saved
+
+
+async def save_videos(client: Any, op: Any, out_dir_p: Path) -> list[str]:
+    """Download every video of a finished operation into out_dir_p."""
+    vids = getattr(op.response, "generated_videos", []) or []
+    if not vids:
+        raise ValueError("no videos in response")
+
+    saved: list[str] = []
+    for idx, gv in enumerate(vids):
+        await call_gemini("files", client.aio.files.download, file=gv.video)
+        ts = time.strftime("%Y%m%d_%H%M%S")
+        ms = int((time.time() % 1) * 1000)
+        fpath = out_dir_p / f"veo_{ts}_{ms:03d}_{idx:02d}.mp4"
+        await run_blocking(gv.video.save, str(fpath))
+        saved.append(str(fpath))
+    return saved
+
+
+async def veo_generate_video(
     prompt: str,
     negative_prompt: str = "",
     out_dir: str = "outputs",
@@ -30,7 +96,7 @@ def veo_generate_video(
       negative_prompt: Things to avoid in the video.
       out_dir: Directory to write generated files.
       model: Veo model identifier.
-      image_path: Optional image file path for image-conditioned generation.
+      image_path: Optional image file path or frame handle for image-conditioned generation.
       aspect_ratio: "16:9" or "9:16".
       resolution: e.g. "720p", "1080p".
       seed: Optional seed for reproducibility.
@@ -38,43 +104,25 @@ def veo_generate_video(
       max_wait_seconds: Maximum wait time before timeout.
     """
     try:
-        from google import genai
         from google.genai import types as gtypes
     except Exception as e:
         return {"ok": False, "error": f"google-genai not installed: {e}"}
 
-    api_key = os.environ.get("GEMINI_API_KEY")
-    if not api_key:
-        return {"ok": False, "error": "GEMINI_API_KEY not set in environment"}
+    try:
+        client = get_client()
+    except GenAIUnavailable as e:
+        return {"ok": False, "error": str(e)}
 
-    client = genai.Client(api_key=api_key)
     out_dir_p = Path(os.path.expanduser(out_dir))
     out_dir_p.mkdir(parents=True, exist_ok=True)
 
-    image_obj = None
-    if image_path:
-        try:
-            with open(image_path, "rb") as f:
-                data = f.read()
-            mt, _ = mimetypes.guess_type(image_path)
-            image_obj = gtypes.Image(image_bytes=data, mime_type=mt or "image/png")
-        except Exception as e:
-            return {"ok": False, "error": f"read image failed: {e}"}
-
-    cfg = gtypes.GenerateVideosConfig(
-        negative_prompt=negative_prompt or None,
-        aspect_ratio=aspect_ratio or None,
-        resolution=resolution or None,
-        seed=seed,
-    )
-
     try:
-        op = client.models.generate_videos(
-            model=model,
-            prompt=prompt,
-            image=image_obj,
-            config=cfg,
+        op, bytes_saved = await start_operation(
+            client, gtypes, prompt, negative_prompt, model,
+            image_path, aspect_ratio, resolution, seed,
         )
+    except ValueError as e:
+        return {"ok": False, "error": str(e)}
     except Exception as e:
         return {"ok": False, "error": f"veo start failed: {e}"}
 
@@ -83,31 +131,24 @@ def veo_generate_video(
         while not op.done:
             if waited >= max_wait_seconds:
                 return {"ok": False, "error": f"timeout after {max_wait_seconds}s"}
-            time.sleep(max(1, int(poll_seconds)))
+            await asyncio.sleep(max(1, int(poll_seconds)))
             waited += poll_seconds
-            op = client.operations.get(op)
+            op = await call_gemini("operations", client.aio.operations.get, op)
     except Exception as e:
         return {"ok": False, "error": f"veo poll failed: {e}"}
 
-    vids = getattr(op.response, "generated_videos", []) or []
-    if not vids:
-        return {"ok": False, "error": "no videos in response"}
-
-    saved: list[str] = []
-    for idx, gv in enumerate(vids):
-        client.files.download(file=gv.video)
-        ts = time.strftime("%Y%m%d_%H%M%S")
-        ms = int((time.time() % 1) * 1000)
-        fpath = out_dir_p / f"veo_{ts}_{ms:03d}_{idx:02d}.mp4"
-        gv.video.save(str(fpath))
-        saved.append(str(fpath))
+    try:
+        saved = await save_videos(client, op, out_dir_p)
+    except ValueError as e:
+        return {"ok": False, "error": str(e)}
 
     return {
         "ok": True,
         "paths": saved,
         "model": model,
         "seconds_waited": waited,
-        "image_used": bool(image_obj),
+        "image_used": bool(image_path),
+        "bytes_saved": bytes_saved,
         "aspect_ratio": aspect_ratio,
         "resolution": resolution,
         "seed": seed,
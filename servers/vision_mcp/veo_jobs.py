@@ -0,0 +1,294 @@
+"""Veo jobs: submit video generations now, collect the results later.
+
+veo_submit starts a Veo operation and returns a job id right away. Jobs are
+recorded in a JSON-lines registry (one snapshot per state change, last one
+wins) so they survive a server restart. A single background task polls every
+running job concurrently and downloads the videos when an operation finishes.
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from typing import Any
+
+from .genai_client import GenAIUnavailable, get_client
+from .ratelimit import call_gemini, is_retryable, status_code
+from .veo import save_videos, start_operation
+
+log = logging.getLogger("vision_mcp.veo_jobs")
+
+_REGISTRY_PATH = Path(
+    os.path.expanduser(
+        os.environ.get("VISION_VEO_JOBS", os.path.join("outputs", ".veo_jobs.jsonl"))
+    )
+)
+
+# Seconds between polling rounds of the background poller
+_POLL_S = float(os.environ.get("VISION_VEO_POLL_S", "8"))
+
+_LOCK = threading.Lock()
+_JOBS: dict[str, dict[str, Any]] = {}
+_STATE: dict[str, Any] = {
+    "loaded": False,
+    "poller": None,
+}
+
+
+def _load() -> None:
+    """Read the registry once per process; compact it if it has grown stale."""
+    with _LOCK:
+        if _STATE["loaded"]:
+            return
+        _STATE["loaded"] = True
+        if not _REGISTRY_PATH.exists():
+            return
+        lines = 0
+        try:
+            with open(_REGISTRY_PATH, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    lines += 1
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    if rec.get("id"):
+                        _JOBS[rec["id"]] = rec
+        except OSError as e:
+            log.warning("Could not read Veo job registry %s: %s", _REGISTRY_PATH, e)
+            return
+        if lines > 2 * max(1, len(_JOBS)):
+            tmp = _REGISTRY_PATH.with_suffix(f".tmp{os.getpid()}")
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    for rec in _JOBS.values():
+                        f.write(json.dumps(rec) + "\n")
+                os.replace(tmp, _REGISTRY_PATH)
+            except OSError as e:
+                # The jobs are loaded either way; compaction is retried next start
+                log.warning("Could not compact Veo job registry %s: %s", _REGISTRY_PATH, e)
+                tmp.unlink(missing_ok=True)
+        log.info("Loaded %d Veo job(s) from %s", len(_JOBS), _REGISTRY_PATH)
+
+
+def _save(job_id: str, **fields: Any) -> dict[str, Any]:
+    """Update a job in memory, append its snapshot to the registry, return a copy."""
+    with _LOCK:
+        job = _JOBS.setdefault(job_id, {"id": job_id})
+        job.update(fields, updated=time.time())
+        snapshot = dict(job)
+        try:
+            _REGISTRY_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(_REGISTRY_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(snapshot) + "\n")
+        except OSError as e:
+            log.warning("Could not persist Veo job %s: %s", job_id, e)
+    return snapshot
+
+
+def _get(job_id: str) -> dict[str, Any] | None:
+    with _LOCK:
+        job = _JOBS.get(job_id)
+        return dict(job) if job else None
+
+
+def _running() -> list[dict[str, Any]]:
+    with _LOCK:
+        return [dict(j) for j in _JOBS.values() if j.get("state") == "running"]
+
+
+async def _poll_job(client: Any, gtypes: Any, job: dict[str, Any]) -> None:
+    try:
+        op = await call_gemini(
+            "operations",
+            client.aio.operations.get,
+            gtypes.GenerateVideosOperation(name=job["operation"]),
+        )
+    except Exception as e:
+        log.warning("Veo job %s poll failed: %s", job["id"], e)
+        current = _get(job["id"])
+        if not current or current.get("state") != "running":
+            return
+        if status_code(e) is not None and not is_retryable(e):
+            # Unknown or expired operation, bad request, no access: won't recover
+            _save(job["id"], state="failed", error=f"poll failed: {e}")
+        elif current.get("last_error") != f"poll failed: {e}":
+            # Only changes are persisted, so a long outage doesn't grow the registry
+            _save(job["id"], last_error=f"poll failed: {e}")
+        return
+    if not op.done:
+        return
+
+    current = _get(job["id"])
+    if not current or current.get("state") != "running":
+        return  # cancelled while the poll was in flight
+
+    err = getattr(op, "error", None)
+    if err:
+        _save(job["id"], state="failed", error=f"veo operation failed: {err}")
+        return
+    try:
+        paths = await save_videos(client, op, Path(job["out_dir"]))
+    except Exception as e:
+        _save(job["id"], state="failed", error=f"download failed: {e}")
+        return
+    _save(job["id"], state="done", paths=paths, finished=time.time())
+    log.info("Veo job %s done: %s", job["id"], paths)
+
+
+async def _poller() -> None:
+    """Poll all running jobs concurrently until none are left."""
+    try:
+        while True:
+            running = _running()
+            if not running:
+                return
+            try:
+                from google.genai import types as gtypes
+
+                client = get_client()
+            except Exception as e:
+                log.warning("Veo poller cannot reach Gemini: %s", e)
+            else:
+                await asyncio.gather(*(_poll_job(client, gtypes, j) for j in running))
+            await asyncio.sleep(_POLL_S)
+    finally:
+        _STATE["poller"] = None
+
+
+def _ensure_poller() -> None:
+    """Load the registry and (re)start the poller if any job is still running."""
+    _load()
+    task = _STATE["poller"]
+    if (task is None or task.done()) and _running():
+        _STATE["poller"] = asyncio.get_running_loop().create_task(_poller())
+
+
+def resume_jobs() -> int:
+    """Start polling jobs left running by a previous server process.
+
+    Called when the server starts serving, so their videos are collected
+    without waiting for the next veo_* call. Returns the number of running jobs.
+    """
+    _ensure_poller()
+    return len(_running())
+
+
+def _summary(job: dict[str, Any]) -> dict[str, Any]:
+    keys = (
+        "id", "state", "prompt", "model", "created", "updated", "paths", "error", "last_error",
+    )
+    return {k: job.get(k) for k in keys if job.get(k) is not None}
+
+
+# --------------- MCP Tool Functions ---------------
+
+
+async def veo_submit(
+    prompt: str,
+    negative_prompt: str = "",
+    out_dir: str = "outputs",
+    model: str = "veo-3.1-generate-preview",
+    image_path: str | None = None,
+    aspect_ratio: str | None = None,
+    resolution: str | None = None,
+    seed: int | None = None,
+) -> dict[str, Any]:
+    """Start a Veo video generation in the background and return a job id at once.
+    Use veo_status / veo_result to follow it; several jobs can run concurrently.
+
+    Args: same as veo_generate_video (without the polling options).
+    """
+    try:
+        from google.genai import types as gtypes
+    except Exception as e:
+        return {"ok": False, "error": f"google-genai not installed: {e}"}
+
+    try:
+        client = get_client()
+    except GenAIUnavailable as e:
+        return {"ok": False, "error": str(e)}
+
+    out_dir_p = Path(os.path.expanduser(out_dir))
+    out_dir_p.mkdir(parents=True, exist_ok=True)
+
+    try:
+        op, bytes_saved = await start_operation(
+            client, gtypes, prompt, negative_prompt, model,
+            image_path, aspect_ratio, resolution, seed,
+        )
+    except ValueError as e:
+        return {"ok": False, "error": str(e)}
+    except Exception as e:
+        return {"ok": False, "error": f"veo start failed: {e}"}
+
+    _load()
+    job = _save(
+        uuid.uuid4().hex[:12],
+        state="running",
+        operation=op.name,
+        prompt=prompt,
+        model=model,
+        out_dir=str(out_dir_p.resolve()),
+        image_path=image_path,
+        created=time.time(),
+    )
+    _ensure_poller()
+    log.info("Veo job %s submitted (%s)", job["id"], op.name)
+    return {"ok": True, "job_id": job["id"], "state": job["state"], "bytes_saved": bytes_saved}
+
+
+async def veo_status(job_id: str = "") -> dict[str, Any]:
+    """Report one job (job_id) or all known Veo jobs, newest first."""
+    _ensure_poller()
+    if job_id:
+        job = _get(job_id)
+        if not job:
+            return {"ok": False, "error": f"unknown job: {job_id}"}
+        return {"ok": True, **_summary(job)}
+    with _LOCK:
+        jobs = sorted(_JOBS.values(), key=lambda j: j.get("created", 0), reverse=True)
+        return {"ok": True, "jobs": [_summary(j) for j in jobs]}
+
+
+async def veo_result(job_id: str, wait_seconds: int = 0) -> dict[str, Any]:
+    """Return the saved MP4 paths of a finished job.
+    wait_seconds > 0 waits up to that long for a running job to finish."""
+    _ensure_poller()
+    deadline = time.monotonic() + max(0, int(wait_seconds))
+    while True:
+        job = _get(job_id)
+        if not job:
+            return {"ok": False, "error": f"unknown job: {job_id}"}
+        state = job.get("state")
+        if state == "done":
+            return {"ok": True, "job_id": job_id, "paths": job.get("paths", [])}
+        if state != "running" or time.monotonic() >= deadline:
+            return {
+                "ok": False,
+                "job_id": job_id,
+                "state": state,
+                "error": job.get("error") or f"job is {state}",
+            }
+        await asyncio.sleep(1)
+
+
+async def veo_cancel(job_id: str) -> dict[str, Any]:
+    """Stop tracking a running job; its result will not be downloaded.
+    The Gemini API has no cancel for Veo operations, so generation may still
+    finish (and be billed) remotely."""
+    _load()
+    job = _get(job_id)
+    if not job:
+        return {"ok": False, "error": f"unknown job: {job_id}"}
+    if job.get("state") != "running":
+        return {"ok": False, "error": f"job is already {job.get('state')}"}
+    _save(job_id, state="cancelled")
+    return {"ok": True, "job_id": job_id, "state": "cancelled"}